@@ -0,0 +1,47 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from strategies.tools.rolling import rolling_argmax, rolling_argmin
+
+
+def rolling_apply_argmax(prices, window):
+    # the original AroonCrossoverCalc implementation, one Python call per bar
+    high_max_idx = prices.rolling(window=window).apply(lambda x: x.argmax(), raw=True)
+    low_min_idx = prices.rolling(window=window).apply(lambda x: x.argmin(), raw=True)
+    return high_max_idx.to_numpy(), low_min_idx.to_numpy()
+
+
+def block_scan_argmax(prices, window):
+    return rolling_argmax(prices, window), rolling_argmin(prices, window)
+
+
+def best_of(fn, repeat, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark rolling argmax/argmin used by AroonCrossoverCalc')
+    parser.add_argument('--bars', type=int, default=100000, help='Specify history length')
+    parser.add_argument('--windows', type=int, nargs='+', default=[50, 100, 150, 200, 250], help='Specify Aroon windows')
+    parser.add_argument('--repeat', type=int, default=3, help='Specify repetitions (best time is reported)')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    prices = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, args.bars))))
+
+    print(f"{'window':>8}{'rolling.apply (s)':>20}{'block scan (s)':>18}{'speedup':>10}")
+    for window in args.windows:
+        old_time, old = best_of(rolling_apply_argmax, 1, prices, window)
+        new_time, new = best_of(block_scan_argmax, args.repeat, prices, window)
+        for expected, actual in zip(old, new):
+            assert np.array_equal(expected, actual, equal_nan=True)
+        print(f"{window:>8}{old_time:>20.4f}{new_time:>18.4f}{old_time / new_time:>9.0f}x")
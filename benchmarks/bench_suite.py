@@ -0,0 +1,167 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from strategies.SimpleMACrossover import SimpleMACrossoverCalc
+from strategies.MeanReversion import MeanReversionCalc
+from strategies.BollingerBands import BollingerBandsCalc
+from strategies.RsiCrossover import RsiCrossoverCalc
+from strategies.EmaCrossover import EmaCrossoverCalc
+from strategies.AroonCrossover import AroonCrossoverCalc
+from strategies.VolatilityATR import VolatilityATRCalc
+from strategies.tools.simulator import simulate_bracket
+from strategies.tools.performance import performance
+from strategies.tools.signals import Signal
+from strategies.tools.synthetic import MODELS, simulate
+
+# one representative parameter set per Calc, taken from the README optima
+CALCS = {
+    'simple-ma-crossover': (SimpleMACrossoverCalc, {'short_window': 9, 'long_window': 21}),
+    'mean-reversion': (MeanReversionCalc, {'window': 20, 'z_threshold': 1.0}),
+    'bollinger-bands': (BollingerBandsCalc, {'window': 20, 'num_std_dev': 2.0}),
+    'rsi-crossover': (RsiCrossoverCalc, {'rsi_period': 14, 'upper_threshold': 70, 'lower_threshold': 30}),
+    'ema-crossover': (EmaCrossoverCalc, {'short_window': 10, 'long_window': 50}),
+    'aroon-crossover': (AroonCrossoverCalc, {'window': 25}),
+    'volatility-atr': (VolatilityATRCalc, {'window': 14, 'atr_multiplier': 1.0}),
+}
+
+
+def calc_case(calc_cls, params, atr, data, lean=False):
+    # get_data (or the lean get_signal) on the input shape each Calc
+    # expects, built outside the timing
+    bars, symbols = data['close'].shape
+    index = pd.date_range('2000-01-03', periods=bars, freq='min')
+    if atr:
+        if symbols == 1:
+            prices = pd.DataFrame({k: data[k][:, 0] for k in ('high', 'low', 'close')}, index=index)
+        else:
+            prices = pd.concat({k: pd.DataFrame(data[k], index=index) for k in ('high', 'low', 'close')}, axis=1)
+    elif symbols == 1:
+        prices = pd.Series(data['close'][:, 0], index=index)
+    else:
+        prices = pd.DataFrame(data['close'], index=index)
+    calc = calc_cls(params=params)
+    if lean:
+        return lambda: calc.get_signal(prices)
+    return lambda: calc.get_data(prices)
+
+
+def signals_for(data):
+    rng = np.random.default_rng(1)
+    return rng.choice(np.array([Signal.BUY, Signal.SELL, Signal.HOLD], dtype=np.int8),
+                      size=data['close'].shape, p=[0.05, 0.05, 0.9])
+
+
+def bracket_case(data):
+    signal = signals_for(data)
+    def run():
+        for j in range(signal.shape[1]):
+            simulate_bracket(signal[:, j], data['open'][:, j], data['high'][:, j], data['low'][:, j], 0.02)
+    return run
+
+
+def performance_case(data):
+    signal = signals_for(data)
+    def run():
+        for j in range(signal.shape[1]):
+            performance(signal[:, j], data['open'][:, j], 1e6)
+    return run
+
+
+def cases(data):
+    for name, (calc_cls, params) in CALCS.items():
+        yield name, calc_case(calc_cls, params, calc_cls is VolatilityATRCalc, data)
+        yield f'{name}-lean', calc_case(calc_cls, params, calc_cls is VolatilityATRCalc, data, lean=True)
+    yield 'simulate-bracket', bracket_case(data)
+    yield 'performance', performance_case(data)
+
+
+def measure(fn, repeat):
+    # best wall time of `repeat` runs, then one traced run for peak memory
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'commit': commit,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+    }
+
+
+def run(bars_list, symbols_list, repeat=3, max_cells=10**7, only=None, log=print, model='gbm'):
+    results = {}
+    for bars in bars_list:
+        for symbols in symbols_list:
+            if bars * symbols > max_cells:
+                continue
+            data = simulate(bars, symbols, model)
+            for name, fn in cases(data):
+                if only and not any(o in name for o in only):
+                    continue
+                seconds, peak = measure(fn, repeat)
+                key = f'{name}/{bars}x{symbols}'
+                results[key] = {'seconds': seconds, 'peak_bytes': peak, 'bars': bars, 'symbols': symbols}
+                log(f'{key:<40}{seconds:>12.4f} s{peak / 2**20:>12.1f} MiB')
+    return results
+
+
+def compare(results, baseline, threshold):
+    # keys slower than the baseline by more than `threshold` (0.2 = 20%)
+    slower = {}
+    for key, result in results.items():
+        before = baseline.get(key)
+        if before and result['seconds'] > before['seconds'] * (1 + threshold):
+            slower[key] = result['seconds'] / before['seconds']
+    return slower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Time and memory-profile every Calc.get_data and the backtest kernels on synthetic OHLCV')
+    parser.add_argument('--bars', type=int, nargs='+', default=[10**3, 10**5, 10**6], help='Specify history lengths (up to 1e7)')
+    parser.add_argument('--symbols', type=int, nargs='+', default=[1, 100], help='Specify symbol counts (up to 1000)')
+    parser.add_argument('--max-cells', type=int, default=10**7, help='Skip sizes with more bars x symbols than this')
+    parser.add_argument('--repeat', type=int, default=3, help='Specify repetitions (best time is reported)')
+    parser.add_argument('--model', type=str, default='gbm', choices=list(MODELS), help='Specify the synthetic data model')
+    parser.add_argument('--only', type=str, nargs='+', default=None, help='Run only cases whose name contains one of these')
+    parser.add_argument('--output', type=str, default=None, help='Write results to this JSON file')
+    parser.add_argument('--compare', type=str, default=None, help='Baseline JSON file from an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Flag cases slower than the baseline by this fraction')
+    args = parser.parse_args()
+
+    results = run(args.bars, args.symbols, args.repeat, args.max_cells, args.only, model=args.model)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'meta': metadata(), 'results': results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        slower = compare(results, baseline['results'], args.threshold)
+        for key, ratio in sorted(slower.items()):
+            print(f'SLOWER {key}: {ratio:.2f}x baseline ({baseline["meta"].get("commit", "")})')
+        sys.exit(1 if slower else 0)
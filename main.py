@@ -1,6 +1,11 @@
-from strategies.tools.tools import symbol_type
-from strategies.tools.common import YahooDataBacktesting, BacktestingBroker, Trader, datetime, argparse
-from param_helper import STRATEGIES, build_params
+from strategies.tools.tools import symbol_type, read_symbols
+from strategies.tools.common import Alpaca, BacktestingBroker, Trader, datetime, argparse
+from strategies.tools.store import OhlcvStore, LocalDataBacktesting
+from strategies.tools.synthetic import MODELS, SyntheticDataBacktesting, synthetic_store
+from strategies.tools.metrics import metrics
+from strategies.tools.bars import TIMESTEPS
+from strategies.Portfolio import Portfolio
+from param_helper import STRATEGIES, CALC_PARAMS, build_params, build_portfolio_params, load_strategy
 
 
 if __name__ == "__main__":
@@ -9,7 +14,9 @@ if __name__ == "__main__":
     parser.add_argument('--trade', action='store_true', help='Enable live trading')
 
     parser.add_argument('--symbol', type=symbol_type, default='AAPL', help='Specify ticker symbol')
+    parser.add_argument('--symbols', type=str, nargs='+', default=None, help='Run the strategy over many symbols in one process: tickers and/or files listing them')
     parser.add_argument('--window', type=int, default=22, help='Specify window size')
+    parser.add_argument('--timestep', type=str, default='day', choices=list(TIMESTEPS), help='Specify the bar size; the strategy iterates once per bar')
     parser.add_argument('--short_window', type=int, default=9, help='Specify short window size')
     parser.add_argument('--long_window', type=int, default=21, help='Specify long window size')
     parser.add_argument('--risk_tolerance', type=float, default=0.02, help='Specify risk tolerance for bracket order')
@@ -18,17 +25,40 @@ if __name__ == "__main__":
     parser.add_argument('--rsi_period', type=int, default=3, help='Specify RSI (relative strength index) period')
     parser.add_argument('--upper_threshold', type=int, default=70, help='Specify RSI upper threshold')
     parser.add_argument('--lower_threshold', type=int, default=32, help='Specify RSI lower threshold')
+    parser.add_argument('--z_threshold', type=float, default=1.5, help='Specify mean reversion z-score threshold')
+    parser.add_argument('--atr_multiplier', type=float, default=2.5, help='Specify ATR multiplier')
+    parser.add_argument('--store', type=str, default=None, help='Specify the local OHLCV store directory (default $ALGOTRADE_STORE or ~/.algotrade/ohlcv)')
+    parser.add_argument('--offline', action='store_true', help='Backtest only from bars already in the local store, never download')
+    parser.add_argument('--synthetic', type=str, default=None, choices=list(MODELS), help='Backtest on deterministic generated bars from this model instead of market data')
+    parser.add_argument('--seed', type=int, default=0, help='Specify the seed of the --synthetic bars')
+    parser.add_argument('--metrics', type=str, default=None, help='Record per-phase latency histograms and write them to this JSON file on exit')
+    parser.add_argument('--metrics_port', type=int, default=None, help='Serve the latency histograms in Prometheus text format on this port')
     parser.add_argument('--strategy', required=True, type=str,\
                         default=STRATEGIES[0], choices=STRATEGIES,\
                         help=f'Specify a strategy: {", ".join(STRATEGIES)}')
 
     args = parser.parse_args()
 
-    params = build_params(args)
+    if args.symbols:
+        if args.strategy not in CALC_PARAMS:
+            parser.error(f'--symbols is not supported for {args.strategy}')
+        # one Portfolio strategy batches fetches and signals for every symbol
+        params = build_portfolio_params(args, read_symbols(args.symbols))
+        strategy_cls = Portfolio
+        strat_name = f'portfolio_{args.strategy}'
+    else:
+        params = build_params(args)
+        strategy_cls = load_strategy(args.strategy)
+        strat_name = f'{args.symbol}_{args.strategy}'
+    if args.metrics or args.metrics_port:
+        metrics.enable(args.metrics)
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
     if args.trade:
         print("Live trading is enabled.")
+        from strategies.tools.config import ALPACA_CONFIG
         broker = Alpaca(ALPACA_CONFIG)
-        strategy = SimpleMACrossover(
+        strategy = strategy_cls(
                     name=strat_name,
                     broker=broker,
                     parameters = params
@@ -39,69 +69,25 @@ if __name__ == "__main__":
     else:
         start = datetime(2022, 1, 1)
         end = datetime(2023, 6, 1)
-        data_source = YahooDataBacktesting(
-            datetime_start=start,
-            datetime_end=end,
-        )
-        broker = BacktestingBroker(data_source=data_source)
-        strat_name = f'{args.symbol}_{args.strategy}'
-        if args.strategy == STRATEGIES[0]: # Simple Moving Avg Crossover
-            from strategies.SimpleMACrossover import SimpleMACrossover
-            strategy = SimpleMACrossover(
-                  name=strat_name,
-                  broker=broker,
-                  parameters=params
-            )
-        elif args.strategy == STRATEGIES[1]: # BollingerBands
-            from strategies.BollingerBands import BollingerBands
-            strategy = BollingerBands(
-                  name=strat_name,
-                  broker=broker,
-                  parameters=params
-            )
-        elif args.strategy == STRATEGIES[2]: # MeanReversion
-            from strategies.MeanReversion import MeanReversion
-            strategy = MeanReversion(
-                  name=strat_name,
-                  broker=broker,
-                  parameters=params
+        if args.synthetic:
+            data_source = SyntheticDataBacktesting(
+                datetime_start=start,
+                datetime_end=end,
+                store=synthetic_store(args.store, args.synthetic, args.seed),
             )
-        elif args.strategy == STRATEGIES[3]: # SentimentAnalysis
-            from strategies.SentimentAnalysis import SentimentAnalysis
-            strategy = SentimentAnalysis(
-                  name=strat_name,
-                  broker=broker,
-                  parameters=params
+        else:
+            data_source = LocalDataBacktesting(
+                datetime_start=start,
+                datetime_end=end,
+                store=OhlcvStore(args.store),
+                fill=not args.offline,
             )
-        elif args.strategy == STRATEGIES[4]: # AroonCrossover
-            from strategies.AroonCrossover import AroonCrossover
-            strategy = AroonCrossover(
-                  name=strat_name,
-                  broker=broker,
-                  parameters=params
-            )
-        elif args.strategy == STRATEGIES[5]: # EmaCrossover
-            from strategies.EmaCrossover import EmaCrossover
-            strategy = EmaCrossover(
-                  name=strat_name,
-                  broker=broker,
-                  parameters=params
-            )
-        elif args.strategy == STRATEGIES[6]: # VolatilityATR
-            from strategies.VolatilityATR import VolatilityATR
-            strategy = VolatilityATR(
-                  name=strat_name,
-                  broker=broker,
-                  parameters=params
-            )
-        elif args.strategy == STRATEGIES[7]: # RsiCrossover
-            from strategies.RsiCrossover import RsiCrossover
-            strategy = RsiCrossover(
-                  name=strat_name,
-                  broker=broker,
-                  parameters=params
-            )
-
+        broker = BacktestingBroker(data_source=data_source)
+        strategy = strategy_cls(
+              name=strat_name,
+              broker=broker,
+              parameters=params
+        )
 
         trader = Trader(logfile="", backtest=True)
         trader.add_strategy(strategy)
@@ -1,32 +1,60 @@
-STRATEGY_INDICES = {
-    'simple-ma-crossover': ['SimpleMACrossover' , 0],
-    'bollinger-bands': ['BollingerBands', 1],
-    'mean-reversion':['MeanReversion', 2],
-    'sentiment':['SentimentAnalysis', 3],
-    'aroon-crossover':['AroonCrossover', 4],
-    'ema-crossover':['EmaCrossover', 5],
-    'volatility-atr':['VolatilityATR', 6],
-    'rsi-crossover':['RsiCrossover', 7]
+import importlib
+
+# strategy name -> (module, class, strategy-specific CLI parameters); modules
+# are imported by load_strategy only when selected, so picking a technical
+# strategy never imports torch/transformers
+STRATEGY_REGISTRY = {
+    'simple-ma-crossover': ('strategies.SimpleMACrossover', 'SimpleMACrossover', ['long_window', 'short_window']),
+    'bollinger-bands': ('strategies.BollingerBands', 'BollingerBands', ['num_std_dev']),
+    'mean-reversion': ('strategies.MeanReversion', 'MeanReversion', ['z_threshold']),
+    'sentiment': ('strategies.SentimentAnalysis', 'SentimentAnalysis', []),
+    'aroon-crossover': ('strategies.AroonCrossover', 'AroonCrossover', []),
+    'ema-crossover': ('strategies.EmaCrossover', 'EmaCrossover', ['long_window', 'short_window']),
+    'volatility-atr': ('strategies.VolatilityATR', 'VolatilityATR', ['atr_multiplier']),
+    'rsi-crossover': ('strategies.RsiCrossover', 'RsiCrossover', ['rsi_period', 'upper_threshold', 'lower_threshold']),
 }
 
-STRATEGIES = list(STRATEGY_INDICES.keys())
+STRATEGIES = list(STRATEGY_REGISTRY.keys())
+
+# parameters each `<Strategy>Calc` takes, for portfolio mode which drives the
+# Calc directly; sentiment has no Calc
+CALC_PARAMS = {
+    'simple-ma-crossover': ['short_window', 'long_window'],
+    'bollinger-bands': ['window', 'num_std_dev'],
+    'mean-reversion': ['window', 'z_threshold'],
+    'aroon-crossover': ['window'],
+    'ema-crossover': ['short_window', 'long_window'],
+    'volatility-atr': ['window', 'atr_multiplier'],
+    'rsi-crossover': ['rsi_period', 'upper_threshold', 'lower_threshold'],
+}
+
+def load_strategy(name):
+    module, cls, _ = STRATEGY_REGISTRY[name]
+    return getattr(importlib.import_module(module), cls)
+
+def load_calc(name):
+    module, cls, _ = STRATEGY_REGISTRY[name]
+    return getattr(importlib.import_module(module), f'{cls}Calc')
 
 def build_params(args):
     parameters={
     "symbol": args.symbol,
     "window":args.window,
     "cash_at_risk":args.cash_at_risk,
-    "risk_tolerance":args.risk_tolerance
+    "risk_tolerance":args.risk_tolerance,
+    "timestep":args.timestep
     }
-    if args.strategy == STRATEGIES[0] or args.strategy == STRATEGIES[5]:
-        parameters.update({'long_window': args.long_window,
-                           'short_window': args.short_window
-                           })
-    elif args.strategy == STRATEGIES[1]:
-        parameters['num_std_dev'] = args.num_std_dev
-    elif args.strategy == STRATEGIES[7]:
-        parameters['rsi_period'] = args.rsi_period
-        parameters['upper_threshold'] = args.upper_threshold
-        parameters['lower_threshold'] = args.lower_threshold
+    for name in STRATEGY_REGISTRY[args.strategy][2]:
+        parameters[name] = getattr(args, name)
     return parameters
 
+def build_portfolio_params(args, symbols):
+    # parameters of the Portfolio strategy running `args.strategy` on `symbols`
+    params = build_params(args)
+    del params['symbol']
+    params.update({
+        'symbols': symbols,
+        'calc': load_calc(args.strategy),
+        'calc_params': {name: params[name] for name in CALC_PARAMS[args.strategy]},
+    })
+    return params
@@ -1,56 +1,114 @@
 from .tools.common import Strategy, np, pd
-from .tools.tools import position_sizing, set_vars, prnt_params
+from .tools.signals import Signal, encode_signal
+from .tools.metrics import timer, timed
+from .tools.bars import BarFeed, BarStream, sleeptime
+from .tools.tools import position_sizing, as_price_array, prnt_params, is_batch, as_price_frame, signal_matrix
+from .tools.rolling import RollingArgExtreme, rolling_argmax, rolling_argmin
+from .tools.indicator_cache import cached
 
 
 class AroonCrossoverCalc():
 
     def __init__(self, params):
         self.window = params['window']
+        self.symbol = params.get('symbol')
+        self.dtype = np.dtype(params.get('dtype', np.float64))
+        self.reset()
+
+    def reset(self):
+        self.high_max = RollingArgExtreme(self.window, 'max')
+        self.low_min = RollingArgExtreme(self.window, 'min')
 
     def get_data(self, prices: np.array) -> pd.DataFrame:
-        high_max_idx = prices.rolling(window=self.window).apply(lambda x: x.argmax(), raw=True)
-        low_min_idx = prices.rolling(window=self.window).apply(lambda x: x.argmin(), raw=True)
+        if is_batch(prices):
+            return self.get_signal_matrix(prices)
+        high_max_idx = cached(prices, 'rolling_argmax', (self.window,),
+                              lambda p: rolling_argmax(p, self.window), self.symbol)
+        low_min_idx = cached(prices, 'rolling_argmin', (self.window,),
+                             lambda p: rolling_argmin(p, self.window), self.symbol)
 
         aroon_up = (self.window - high_max_idx) * 100 / self.window
         aroon_down = (self.window - low_min_idx) * 100 / self.window
 
-        aroon_signal = np.where(aroon_up > aroon_down, "BUY", np.where(aroon_up < aroon_down, "SELL", "HOLD"))
+        aroon_signal = encode_signal(aroon_up > aroon_down, aroon_up < aroon_down)
 
         return pd.DataFrame({'Price': prices, 'Signal': aroon_signal})
 
+    def get_signal(self, prices):
+        # lean get_data: (int8 signal, price) arrays in `self.dtype`, without
+        # the DataFrame or intermediate columns
+        if is_batch(prices):
+            return np.asarray(self.get_signal_matrix(prices)), as_price_array(prices, self.dtype)
+        high_max_idx = cached(prices, 'rolling_argmax', (self.window,),
+                              lambda p: rolling_argmax(p, self.window), self.symbol)
+        low_min_idx = cached(prices, 'rolling_argmin', (self.window,),
+                             lambda p: rolling_argmin(p, self.window), self.symbol)
+        # aroon up > aroon down exactly when the high is more recent
+        signal = encode_signal(high_max_idx < low_min_idx, high_max_idx > low_min_idx)
+        return signal, as_price_array(prices, self.dtype)
+
+    def get_signal_matrix(self, prices):
+        # one vectorized pass over a (time x symbols) price matrix
+        frame = as_price_frame(prices)
+        high_max_idx = rolling_argmax(frame, self.window)
+        low_min_idx = rolling_argmin(frame, self.window)
+        aroon_up = (self.window - high_max_idx) * 100 / self.window
+        aroon_down = (self.window - low_min_idx) * 100 / self.window
+        signal = encode_signal(aroon_up > aroon_down, aroon_up < aroon_down)
+        return signal_matrix(signal, prices)
+
+    def update(self, price: float) -> Signal:
+        # streaming equivalent of get_data(...)['Signal'].iloc[-1]
+        self.high_max.push(price)
+        self.low_min.push(price)
+        aroon_up = (self.window - self.high_max.index()) * 100 / self.window
+        aroon_down = (self.window - self.low_min.index()) * 100 / self.window
+        if aroon_up > aroon_down:
+            return Signal.BUY
+        if aroon_up < aroon_down:
+            return Signal.SELL
+        return Signal.HOLD
+
 
 class AroonCrossover(Strategy):
 
     parameters = {
         "symbol": "",
         "window": 0,
+        "timestep": "day",
         "cash_at_risk": 0.0,
         "risk_tolerance": 0.0,
     }
 
     def initialize(self):
-        self.sleeptime = "1D"
+        self.sleeptime = sleeptime(self.parameters['timestep'])
+        self.history = BarFeed(self, self.parameters['symbol'], self.parameters['window'], self.parameters['timestep'])
         self.strategy = AroonCrossoverCalc(
             params = {
+                'symbol': self.parameters['symbol'],
                 'window': self.parameters['window']
             }
         )
+        # seeded from the first window, then fed only the new bars
+        self.stream = BarStream(self.strategy)
         prnt_params(self.parameters)
 
 
+    @timed('iteration')
     def on_trading_iteration(self):
-        bars = self.get_historical_prices(self.parameters['symbol'], self.parameters['window'], "day")
-        prices = bars.df['close']
-        data = self.strategy.get_data(prices)
-
-        signal, last_price = set_vars(data, 'Signal')
-        print(f"signal: {signal}")
-
-        cash = self.get_cash()
+        with timer(self, 'fetch'):
+            bars = self.history.update()
+        with timer(self, 'compute'):
+            signal = self.stream.update(bars)
+        last_price = bars.view('close')[-1]
+        print(f"signal: {signal.name}")
+
+        with timer(self, 'broker'):
+            cash = self.get_cash()
         quantity = position_sizing(cash, last_price, self.parameters['cash_at_risk'])
         print(f"Last Price: {last_price}, Quantity: {quantity}")
 
-        if signal == 'BUY':
+        if signal == Signal.BUY:
             if cash > 0 and quantity > 0:
                 # Calculate take-profit and stop-loss prices based on risk tolerance
                 take_profit_price = last_price * (1 + self.parameters['risk_tolerance'])
@@ -65,10 +123,13 @@ class AroonCrossover(Strategy):
                     take_profit_price=take_profit_price,
                     stop_loss_price=stop_loss_price
                 )
-                self.submit_order(order)
+                with timer(self, 'order'):
+                    self.submit_order(order)
             else:
                 print(f"Error: cash: {cash}, quantity: {quantity}")
-        elif signal == "SELL":
-            pos = self.get_position(self.parameters['symbol'])
+        elif signal == Signal.SELL:
+            with timer(self, 'broker'):
+                pos = self.get_position(self.parameters['symbol'])
             if pos is not None:
-                self.sell_all()
+                with timer(self, 'order'):
+                    self.sell_all()
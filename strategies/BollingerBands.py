@@ -1,80 +1,137 @@
 from .tools.common import Strategy, np, pd
-from .tools.tools import position_sizing, set_vars, prnt_params
+from .tools.signals import Signal, encode_signal
+from .tools.metrics import timer, timed
+from .tools.bars import BarFeed, BarStream, sleeptime
+from .tools.tools import position_sizing, as_price_array, prnt_params, is_batch, as_price_frame, signal_matrix
+from .tools import rolling
+from .tools.rolling import RollingMoments
+from .tools.indicator_cache import rolling_moments
 
 
 class BollingerBandsCalc():
 
+    # every row is compared against the last price of the input, so the
+    # signals depend on where the history ends (see walkforward.py)
+    causal = False
+
     def __init__(self, params):
         self.num_std_dev = params['num_std_dev']
         self.window = params['window']
+        self.symbol = params.get('symbol')
+        self.dtype = np.dtype(params.get('dtype', np.float64))
+        self.reset()
+
+    def reset(self):
+        self.roll = RollingMoments(self.window)
 
     def get_data(self, prices: np.array) -> pd.DataFrame:
+        if is_batch(prices):
+            return self.get_signal_matrix(prices)
         last_price = prices.iloc[-1]
-        rolling_mean = prices.rolling(window=self.window).mean()
-        rolling_std = prices.rolling(window=self.window).std()
-        upper_band = rolling_mean + (rolling_std * self.num_std_dev)
-        lower_band = rolling_mean - (rolling_std * self.num_std_dev)
-        signal = np.where(
-                last_price > upper_band,
-                'SELL',
-                np.where(last_price < lower_band,
-                         'BUY','HOLD'
-                         )
-        )
+        mean, std = rolling_moments(prices, self.window, self.symbol)
+        upper_band = mean + (std * self.num_std_dev)
+        lower_band = mean - (std * self.num_std_dev)
+        signal = encode_signal(last_price < lower_band, last_price > upper_band)
 
         return pd.DataFrame({'Price': prices,
-                             'RollingMean': rolling_mean,
-                             'RollingStd': rolling_std,
+                             'RollingMean': mean,
+                             'RollingStd': std,
                              'UpperBand': upper_band,
                              'LowerBand': lower_band,
                              'Signal': signal,
                             })
 
+    def get_signal(self, prices):
+        # lean get_data: (int8 signal, price) arrays in `self.dtype`, without
+        # the DataFrame or intermediate columns
+        if is_batch(prices):
+            return np.asarray(self.get_signal_matrix(prices)), as_price_array(prices, self.dtype)
+        price = as_price_array(prices, self.dtype)
+        mean, std = rolling_moments(prices, self.window, self.symbol)
+        mean = mean.to_numpy(self.dtype)
+        band = std.to_numpy(self.dtype) * self.num_std_dev
+        return encode_signal(price[-1] < mean - band, price[-1] > mean + band), price
+
+    def get_signal_matrix(self, prices):
+        # one vectorized pass over a (time x symbols) price matrix; like
+        # get_data, every row is compared against each symbol's last price
+        frame = as_price_frame(prices)
+        last_price = frame.iloc[-1].to_numpy()
+        rolling_mean, rolling_std = rolling.rolling_moments(frame.to_numpy(dtype=float), self.window)
+        upper_band = rolling_mean + (rolling_std * self.num_std_dev)
+        lower_band = rolling_mean - (rolling_std * self.num_std_dev)
+        signal = encode_signal(last_price < lower_band, last_price > upper_band)
+        return signal_matrix(signal, prices)
+
+    def update(self, price: float) -> Signal:
+        # streaming equivalent of get_data(...)['Signal'].iloc[-1]
+        self.roll.push(price)
+        rolling_mean = self.roll.mean()
+        rolling_std = self.roll.std()
+        if price > rolling_mean + (rolling_std * self.num_std_dev):
+            return Signal.SELL
+        if price < rolling_mean - (rolling_std * self.num_std_dev):
+            return Signal.BUY
+        return Signal.HOLD
+
 
 class BollingerBands(Strategy):
 
     parameters = {
         'symbol': '',
         "window": 0,
+        "timestep": "day",
         "cash_at_risk": 0.0,
         "num_std_dev": 0.0,
         "risk_tolerance": 0.0
     }
 
     def initialize(self):
+        self.sleeptime = sleeptime(self.parameters['timestep'])
+        self.history = BarFeed(self, self.parameters['symbol'], self.parameters['window'], self.parameters['timestep'])
         self.last_price = 0.0
         self.last_upper_band = None
         self.last_lower_band = None
         self.strategy = BollingerBandsCalc(
             params = {
+                'symbol': self.parameters['symbol'],
                 'num_std_dev': self.parameters['num_std_dev'],
                 'window': self.parameters['window']
             }
         )
+        # seeded from the first window, then fed only the new bars
+        self.stream = BarStream(self.strategy)
         prnt_params(self.parameters)
 
 
+    @timed('iteration')
     def on_trading_iteration(self):
-        bars = self.get_historical_prices(self.parameters['symbol'], self.parameters['window'], "day")
-        prices = bars.df['close']
+        with timer(self, 'fetch'):
+            bars = self.history.update()
 
-        if len(prices) < self.parameters['window']:
+        if len(bars) < self.parameters['window']:
             return
 
-        data = self.strategy.get_data(prices)
-        signal, last_price = set_vars(data, 'Signal')
-        last_lower_band = data['UpperBand'].iloc[-1]
-        last_upper_band = data['LowerBand'].iloc[-1]
+        with timer(self, 'compute'):
+            signal = self.stream.update(bars)
+        last_price = bars.view('close')[-1]
+        # the bands of the streaming state after the newest bar
+        mean, std = self.strategy.roll.mean(), self.strategy.roll.std()
+        last_upper_band = mean + std * self.parameters['num_std_dev']
+        last_lower_band = mean - std * self.parameters['num_std_dev']
 
-        cash = self.get_cash()
+        with timer(self, 'broker'):
+            cash = self.get_cash()
         quantity = position_sizing(cash, last_price, self.parameters['cash_at_risk'])
         print(f"{'':<4}Last Price: {last_price}, Quantity: {quantity}, UB: {last_upper_band}, LB: {last_lower_band}")
 
-        if signal == 'SELL':
-            pos = self.get_position(self.parameters['symbol'])
+        if signal == Signal.SELL:
+            with timer(self, 'broker'):
+                pos = self.get_position(self.parameters['symbol'])
             if pos is not None:
-                self.sell_all()
-        elif (signal == 'BUY') and (cash > 0) and (quantity > 0):
+                with timer(self, 'order'):
+                    self.sell_all()
+        elif (signal == Signal.BUY) and (cash > 0) and (quantity > 0):
             take_profit_price = last_price * (1 + self.parameters['risk_tolerance'])
             stop_loss_price = last_price * (1 - self.parameters['risk_tolerance'])
             order = self.create_order(
@@ -85,4 +142,5 @@ class BollingerBands(Strategy):
                     take_profit_price=take_profit_price,
                     stop_loss_price=stop_loss_price
                 )
-            self.submit_order(order)
+            with timer(self, 'order'):
+                self.submit_order(order)
@@ -4,16 +4,28 @@ from lumibot.strategies.strategy import Strategy
 from lumibot.traders import Trader
 from datetime import datetime, timedelta
 from alpaca_trade_api import REST
-from finbert_utils import estimate_sentiment
-import pandas as pd
-import numpy as np
-from config import ALPACA_CONFIG
+from .tools.finbert_utils import estimate_sentiment
+from .tools.bars import BarFeed
+from .tools.pipeline import Pipeline, Source, SMA, Std, Sentiment
+from .tools.config import ALPACA_CONFIG
 import argparse
 
+# sentiment plus the mean-reversion z-score as one indicator pipeline; the
+# combined score is a node too, so the weights live here
+close = Source('close')
+z_score = (close - SMA(close, 21)) / Std(close, 20)
+PIPELINE = Pipeline({
+    'z_score': z_score,
+    # sentiment weight 0.4, mean-reversion BUY (z < -2) weight 0.6
+    'score': 0.4 * Sentiment() + 0.6 * (z_score < -2),
+})
+
 class BotTrader(Strategy):
     def initialize(self, symbol:str="TSLA", cash_at_risk:float=.5):
         self.symbol = symbol
         self.sleeptime = "1H"
+        # 200 daily bars, topped up with only the newest bar each hour
+        self.history = BarFeed(self, self.symbol, 200, "day")
         self.last_trade = None
         self.cash_at_risk = cash_at_risk
         self.api = REST(base_url=ALPACA_CONFIG['ENDPOINT'],\
@@ -40,61 +52,34 @@ class BotTrader(Strategy):
         probability, sentiment = estimate_sentiment(news)
         return probability, sentiment
 
-    def get_mean_reversion_signal(self):
+    def get_combined_score(self, sentiment_probability, sentiment):
         # Fetch historical data
-        bars = self.get_historical_prices(self.symbol, 200, "day")  # Fetch 200-day historical data
-        df = bars.df
-
-        # Calculate moving averages
-        df['9-day'] = df['close'].rolling(9).mean()
-        df['21-day'] = df['close'].rolling(21).mean()
-
-        # Calculate the standard deviation
-        df['std'] = df['close'].rolling(window=20).std()
-
-        # Calculate the Z-score
-        df['z_score'] = (df['close'] - df['21-day']) / df['std']
-
-        # Define the trading signals
-        df['signal'] = np.where(df['z_score'] < -2, "BUY", np.where(df['z_score'] > 2, "SELL", "HOLD"))
-
-        # Get the latest signal
-        latest_signal = df['signal'].iloc[-1]
-        print(latest_signal)
+        bars = self.history.update()
 
-        if latest_signal == -1:
-            return "SELL"
-        elif latest_signal == 1:
-            return "BUY"
+        # signed sentiment score, constant over the history
+        if sentiment == 'positive':
+            sentiment_score = 1
+        elif sentiment == 'negative':
+            sentiment_score = -1
         else:
-            return "HOLD"
-
+            sentiment_score = 0
+        frame = bars.frame().assign(sentiment=sentiment_probability * sentiment_score)
+        # shares the rolling mean/std with other strategies on this symbol
+        return PIPELINE.run(frame, symbol=self.symbol).iloc[-1]
 
     def on_trading_iteration(self):
         # Get sentiment analysis
         sentiment_probability, sentiment = self.get_sentiment()
 
-        # Get mean reversion signal
-        mean_reversion_signal = self.get_mean_reversion_signal()
-
-        # Weighting and decision rules
-        sentiment_weight = 0.4
-        mean_reversion_weight = 0.6
+        latest = self.get_combined_score(sentiment_probability, sentiment)
+        print(f"z-score: {latest['z_score']}")
 
         # Define dynamic thresholds
         buy_threshold = self.buy_threshold
         sell_threshold = self.sell_threshold
         risk_tolerance = 0.05  # 5% risk tolerance
 
-        # Calculate combined score
-        if sentiment == 'positive':
-            sentiment_score = 1
-        elif sentiment == 'negative':
-            sentiment_score = -1
-        else:
-            sentiment_score = 0
-
-        combined_score = (sentiment_weight * sentiment_probability * sentiment_score) + (mean_reversion_weight * (mean_reversion_signal == "BUY"))
+        combined_score = latest['score']
         print(f'combined score: {combined_score}')
 
         # Execute final trading decision based on the combined signal and dynamic thresholds
@@ -127,12 +112,13 @@ class BotTrader(Strategy):
             self.last_trade = "HOLD"
 
 
-parser = argparse.ArgumentParser(description='Process arguments.')
-parser.add_argument('--trade', action='store_true', help='Specify whether to enable trading')
-parser.add_argument('--symbol', type=str, default='AAPL', help='Specify ticker symbol')
-args = parser.parse_args()
-
 if __name__ == "__main__":
+    # python -m strategies.Combined [--trade] [--symbol AAPL]
+    parser = argparse.ArgumentParser(description='Process arguments.')
+    parser.add_argument('--trade', action='store_true', help='Specify whether to enable trading')
+    parser.add_argument('--symbol', type=str, default='AAPL', help='Specify ticker symbol')
+    args = parser.parse_args()
+
     broker = Alpaca(ALPACA_CONFIG)
     strategy = BotTrader(name='mlstrat',
               broker=broker,
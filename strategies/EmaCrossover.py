@@ -1,33 +1,79 @@
 from .tools.common import Strategy, np, pd
-from .tools.tools import position_sizing, set_vars, prnt_params
+from .tools.signals import Signal, encode_signal
+from .tools.metrics import timer, timed
+from .tools.bars import BarFeed, BarStream, sleeptime
+from .tools.tools import position_sizing, as_price_array, prnt_params, is_batch, as_price_frame, signal_matrix
+from .tools.rolling import Ewm
+from .tools.indicator_cache import ewm_mean
 
 
 class EmaCrossoverCalc():
 
+    # the EMAs are seeded from the first price of the input, so the
+    # signals depend on where the window starts (see bars.BarStream)
+    recursive = True
+
     def __init__(self, params):
         self.short_window = params['short_window']
         self.long_window = params['long_window']
+        self.symbol = params.get('symbol')
+        self.dtype = np.dtype(params.get('dtype', np.float64))
+        self.reset()
+
+    def reset(self):
+        self.ema_x = Ewm(self.short_window, adjust=False)
+        self.ema_y = Ewm(self.long_window, adjust=False)
 
     def get_data(self, prices: np.array) -> pd.DataFrame:
-        ema_x = prices.ewm(span=self.short_window, adjust=False).mean()
-        ema_y = prices.ewm(span=self.long_window, adjust=False).mean()
+        if is_batch(prices):
+            return self.get_signal_matrix(prices)
+        ema_x = ewm_mean(prices, self.short_window, adjust=False, symbol=self.symbol)
+        ema_y = ewm_mean(prices, self.long_window, adjust=False, symbol=self.symbol)
 
         # The 'span' parameter specifies the number of periods over which the exponential decay factor is applied.
         # A larger span will give more weight to recent observations, while a smaller span will give more weight to older observations.
 
         # The 'adjust' parameter determines whether to divide by the decaying adjustment factor.
         # Setting it to True scales the result by the decaying adjustment factor to account for the varying number of observations in each window.
-        crossover_signal = np.where(ema_x > ema_y, 'BUY', np.where(ema_x < ema_y, 'SELL', 'HOLD'))
+        crossover_signal = encode_signal(ema_x > ema_y, ema_x < ema_y)
         return pd.DataFrame({
             'Price': prices,
             'Signal': crossover_signal
         })
 
+    def get_signal(self, prices):
+        # lean get_data: (int8 signal, price) arrays in `self.dtype`, without
+        # the DataFrame or intermediate columns
+        if is_batch(prices):
+            return np.asarray(self.get_signal_matrix(prices)), as_price_array(prices, self.dtype)
+        ema_x = ewm_mean(prices, self.short_window, adjust=False, symbol=self.symbol).to_numpy(self.dtype)
+        ema_y = ewm_mean(prices, self.long_window, adjust=False, symbol=self.symbol).to_numpy(self.dtype)
+        return encode_signal(ema_x > ema_y, ema_x < ema_y), as_price_array(prices, self.dtype)
+
+    def get_signal_matrix(self, prices):
+        # one vectorized pass over a (time x symbols) price matrix
+        frame = as_price_frame(prices)
+        ema_x = frame.ewm(span=self.short_window, adjust=False).mean()
+        ema_y = frame.ewm(span=self.long_window, adjust=False).mean()
+        signal = encode_signal(ema_x > ema_y, ema_x < ema_y)
+        return signal_matrix(signal, prices)
+
+    def update(self, price: float) -> Signal:
+        # streaming equivalent of get_data(...)['Signal'].iloc[-1]
+        ema_x = self.ema_x.push(price)
+        ema_y = self.ema_y.push(price)
+        if ema_x > ema_y:
+            return Signal.BUY
+        if ema_x < ema_y:
+            return Signal.SELL
+        return Signal.HOLD
+
 class EmaCrossover(Strategy):
 
     parameters = {
         "symbol": "",
         'window': 0,
+        'timestep': 'day',
         'short_window' : 0,
         'long_window' : 0,
         "cash_at_risk": 0.0,
@@ -35,25 +81,32 @@ class EmaCrossover(Strategy):
     }
 
     def initialize(self):
+        self.sleeptime = sleeptime(self.parameters['timestep'])
+        self.history = BarFeed(self, self.parameters['symbol'], self.parameters['window'], self.parameters['timestep'])
         self.strategy = EmaCrossoverCalc(
             params = {
+                'symbol': self.parameters['symbol'],
                 'short_window': self.parameters['short_window'],
                 'long_window': self.parameters['long_window']
             }
         )
+        # seeded from the first window, then fed only the new bars
+        self.stream = BarStream(self.strategy)
         prnt_params(self.parameters)
 
+    @timed('iteration')
     def on_trading_iteration(self):
-        bars = self.get_historical_prices(self.parameters['symbol'],
-                                          self.parameters['window'], "day")
-        prices = bars.df['close']
-        data = self.strategy.get_data(prices)
-        signal, last_price = set_vars(data, 'Signal')
-        print(f"{'':<4}{signal}")
-
-        cash = self.get_cash()
+        with timer(self, 'fetch'):
+            bars = self.history.update()
+        with timer(self, 'compute'):
+            signal = self.stream.update(bars)
+        last_price = bars.view('close')[-1]
+        print(f"{'':<4}{signal.name}")
+
+        with timer(self, 'broker'):
+            cash = self.get_cash()
         quantity = position_sizing(cash, last_price, self.parameters['cash_at_risk'])
-        if signal == 'BUY':
+        if signal == Signal.BUY:
             if cash > 0 and quantity > 0:
                 # Calculate take-profit and stop-loss prices based on risk tolerance
                 take_profit_price = last_price * (1 + self.parameters['risk_tolerance'])
@@ -68,10 +121,13 @@ class EmaCrossover(Strategy):
                     take_profit_price=take_profit_price,
                     stop_loss_price=stop_loss_price
                 )
-                self.submit_order(order)
+                with timer(self, 'order'):
+                    self.submit_order(order)
             else:
                 print(f"Error: cash: {cash}, quantity: {quantity}")
-        elif signal == 'SELL':
-            pos = self.get_position(self.parameters['symbol'])
+        elif signal == Signal.SELL:
+            with timer(self, 'broker'):
+                pos = self.get_position(self.parameters['symbol'])
             if pos is not None:
-                self.sell_all()
+                with timer(self, 'order'):
+                    self.sell_all()
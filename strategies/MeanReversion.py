@@ -1,5 +1,11 @@
 from .tools.common import Strategy, np, pd
-from .tools.tools import position_sizing, set_vars, prnt_params
+from .tools.signals import Signal, encode_signal
+from .tools.metrics import timer, timed
+from .tools.bars import BarFeed, BarStream, sleeptime
+from .tools.tools import position_sizing, as_price_array, prnt_params, is_batch, as_price_frame, signal_matrix
+from .tools import rolling
+from .tools.rolling import RollingMoments
+from .tools.indicator_cache import rolling_moments
 
 
 class MeanReversionCalc():
@@ -7,52 +13,98 @@ class MeanReversionCalc():
     def __init__(self, params):
         self.window = params['window']
         self.z_threshold = params['z_threshold']
+        self.symbol = params.get('symbol')
+        self.dtype = np.dtype(params.get('dtype', np.float64))
+        self.reset()
+
+    def reset(self):
+        self.roll = RollingMoments(self.window)
 
     def get_data(self, prices: np.array) -> pd.DataFrame:
-        rolling_mean = prices.rolling(window=self.window).mean()
-        rolling_std = prices.rolling(window=self.window).std()
+        if is_batch(prices):
+            return self.get_signal_matrix(prices)
+        mean, std = rolling_moments(prices, self.window, self.symbol)
 
         # Calculate the Z-score
-        z_score = (prices - rolling_mean) / rolling_std
+        z_score = (prices - mean) / std
 
         # Define the trading signals
-        signal = np.where(z_score < -self.z_threshold, "BUY", np.where(z_score > self.z_threshold, "SELL", "HOLD"))
+        signal = encode_signal(z_score < -self.z_threshold, z_score > self.z_threshold)
 
         return pd.DataFrame({'Price': prices, 'Signal': signal})
 
+    def get_signal(self, prices):
+        # lean get_data: (int8 signal, price) arrays in `self.dtype`, without
+        # the DataFrame or intermediate columns
+        if is_batch(prices):
+            return np.asarray(self.get_signal_matrix(prices)), as_price_array(prices, self.dtype)
+        price = as_price_array(prices, self.dtype)
+        mean, std = rolling_moments(prices, self.window, self.symbol)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_score = (price - mean.to_numpy(self.dtype)) / std.to_numpy(self.dtype)
+        return encode_signal(z_score < -self.z_threshold, z_score > self.z_threshold), price
+
+    def get_signal_matrix(self, prices):
+        # one vectorized pass over a (time x symbols) price matrix
+        frame = as_price_frame(prices)
+        values = frame.to_numpy(dtype=float)
+        mean, std = rolling.rolling_moments(values, self.window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_score = (values - mean) / std
+        signal = encode_signal(z_score < -self.z_threshold, z_score > self.z_threshold)
+        return signal_matrix(signal, prices)
+
+    def update(self, price: float) -> Signal:
+        # streaming equivalent of get_data(...)['Signal'].iloc[-1]
+        self.roll.push(price)
+        z_score = self.roll.zscore(price)
+        if z_score < -self.z_threshold:
+            return Signal.BUY
+        if z_score > self.z_threshold:
+            return Signal.SELL
+        return Signal.HOLD
+
 
 class MeanReversion(Strategy):
 
     parameters = {
         "symbol": "",
         "window": 0,
+        "timestep": "day",
         "cash_at_risk": 0.0,
         "risk_tolerance": 0.0,
         "z_threshold": 1.5
     }
 
     def initialize(self):
-        self.sleeptime = "1D"
+        self.sleeptime = sleeptime(self.parameters['timestep'])
+        self.history = BarFeed(self, self.parameters['symbol'], self.parameters['window'], self.parameters['timestep'])
         self.strategy = MeanReversionCalc(
             params = {
+                'symbol': self.parameters['symbol'],
                 'window': self.parameters['window'],
                 'z_threshold': self.parameters['z_threshold']
             }
         )
+        # seeded from the first window, then fed only the new bars
+        self.stream = BarStream(self.strategy)
         prnt_params(self.parameters)
 
+    @timed('iteration')
     def on_trading_iteration(self):
-        bars = self.get_historical_prices(self.parameters['symbol'], self.parameters['window'], "day")
-        prices = bars.df['close']
-        data = self.strategy.get_data(prices)
-        signal, last_price = set_vars(data, 'Signal')
-        print(f"{'':<4}{signal}")
+        with timer(self, 'fetch'):
+            bars = self.history.update()
+        with timer(self, 'compute'):
+            signal = self.stream.update(bars)
+        last_price = bars.view('close')[-1]
+        print(f"{'':<4}{signal.name}")
 
-        cash = self.get_cash()
+        with timer(self, 'broker'):
+            cash = self.get_cash()
         quantity = position_sizing(cash, last_price, self.parameters['cash_at_risk'])
         print(f"Last Price: {last_price}, Quantity: {quantity}")
 
-        if signal == 'BUY':
+        if signal == Signal.BUY:
             if cash > 0 and quantity > 0:
                 # Calculate take-profit and stop-loss prices based on risk tolerance
                 take_profit_price = last_price * (1 + self.parameters['risk_tolerance'])
@@ -67,10 +119,13 @@ class MeanReversion(Strategy):
                     take_profit_price=take_profit_price,
                     stop_loss_price=stop_loss_price
                 )
-                self.submit_order(order)
+                with timer(self, 'order'):
+                    self.submit_order(order)
             else:
                 print(f"Error: cash: {cash}, quantity: {quantity}")
-        elif signal == "SELL":
-            pos = self.get_position(self.parameters['symbol'])
+        elif signal == Signal.SELL:
+            with timer(self, 'broker'):
+                pos = self.get_position(self.parameters['symbol'])
             if pos is not None:
-                self.sell_all()
+                with timer(self, 'order'):
+                    self.sell_all()
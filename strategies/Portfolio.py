@@ -0,0 +1,96 @@
+from .tools.common import Strategy, np, pd
+from .tools.signals import Signal
+from .tools.metrics import timer, timed
+from .tools.bars import BarFeed, sleeptime
+from .tools.tools import position_sizing, prnt_params
+from .VolatilityATR import VolatilityATRCalc
+
+
+class Portfolio(Strategy):
+
+    """
+    Runs one Calc over many symbols in a single strategy: each iteration
+    fetches the newest bars of every symbol with one
+    get_historical_prices_for_assets call into per-symbol ring buffers
+    (BarFeed), computes the signal matrix for all symbols in one batched get_data
+    call, and submits the resulting orders together.
+
+    `calc` is the `*Calc` class and `calc_params` its parameters; see
+    param_helper.build_portfolio_params.
+    """
+
+    parameters = {
+        "symbols": [],
+        "window": 0,
+        "timestep": "day",
+        "cash_at_risk": 0.0,
+        "risk_tolerance": 0.0,
+        "calc": None,
+        "calc_params": {},
+    }
+
+    def initialize(self):
+        self.sleeptime = sleeptime(self.parameters['timestep'])
+        self.history = BarFeed(self, self.parameters['symbols'], self.parameters['window'], self.parameters['timestep'])
+        self.strategy = self.parameters['calc'](params=self.parameters['calc_params'])
+        prnt_params(self.parameters)
+
+    def get_price_frame(self, buffers):
+        # wide (time x symbols) closes, or (field, symbol) columns for ATR,
+        # from the BarBuffer of each symbol
+        buffers = {s: b for s, b in buffers.items() if len(b)}
+        if isinstance(self.strategy, VolatilityATRCalc):
+            return pd.concat({s: b.frame(['high', 'low', 'close']) for s, b in buffers.items()},
+                             axis=1).swaplevel(axis=1)
+        return pd.DataFrame({s: b.series('close') for s, b in buffers.items()})
+
+    @timed('iteration')
+    def on_trading_iteration(self):
+        with timer(self, 'fetch', symbol='*'):
+            buffers = self.history.update()
+        prices = self.get_price_frame(buffers)
+        if prices.empty:
+            return
+
+        with timer(self, 'compute', symbol='*'):
+            signals = self.strategy.get_data(prices).iloc[-1]
+        closes = prices['close'] if isinstance(prices.columns, pd.MultiIndex) else prices
+        last_prices = closes.ffill().iloc[-1]
+
+        buys = [s for s in signals.index if signals[s] == Signal.BUY and np.isfinite(last_prices[s])]
+        sells = [s for s in signals.index if signals[s] == Signal.SELL]
+        print(f"{'':<4}BUY: {len(buys)} SELL: {len(sells)} HOLD: {len(signals) - len(buys) - len(sells)}")
+
+        orders = []
+        with timer(self, 'broker', symbol='*'):
+            cash = self.get_cash()
+            held = {p.asset.symbol: p for p in self.get_positions() if p.quantity > 0}
+        for symbol in sells:
+            if symbol in held:
+                orders.append(self.create_order(symbol, held[symbol].quantity, side="sell"))
+
+        for symbol in buys:
+            if cash <= 0:
+                break
+            last_price = last_prices[symbol]
+            quantity = position_sizing(cash, last_price, self.parameters['cash_at_risk'])
+            if quantity > 0:
+                orders.append(self.create_order(
+                    symbol,
+                    quantity,
+                    side="buy",
+                    type="bracket",
+                    take_profit_price=last_price * (1 + self.parameters['risk_tolerance']),
+                    stop_loss_price=last_price * (1 - self.parameters['risk_tolerance'])
+                ))
+                # later buys in the same iteration size against the cash left
+                cash -= quantity * last_price
+
+        with timer(self, 'order', symbol='*'):
+            closing = set(sells) & set(held)
+            open_orders = [o for o in self.get_orders() if o.asset.symbol in closing]
+            if open_orders:
+                # drop the brackets of positions being closed
+                self.cancel_orders(open_orders)
+            if orders:
+                self.submit_orders(orders)
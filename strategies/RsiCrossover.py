@@ -1,18 +1,47 @@
 from .tools.common import Strategy, Trader, np, pd
-from .tools.tools import position_sizing, set_vars, prnt_params
+from .tools.signals import Signal, encode_signal
+from .tools.metrics import timer, timed
+from .tools.bars import BarFeed, BarStream, sleeptime
+from .tools.tools import position_sizing, as_price_array, prnt_params, is_batch, as_price_frame, signal_matrix
+from .tools.rolling import Ewm
+from .tools.indicator_cache import cached
 
 
 class RsiCrossoverCalc():
 
+    # Wilder's averages are seeded from the first prices of the input, so
+    # the signals depend on where the window starts (see bars.BarStream)
+    recursive = True
+
     def __init__(self, params):
         self.rsi_period = params['rsi_period']
         self.upper_threshold = params['upper_threshold']
         self.lower_threshold = params['lower_threshold']
+        self.symbol = params.get('symbol')
+        self.dtype = np.dtype(params.get('dtype', np.float64))
+        self.reset()
+
+    def reset(self):
+        self.ewm_gain = Ewm(self.rsi_period, min_periods=self.rsi_period)
+        self.ewm_loss = Ewm(self.rsi_period, min_periods=self.rsi_period)
+        self.prev_price = None
 
     def get_data(self, prices: np.array) -> pd.DataFrame:
-        data = pd.DataFrame({'Price': prices})
+        if is_batch(prices):
+            return self.get_signal_matrix(prices)
+        rsi = cached(prices, 'rsi', (self.rsi_period,), self.rsi_frame, self.symbol)
+        data = pd.concat([pd.DataFrame({'Price': prices}), rsi], axis=1)
+        # When the RSI is above the upper threshold, it suggests that the market is overbought, and it may be a good time to sell.
+
+        # When the RSI is below the lower threshold, it suggests that the market is oversold, and it may be a good time to buy
+        data['Signal'] = encode_signal(data['RSI'] < self.lower_threshold, data['RSI'] > self.upper_threshold)
+        return data
+
+    def rsi_frame(self, prices) -> pd.DataFrame:
+        # the RSI and its intermediate columns, cached per symbol and bar
+        data = pd.DataFrame(index=prices.index)
         # Calculate the day-to-day price difference (change)
-        data['delta'] = data['Price'].diff(1)
+        data['delta'] = prices.diff(1)
         # Keep positive changes as gains, replace negative changes with 0
         # if the value in the delta is not > 0 then set to 0; fill the NA with 0s
         data['gain'] = (data['delta'].where(data['delta'] > 0, 0)).fillna(0)
@@ -22,51 +51,93 @@ class RsiCrossoverCalc():
         data['ewm_loss'] = data['loss'].ewm(span=self.rsi_period, min_periods=self.rsi_period).mean()  # Calculate the average loss over the RSI period
         data['rs'] = data['ewm_gain'] / data['ewm_loss']  # Compute the Relative Strength (RS) value
         data['RSI'] = 100 - (100 / (1 + data['rs']))  # Calculate the Relative Strength Index (RSI) value
-        # When the RSI is above the upper threshold, it suggests that the market is overbought, and it may be a good time to sell.
-
-        # When the RSI is below the lower threshold, it suggests that the market is oversold, and it may be a good time to buy
-        data['Signal'] = np.where(
-            data['RSI'] > self.upper_threshold,
-            'SELL',
-            np.where(
-                data['RSI'] < self.lower_threshold,
-                'BUY',
-                'HOLD'
-            )
-        )
         return data
 
+    def get_signal(self, prices):
+        # lean get_data: (int8 signal, price) arrays in `self.dtype`, without
+        # the DataFrame or intermediate columns
+        if is_batch(prices):
+            return np.asarray(self.get_signal_matrix(prices)), as_price_array(prices, self.dtype)
+        rsi = cached(prices, 'rsi_values', (self.rsi_period,), self.rsi_values, self.symbol).astype(self.dtype, copy=False)
+        return encode_signal(rsi < self.lower_threshold, rsi > self.upper_threshold), as_price_array(prices, self.dtype)
+
+    def rsi_values(self, prices) -> np.ndarray:
+        # the RSI column of rsi_frame alone, without the other columns
+        delta = np.diff(np.asarray(prices, dtype=float), prepend=np.nan)
+        gain = pd.Series(np.where(delta > 0, delta, 0.0)).ewm(span=self.rsi_period, min_periods=self.rsi_period).mean()
+        loss = pd.Series(np.where(delta < 0, -delta, 0.0)).ewm(span=self.rsi_period, min_periods=self.rsi_period).mean()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 100 - (100 / (1 + gain.to_numpy() / loss.to_numpy()))
+
+    def get_signal_matrix(self, prices):
+        # one vectorized pass over a (time x symbols) price matrix
+        frame = as_price_frame(prices)
+        delta = frame.diff(1)
+        gain = delta.where(delta > 0, 0).fillna(0)
+        loss = (-delta.where(delta < 0, 0)).fillna(0)
+        ewm_gain = gain.ewm(span=self.rsi_period, min_periods=self.rsi_period).mean()
+        ewm_loss = loss.ewm(span=self.rsi_period, min_periods=self.rsi_period).mean()
+        rsi = 100 - (100 / (1 + ewm_gain / ewm_loss))
+        signal = encode_signal(rsi < self.lower_threshold, rsi > self.upper_threshold)
+        return signal_matrix(signal, prices)
+
+    def update(self, price: float) -> Signal:
+        # streaming equivalent of get_data(...)['Signal'].iloc[-1]
+        delta = 0.0 if self.prev_price is None else price - self.prev_price
+        self.prev_price = price
+        ewm_gain = self.ewm_gain.push(max(delta, 0.0))
+        ewm_loss = self.ewm_loss.push(max(-delta, 0.0))
+        if ewm_loss == 0:
+            rsi = 100.0 if ewm_gain > 0 else float('nan')
+        else:
+            rsi = 100 - (100 / (1 + ewm_gain / ewm_loss))
+        if rsi > self.upper_threshold:
+            return Signal.SELL
+        if rsi < self.lower_threshold:
+            return Signal.BUY
+        return Signal.HOLD
+
 
 class RsiCrossover(Strategy):
 
     parameters = {
         'symbol': '',
         "window": 0,
+        "timestep": "day",
         'risk_tolerance': 0.0,
         'cash_at_risk': 0.0,
+        'rsi_period': 0,
         'upper_threshold': 0,
         'lower_threshold': 0,
     }
 
     def initialize(self):
-        self.sleeptime = "1D"
+        self.sleeptime = sleeptime(self.parameters['timestep'])
+        self.history = BarFeed(self, self.parameters['symbol'], self.parameters['window'], self.parameters['timestep'])
         self.strategy = RsiCrossoverCalc(
             params = {
-                'rsi_period': self.parameters['short_window'],
+                'symbol': self.parameters['symbol'],
+                'rsi_period': self.parameters['rsi_period'],
                 'upper_threshold': self.parameters['upper_threshold'],
                 'lower_threshold': self.parameters['lower_threshold'],
             }
         )
+        # seeded from the first window, then fed only the new bars
+        self.stream = BarStream(self.strategy)
         prnt_params(self.parameters)
 
+    @timed('iteration')
     def on_trading_iteration(self):
-        bars = self.get_historical_prices(self.parameters['symbol'], self.parameters['window'], "day")
-        data = self.strategy.get_data(bars.df['close'])
-        signal, last_price = set_vars(data, 'Signal')
-        print(f"{'':<4}{signal}")
+        with timer(self, 'fetch'):
+            bars = self.history.update()
+        with timer(self, 'compute'):
+            signal = self.stream.update(bars)
+        last_price = bars.view('close')[-1]
+        print(f"{'':<4}{signal.name}")
 
-        if signal == 'BUY':
-            cash = self.get_cash()
+        if signal == Signal.BUY:
+            with timer(self, 'broker'):
+                cash = self.get_cash()
             quantity = position_sizing(cash, last_price, self.parameters['cash_at_risk'])
             if (cash > 0) and (quantity > 0):
                 take_profit_price = last_price * (1 + self.parameters['risk_tolerance'])
@@ -79,9 +150,12 @@ class RsiCrossover(Strategy):
                         take_profit_price=take_profit_price,
                         stop_loss_price=stop_loss_price
                 )
-                self.submit_order(order)
+                with timer(self, 'order'):
+                    self.submit_order(order)
 
-        elif signal == 'SELL':
-            pos = self.get_position(self.parameters['symbol'])
+        elif signal == Signal.SELL:
+            with timer(self, 'broker'):
+                pos = self.get_position(self.parameters['symbol'])
             if pos is not None:
-                self.sell_all()
+                with timer(self, 'order'):
+                    self.sell_all()
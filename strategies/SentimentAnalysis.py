@@ -1,9 +1,10 @@
 from .tools.common import Strategy, np, pd
 from datetime import timedelta
+from .tools.metrics import timer, timed
 from .tools.tools import position_sizing
 from .tools.finbert_utils import estimate_sentiment
 from .tools.config import ALPACA_CONFIG
-from alpaca_trade_api import REST
+from .tools.news import NewsClient
 
 class SentimentAnalysis(Strategy):
 
@@ -18,35 +19,40 @@ class SentimentAnalysis(Strategy):
         self.sleeptime = "1H"
         self.last_trade = None
         self.probability_threshold = 0.9
-        self.api = REST(base_url=ALPACA_CONFIG['BASE_URL'],\
-                        key_id=ALPACA_CONFIG['API_KEY'],\
-                        secret_key=ALPACA_CONFIG['API_SECRET'])
+        # pooled, incrementally cached news; $ALGOTRADE_NEWS_URL can point
+        # at a LocalNewsServer for offline backtests
+        self.news = NewsClient(key_id=ALPACA_CONFIG['API_KEY'],\
+                               secret_key=ALPACA_CONFIG['API_SECRET'])
 
     def get_dates(self):
         today = self.get_datetime()
         three_days_prior = today - timedelta(days=3)
-        return today.strftime('%Y-%m-%d'), three_days_prior.strftime('%Y-%m-%d')
+        return today, three_days_prior
 
     def get_sentiment(self):
         today, three_days_prior = self.get_dates()
-        news = self.api.get_news(symbol=self.parameters['symbol'], start=three_days_prior, end=today)
-        news = [ev.__dict__["_raw"]["headline"] for ev in news]
-        probability, sentiment = estimate_sentiment(news)
+        with timer(self, 'fetch'):
+            news = self.news.get_headlines(self.parameters['symbol'], three_days_prior, today)
+        with timer(self, 'compute'):
+            probability, sentiment = estimate_sentiment(news)
         print(f'sentiment: {sentiment}; probability: {probability:.2f}')
         return probability, sentiment
 
+    @timed('iteration')
     def on_trading_iteration(self):
         probability, sentiment = self.get_sentiment()
 
-        cash = self.get_cash()
-        last_price = self.get_last_price(self.parameters['symbol'])
+        with timer(self, 'broker'):
+            cash = self.get_cash()
+            last_price = self.get_last_price(self.parameters['symbol'])
         quantity = position_sizing(cash, last_price, self.parameters['cash_at_risk'])
         if cash > last_price:
             take_profit_price = last_price * (1 + self.parameters['risk_tolerance'])
             stop_loss_price = last_price * (1 - self.parameters['risk_tolerance'])
             if sentiment == "positive" and probability > self.probability_threshold:
                 if self.last_trade == "SELL":
-                    self.sell_all()
+                    with timer(self, 'order'):
+                        self.sell_all()
                 order = self.create_order(
                     self.parameters['symbol'],
                     quantity,
@@ -55,11 +61,13 @@ class SentimentAnalysis(Strategy):
                     take_profit_price=take_profit_price,
                     stop_loss_price=stop_loss_price
                 )
-                self.submit_order(order)
+                with timer(self, 'order'):
+                    self.submit_order(order)
                 self.last_trade = "BUY"
             elif sentiment == "negative" and probability > self.probability_threshold:
                 if self.last_trade == "BUY":
-                    self.sell_all()
+                    with timer(self, 'order'):
+                        self.sell_all()
                 order = self.create_order(
                     self.parameters['symbol'],
                     quantity,
@@ -68,5 +76,6 @@ class SentimentAnalysis(Strategy):
                     take_profit_price=take_profit_price,
                     stop_loss_price=stop_loss_price
                 )
-                self.submit_order(order)
+                with timer(self, 'order'):
+                    self.submit_order(order)
                 self.last_trade = "SELL"
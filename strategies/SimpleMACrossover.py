@@ -1,40 +1,87 @@
 from .tools.common import Strategy, Trader, np, pd
-from .tools.tools import position_sizing, set_vars, prnt_params
+from .tools.signals import Signal, encode_signal
+from .tools.metrics import timer, timed
+from .tools.bars import BarFeed, BarStream, sleeptime
+from .tools.tools import position_sizing, as_price_array, prnt_params, is_batch, as_price_frame, signal_matrix
+from .tools.rolling import RollingWindow
+from .tools.indicator_cache import rolling_mean
 
 class SimpleMACrossoverCalc:
 
     def __init__(self, params):
         self.short_window = params['short_window']
         self.long_window = params['long_window']
+        self.symbol = params.get('symbol')
+        self.dtype = np.dtype(params.get('dtype', np.float64))
         self.data = None
+        self.reset()
+
+    def reset(self):
+        self.short_roll = RollingWindow(self.short_window)
+        self.long_roll = RollingWindow(self.long_window)
+        self.prev_short_ma = float('nan')
+        self.prev_long_ma = float('nan')
 
     def get_data(self, prices: np.array) -> pd.DataFrame:
+        if is_batch(prices):
+            return self.get_signal_matrix(prices)
         data = pd.DataFrame({'Price': prices})
-        data['short_ma'] = data['Price'].rolling(self.short_window).mean()
-        data['long_ma'] = data['Price'].rolling(self.long_window).mean()
+        data['short_ma'] = rolling_mean(prices, self.short_window, self.symbol)
+        data['long_ma'] = rolling_mean(prices, self.long_window, self.symbol)
         # Buy condition: short moving average crosses above long moving average
         buy_condition = (data['short_ma'] > data['long_ma'])
         # Sell condition: short moving average crosses below long moving average
-        sell_condition = (buy_condition) & (buy_condition.shift(1) == False)
-        hold_condition = ~(buy_condition | sell_condition)
-
         sell_condition = (data['short_ma'] < data['long_ma']) & (data['short_ma'].shift(1) >= data['long_ma'].shift(1))
 
-        # Hold condition: neither buy nor sell condition is met
-        hold_condition = ~(buy_condition | sell_condition)
-        data['Signal'] = ''
-        data.loc[buy_condition, 'Signal'] = 'BUY'
-        data.loc[sell_condition, 'Signal'] = 'SELL'
-        data.loc[hold_condition, 'Signal'] = 'HOLD'
+        # Hold: neither buy nor sell condition is met
+        data['Signal'] = encode_signal(buy_condition, sell_condition)
         self.data = data
         return data
 
+    def get_signal(self, prices):
+        # lean get_data: (int8 signal, price) arrays in `self.dtype`, without
+        # the DataFrame or intermediate columns
+        if is_batch(prices):
+            return np.asarray(self.get_signal_matrix(prices)), as_price_array(prices, self.dtype)
+        short_ma = rolling_mean(prices, self.short_window, self.symbol).to_numpy(self.dtype)
+        long_ma = rolling_mean(prices, self.long_window, self.symbol).to_numpy(self.dtype)
+        crossed = np.zeros(len(short_ma), dtype=bool)
+        crossed[1:] = short_ma[:-1] >= long_ma[:-1]
+        sell_condition = (short_ma < long_ma) & crossed
+        return encode_signal(short_ma > long_ma, sell_condition), as_price_array(prices, self.dtype)
+
+    def get_signal_matrix(self, prices):
+        # one vectorized pass over a (time x symbols) price matrix
+        frame = as_price_frame(prices)
+        short_ma = frame.rolling(self.short_window).mean()
+        long_ma = frame.rolling(self.long_window).mean()
+        buy_condition = (short_ma > long_ma)
+        sell_condition = (short_ma < long_ma) & (short_ma.shift(1) >= long_ma.shift(1))
+        signal = encode_signal(buy_condition, sell_condition)
+        return signal_matrix(signal, prices)
+
+    def update(self, price: float) -> Signal:
+        # streaming equivalent of get_data(...)['Signal'].iloc[-1]
+        self.short_roll.push(price)
+        self.long_roll.push(price)
+        short_ma = self.short_roll.mean()
+        long_ma = self.long_roll.mean()
+        buy = short_ma > long_ma
+        sell = (short_ma < long_ma) and (self.prev_short_ma >= self.prev_long_ma)
+        self.prev_short_ma, self.prev_long_ma = short_ma, long_ma
+        if buy:
+            return Signal.BUY
+        if sell:
+            return Signal.SELL
+        return Signal.HOLD
+
 
 
 class SimpleMACrossover(Strategy):
     parameters = {
         'symbol': '',
         "window": 0,
+        "timestep": "day",
         'short_window' : 0,
         'long_window' : 0,
         'risk_tolerance' : 0.0,
@@ -42,24 +89,32 @@ class SimpleMACrossover(Strategy):
     }
 
     def initialize(self):
-        self.sleeptime = "1D"
+        self.sleeptime = sleeptime(self.parameters['timestep'])
+        self.history = BarFeed(self, self.parameters['symbol'], self.parameters['window'], self.parameters['timestep'])
         self.strategy = SimpleMACrossoverCalc(
             params = {
+                'symbol': self.parameters['symbol'],
                 'short_window': self.parameters['short_window'],
                 'long_window': self.parameters['long_window']
             }
         )
+        # seeded from the first window, then fed only the new bars
+        self.stream = BarStream(self.strategy)
         prnt_params(self.parameters)
 
+    @timed('iteration')
     def on_trading_iteration(self):
-        bars = self.get_historical_prices(self.parameters['symbol'], self.parameters['window'], "day")
+        with timer(self, 'fetch'):
+            bars = self.history.update()
 
-        data = self.strategy.get_data(bars.df['close'])
-        signal, last_price = set_vars(data, 'Signal')
-        print(f"{'':<4}{signal}")
+        with timer(self, 'compute'):
+            signal = self.stream.update(bars)
+        last_price = bars.view('close')[-1]
+        print(f"{'':<4}{signal.name}")
 
-        if signal == 'BUY':
-            cash = self.get_cash()
+        if signal == Signal.BUY:
+            with timer(self, 'broker'):
+                cash = self.get_cash()
             quantity = position_sizing(cash, last_price, self.parameters['cash_at_risk'])
             if (cash > 0) and (quantity > 0):
                 take_profit_price = last_price * (1 + self.parameters['risk_tolerance'])
@@ -72,9 +127,12 @@ class SimpleMACrossover(Strategy):
                         take_profit_price=take_profit_price,
                         stop_loss_price=stop_loss_price
                 )
-                self.submit_order(order)
+                with timer(self, 'order'):
+                    self.submit_order(order)
 
-        elif signal == 'SELL':
-            pos = self.get_position(self.parameters['symbol'])
+        elif signal == Signal.SELL:
+            with timer(self, 'broker'):
+                pos = self.get_position(self.parameters['symbol'])
             if pos is not None:
-                self.sell_all()
+                with timer(self, 'order'):
+                    self.sell_all()
@@ -1,5 +1,10 @@
 from .tools.common import Strategy, np, pd
-from .tools.tools import position_sizing, set_vars, prnt_params
+from .tools.signals import Signal, encode_signal
+from .tools.metrics import timer, timed
+from .tools.bars import BarFeed, BarStream, sleeptime
+from .tools.tools import position_sizing, as_price_array, prnt_params, signal_matrix
+from .tools.rolling import RollingWindow
+from .tools.indicator_cache import cached
 
 
 class VolatilityATRCalc():
@@ -16,9 +21,20 @@ class VolatilityATRCalc():
     Once we have the True Range values for each day, we can calculate the ATR by taking a moving average of these values. The ATR is commonly calculated with a 14-day period.
     """
 
+    # every row is compared against the ATR of the last bar, so the
+    # signals depend on where the history ends (see walkforward.py)
+    causal = False
+
     def __init__(self, params):
         self.window = params['window']
         self.atr_multiplier = params['atr_multiplier']
+        self.symbol = params.get('symbol')
+        self.dtype = np.dtype(params.get('dtype', np.float64))
+        self.reset()
+
+    def reset(self):
+        self.true_range = RollingWindow(self.window)
+        self.prev_close = None
 
     def calculate_true_range(self, df: pd.DataFrame) -> pd.Series:
         high_low_diff = df['high'] - df['low']
@@ -28,57 +44,109 @@ class VolatilityATRCalc():
         return true_range
 
     def calculate_average_true_range(self, df: pd.DataFrame) -> float:
-        true_range = self.calculate_true_range(df)
-        atr = true_range.rolling(window=self.window).mean()
+        atr = cached(df[['high', 'low', 'close']], 'atr', (self.window,),
+                     lambda d: self.calculate_true_range(d).rolling(window=self.window).mean(), self.symbol)
         return atr.iloc[-1]
 
     def get_data(self, df: pd.DataFrame) -> pd.DataFrame:
+        if isinstance(df.columns, pd.MultiIndex):
+            return self.get_signal_matrix(df)
         atr = self.calculate_average_true_range(df)
         atr_stop_loss = atr * self.atr_multiplier
 
         # Generate signals based on ATR stop loss
-        signals = np.where(
-                    df['close'].diff() > atr_stop_loss,
-                    "BUY",
-                    np.where(df['close'].diff() < -atr_stop_loss,
-                             "SELL",
-                             "HOLD"
-                    )
-        )
-        signals[0] = "HOLD"  # Set default signal for the first row
+        close_diff = df['close'].diff()
+        signals = encode_signal(close_diff > atr_stop_loss, close_diff < -atr_stop_loss)
+        signals[0] = Signal.HOLD  # Set default signal for the first row
         df_copy = df.copy()
         df_copy['Signal'] = signals
         return df_copy
 
+    def get_signal(self, df: pd.DataFrame):
+        # lean get_data: (int8 signal, price) arrays in `self.dtype`, without
+        # the DataFrame or intermediate columns
+        if isinstance(df.columns, pd.MultiIndex):
+            close = df.rename(columns=str.lower, level=0)['close']
+            return np.asarray(self.get_signal_matrix(df)), as_price_array(close, self.dtype)
+        close = as_price_array(df['close'], self.dtype)
+        atr_stop_loss = self.dtype.type(self.calculate_average_true_range(df) * self.atr_multiplier)
+        close_diff = np.empty_like(close)
+        close_diff[0] = np.nan
+        np.subtract(close[1:], close[:-1], out=close_diff[1:])
+        signals = encode_signal(close_diff > atr_stop_loss, close_diff < -atr_stop_loss)
+        signals[0] = Signal.HOLD
+        return signals, close
+
+    def get_signal_matrix(self, df: pd.DataFrame) -> pd.DataFrame:
+        # one vectorized pass over many symbols; `df` has (field, symbol)
+        # MultiIndex columns as returned by a multi-ticker yf.download
+        df = df.rename(columns=str.lower, level=0)
+        high, low, close = df['high'], df['low'], df['close']
+        prev_close = close.shift(1)
+        # fmax skips the missing previous close on the first row like max(axis=1)
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        atr = true_range.rolling(window=self.window).mean().iloc[-1].to_numpy()
+        atr_stop_loss = atr * self.atr_multiplier
+        close_diff = close.diff().to_numpy()
+        signals = encode_signal(close_diff > atr_stop_loss, close_diff < -atr_stop_loss)
+        signals[0] = Signal.HOLD
+        return signal_matrix(signals, close)
+
+    def update(self, bar) -> Signal:
+        # streaming equivalent of get_data(...)['Signal'].iloc[-1]; `bar` is any
+        # mapping with 'high', 'low' and 'close' (e.g. a row of bars.df)
+        high, low, close = bar['high'], bar['low'], bar['close']
+        prev_close, self.prev_close = self.prev_close, close
+        if prev_close is None:
+            self.true_range.push(high - low)
+            return Signal.HOLD
+        self.true_range.push(max(high - low, abs(high - prev_close), abs(low - prev_close)))
+        atr_stop_loss = self.true_range.mean() * self.atr_multiplier
+        if close - prev_close > atr_stop_loss:
+            return Signal.BUY
+        if close - prev_close < -atr_stop_loss:
+            return Signal.SELL
+        return Signal.HOLD
+
 class VolatilityATR(Strategy):
 
     parameters = {
         "symbol": "",
         "window": 0,
+        "timestep": "day",
         "cash_at_risk": 0.0,
         "risk_tolerance": 0.0,
         "atr_multiplier": 0.0,
     }
 
     def initialize(self):
+        self.sleeptime = sleeptime(self.parameters['timestep'])
+        self.history = BarFeed(self, self.parameters['symbol'], self.parameters['window'], self.parameters['timestep'])
         self.strategy = VolatilityATRCalc(
             params = {
+                'symbol': self.parameters['symbol'],
                 'window': self.parameters['window'],
                 'atr_multiplier': self.parameters['atr_multiplier']
             }
         )
+        # seeded from the first window, then fed only the new bars
+        self.stream = BarStream(self.strategy, fields=('high', 'low', 'close'))
         prnt_params(self.parameters)
 
 
+    @timed('iteration')
     def on_trading_iteration(self):
-        bars = self.get_historical_prices(self.parameters['symbol'], self.parameters['window'], "day")
-        data = self.strategy.get_data(bars.df)
-        signal, last_price = set_vars(data, 'Signal')
-
-        cash = self.get_cash()
+        with timer(self, 'fetch'):
+            bars = self.history.update()
+        with timer(self, 'compute'):
+            signal = self.stream.update(bars)
+        last_price = bars.view('close')[-1]
+
+        with timer(self, 'broker'):
+            cash = self.get_cash()
         quantity = position_sizing(cash, last_price, self.parameters['cash_at_risk'])
 
-        if signal == 'BUY':
+        if signal == Signal.BUY:
             if cash > 0 and quantity > 0:
                 # Calculate take-profit and stop-loss prices based on risk tolerance
                 take_profit_price = last_price * (1 + self.parameters['risk_tolerance'])
@@ -93,10 +161,13 @@ class VolatilityATR(Strategy):
                     take_profit_price=take_profit_price,
                     stop_loss_price=stop_loss_price
                 )
-                self.submit_order(order)
+                with timer(self, 'order'):
+                    self.submit_order(order)
             else:
                 print(f"Error: cash: {cash}, quantity: {quantity}")
-        elif signal == "SELL":
-            pos = self.get_position(self.parameters['symbol'])
+        elif signal == Signal.SELL:
+            with timer(self, 'broker'):
+                pos = self.get_position(self.parameters['symbol'])
             if pos is not None:
-                self.sell_all()
+                with timer(self, 'order'):
+                    self.sell_all()
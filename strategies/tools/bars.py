@@ -0,0 +1,211 @@
+import math
+import numpy as np
+import pandas as pd
+from .signals import Signal
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+# timestep -> (lumibot sleeptime, bar length)
+TIMESTEPS = {
+    'day': ('1D', pd.Timedelta(days=1)),
+    'hour': ('60M', pd.Timedelta(hours=1)),
+    '30 minutes': ('30M', pd.Timedelta(minutes=30)),
+    '15 minutes': ('15M', pd.Timedelta(minutes=15)),
+    '5 minutes': ('5M', pd.Timedelta(minutes=5)),
+    'minute': ('1M', pd.Timedelta(minutes=1)),
+}
+
+
+def sleeptime(timestep):
+    # iteration cadence matching the bar size
+    return TIMESTEPS[timestep][0]
+
+
+class BarBuffer:
+    """
+    The last `capacity` OHLCV bars of one symbol in a mirrored NumPy ring
+    buffer: every bar is written at slot `i` and `i + capacity` of a
+    `2 * capacity` array, so the newest bars are always one contiguous slice
+    and `view`, `series` and `frame` return them without copying. Views
+    share memory with the buffer and are only valid until the next `extend`.
+    """
+
+    def __init__(self, capacity, fields=FIELDS):
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self._column = {f: k for k, f in enumerate(self.fields)}
+        self._data = np.full((len(self.fields), 2 * capacity), np.nan)
+        # UTC nanoseconds, viewed as a tz-aware DatetimeIndex in `tz`
+        self._time = np.zeros(2 * capacity, dtype=np.int64)
+        self._next = 0
+        self._count = 0
+        self.tz = 'UTC'
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def last_timestamp(self):
+        if not self._count:
+            return None
+        return pd.Timestamp(self._time[self._next - 1 + self.capacity], unit='ns', tz='UTC').tz_convert(self.tz)
+
+    def _write(self, slot, row, stamp):
+        self._data[:, slot] = row
+        self._data[:, slot + self.capacity] = row
+        self._time[slot] = self._time[slot + self.capacity] = stamp
+
+    def extend(self, df):
+        """
+        Append the bars of `df` (lumibot `bars.df` layout) newer than the
+        last buffered one; a bar with the same timestamp as the last one
+        replaces it, so a still-forming live bar is kept up to date.
+        Returns the number of new bars.
+        """
+        if df is None or not len(df):
+            return 0
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is None:
+            index = index.tz_localize('UTC')
+        if not self._count:
+            self.tz = index.tz
+        stamps = index.asi8
+        columns = {str(c).lower(): c for c in df.columns}
+        rows = np.column_stack([df[columns[f]].to_numpy(dtype=float) if f in columns
+                                else np.full(len(df), np.nan) for f in self.fields])
+        last = self._time[self._next - 1 + self.capacity] if self._count else None
+        added = 0
+        # only the newest `capacity` bars can survive
+        for row, stamp in zip(rows[-self.capacity:], stamps[-self.capacity:]):
+            if last is not None and stamp < last:
+                continue
+            if last is not None and stamp == last:
+                self._write((self._next - 1) % self.capacity, row, stamp)
+                continue
+            self._write(self._next, row, stamp)
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            last = stamp
+            added += 1
+        return added
+
+    def _slice(self):
+        end = self._next + self.capacity
+        return slice(end - self._count, end)
+
+    def view(self, field):
+        # the buffered values of `field`, oldest first, as an ndarray view
+        return self._data[self._column[field], self._slice()]
+
+    def stamps(self):
+        # UTC nanosecond timestamps of the buffered bars, as an ndarray view
+        return self._time[self._slice()]
+
+    def index(self):
+        # copied: cached indicators keep the index of their input, which
+        # must not change when the buffer wraps
+        return pd.DatetimeIndex(self.stamps().copy(), dtype=pd.DatetimeTZDtype(tz=self.tz))
+
+    def series(self, field='close'):
+        return pd.Series(self.view(field), index=self.index(), name=field, copy=False)
+
+    def frame(self, fields=None):
+        index = self.index()
+        return pd.DataFrame({f: self.view(f) for f in (fields or self.fields)}, index=index, copy=False)
+
+
+class BarFeed:
+    """
+    Keeps a BarBuffer of the last `length` `timestep` bars per symbol for a
+    lumibot strategy. The first `update` fetches the full window; later ones
+    fetch only the bars since the last buffered one (plus that bar again, in
+    case it was still forming), instead of re-requesting the whole window
+    every iteration.
+    """
+
+    def __init__(self, strategy, symbols, length, timestep='day'):
+        self.strategy = strategy
+        self.symbols = [symbols] if isinstance(symbols, str) else list(symbols)
+        self.length = length
+        self.timestep = timestep
+        self.step = TIMESTEPS[timestep][1]
+        self.buffers = {symbol: BarBuffer(length) for symbol in self.symbols}
+
+    def __getitem__(self, symbol):
+        return self.buffers[symbol]
+
+    def missing(self):
+        # number of bars to request so every buffer catches up
+        stamps = [b.last_timestamp for b in self.buffers.values()]
+        if any(stamp is None for stamp in stamps):
+            return self.length
+        elapsed = pd.Timestamp(self.strategy.get_datetime()) - min(stamps)
+        return max(1, min(self.length, math.ceil(elapsed / self.step) + 1))
+
+    def update(self):
+        """
+        Fetch the newest bars into the buffers; returns the buffer of the
+        only symbol, or the dict of buffers for several.
+        """
+        count = self.missing()
+        if len(self.symbols) == 1:
+            symbol = self.symbols[0]
+            bars = self.strategy.get_historical_prices(symbol, count, self.timestep)
+            self.buffers[symbol].extend(bars.df if bars is not None else None)
+            return self.buffers[symbol]
+        fetched = self.strategy.get_historical_prices_for_assets(self.symbols, count, self.timestep)
+        for asset, bars in fetched.items():
+            symbol = asset.symbol if hasattr(asset, 'symbol') else str(asset)
+            if symbol in self.buffers and bars is not None:
+                self.buffers[symbol].extend(bars.df)
+        return self.buffers
+
+
+class BarStream:
+    """
+    Feeds a Calc's streaming `update` from a BarBuffer: each call pushes only
+    the bars buffered since the previous one, so a strategy iteration costs
+    O(new bars) instead of recomputing the whole window. `fields=None`
+    pushes the close price; a tuple of fields pushes a dict per bar (e.g.
+    ('high', 'low', 'close') for VolatilityATRCalc).
+
+    If the last pushed bar was rewritten (a still-forming live bar) or has
+    dropped out of the buffer, the Calc is reset and the buffer replayed.
+    Calcs marked `recursive = True` (EMA and Wilder averages) carry state
+    from every bar they have seen, unlike get_data on the window, so they
+    are reset and replay the buffer whenever new bars arrive.
+    """
+
+    def __init__(self, calc, fields=None):
+        self.calc = calc
+        self.fields = fields
+        self.signal = Signal.HOLD
+        self._last = None
+
+    def _values(self, buffer, lo, hi=None):
+        if self.fields is None:
+            return buffer.view('close')[lo:hi].tolist()
+        views = [buffer.view(f)[lo:hi] for f in self.fields]
+        return [dict(zip(self.fields, row)) for row in zip(*views)]
+
+    def update(self, buffer) -> Signal:
+        # the signal of the newest buffered bar
+        stamps = buffer.stamps()
+        if not len(stamps):
+            return self.signal
+        lo = 0
+        if self._last is not None:
+            stamp, row = self._last
+            lo = int(np.searchsorted(stamps, stamp, side='right'))
+            if lo == 0 or stamps[lo - 1] != stamp or self._values(buffer, lo - 1, lo)[0] != row:
+                self.calc.reset()
+                lo = 0
+            elif lo < len(stamps) and getattr(self.calc, 'recursive', False):
+                self.calc.reset()
+                lo = 0
+        values = self._values(buffer, lo)
+        for value in values:
+            self.signal = self.calc.update(value)
+        if values:
+            self._last = (stamps[-1], values[-1])
+        return self.signal
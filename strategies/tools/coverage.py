@@ -0,0 +1,28 @@
+def add_interval(intervals, lo, hi):
+    """
+    `intervals` (sorted, disjoint [start, end) pairs) with [lo, hi) added;
+    overlapping and touching intervals are merged into one.
+    """
+    merged = []
+    for start, end in sorted([*intervals, (lo, hi)]):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_intervals(intervals, start, end):
+    # the parts of [start, end) not covered by the sorted, disjoint `intervals`
+    ranges = []
+    for lo, hi in intervals:
+        if hi <= start:
+            continue
+        if lo >= end:
+            break
+        if lo > start:
+            ranges.append((start, lo))
+        start = max(start, hi)
+    if start < end:
+        ranges.append((start, end))
+    return ranges
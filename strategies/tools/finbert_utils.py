@@ -1,18 +1,71 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+import os
+import threading
+import time
 import torch
+from .sentiment_cache import SentimentCache
+
+# opt-in CPU fast path: FINBERT_QUANTIZE=1 runs a dynamically int8-quantized
+# copy of the model, FINBERT_THREADS sets the intra-op thread count
+QUANTIZE = os.environ.get('FINBERT_QUANTIZE', '0') not in ('', '0')
+THREADS = int(os.environ.get('FINBERT_THREADS', '0'))
 device = "cuda:0" if torch.cuda.is_available() else "cpu"
 
-tokenizer = AutoTokenizer.from_pretrained("ProsusAI/finbert")
-model = AutoModelForSequenceClassification.from_pretrained("ProsusAI/finbert").to(device)
+# loaded by load_model on the first headline that is not cached yet,
+# one (tokenizer, model, device) entry per quantize setting
+_models = {}
+_load_lock = threading.Lock()
 labels = ["positive", "negative", "neutral"]
+# per-headline logits shared across calls and runs, see sentiment_cache.py;
+# int8 logits differ slightly from fp32 ones so they get their own namespace
+cache = SentimentCache(namespace='int8' if QUANTIZE else 'fp32')
 
-def estimate_sentiment(news):
-    if news:
-        tokens = tokenizer(news, return_tensors="pt", padding=True).to(device)
+# fixed headline set for quantization_report, covering all three labels
+REFERENCE_HEADLINES = [
+    "Apple Inc. (AAPL) reported strong quarterly earnings, beating Wall Street expectations.",
+    "The tech giant saw a surge in iPhone sales and continued growth in its services business.",
+    "Analysts remain bullish on Apple's long-term prospects, citing the company's ecosystem and innovation pipeline.",
+    "Microsoft raises full-year guidance as cloud revenue jumps 30%.",
+    "Tesla shares plunge after the company misses delivery targets for a second quarter.",
+    "Regulators open an antitrust probe into Google's advertising business.",
+    "Boeing cuts its production forecast amid ongoing supply chain disruptions.",
+    "Retail sales fell more than expected in March as consumers pulled back.",
+    "Markets responded negatively to the news and traders were displeased.",
+    "The company will hold its annual shareholder meeting on June 12.",
+    "Amazon named a new board member effective next month.",
+    "The Federal Reserve left interest rates unchanged, in line with expectations.",
+]
 
+def load_model(quantize=None):
+    quantize = QUANTIZE if quantize is None else quantize
+    with _load_lock:
+        if quantize not in _models:
+            from transformers import AutoTokenizer, AutoModelForSequenceClassification
+            if THREADS:
+                torch.set_num_threads(THREADS)
+            tokenizer = AutoTokenizer.from_pretrained("ProsusAI/finbert")
+            model = AutoModelForSequenceClassification.from_pretrained("ProsusAI/finbert").eval()
+            if quantize:
+                # int8 Linear weights, activations quantized on the fly;
+                # these kernels only exist on CPU
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+                _models[quantize] = (tokenizer, model, "cpu")
+            else:
+                _models[quantize] = (tokenizer, model.to(device), device)
+    return _models[quantize]
+
+def infer_logits(news, quantize=None):
+    tokenizer, model, model_device = load_model(quantize)
+    tokens = tokenizer(news, return_tensors="pt", padding=True).to(model_device)
+    with torch.inference_mode():
         result = model(tokens["input_ids"], attention_mask=tokens["attention_mask"])[
             "logits"
         ]
+    return result.float().cpu().numpy()
+
+def estimate_sentiment(news):
+    if news:
+        # only headlines not seen before go through the model
+        result = torch.from_numpy(cache.logits(news, infer_logits))
         result = torch.nn.functional.softmax(torch.sum(result, 0), dim=-1)
         probability = result[torch.argmax(result)]
         sentiment = labels[torch.argmax(result)]
@@ -20,6 +73,32 @@ def estimate_sentiment(news):
     else:
         return 0, labels[-1]
 
+def quantization_report(headlines=REFERENCE_HEADLINES, repeat=5):
+    """
+    Compare the int8 model against fp32 on `headlines`, bypassing the cache:
+    label agreement, largest per-headline logit and probability differences,
+    and headlines/sec of each model (best of `repeat` runs).
+    """
+    logits = {}
+    per_sec = {}
+    for quantize in (False, True):
+        infer_logits(headlines, quantize)  # loads the model and warms up
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            logits[quantize] = infer_logits(headlines, quantize)
+            timings.append(time.perf_counter() - start)
+        per_sec[quantize] = len(headlines) / min(timings)
+    fp32, int8 = torch.from_numpy(logits[False]), torch.from_numpy(logits[True])
+    return {
+        'label_agreement': (fp32.argmax(1) == int8.argmax(1)).float().mean().item(),
+        'max_logit_delta': (fp32 - int8).abs().max().item(),
+        'max_probability_delta': (fp32.softmax(1) - int8.softmax(1)).abs().max().item(),
+        'fp32_per_sec': per_sec[False],
+        'int8_per_sec': per_sec[True],
+        'speedup': per_sec[True] / per_sec[False],
+    }
+
 
 if __name__ == "__main__":
     sample_news_text = [
@@ -32,4 +111,8 @@ if __name__ == "__main__":
     tensor, sentiment = estimate_sentiment(sample_news_text)
     # tensor, sentiment = estimate_sentiment(['markets responded negatively to the news!','traders were displeased!'])
     print(tensor, sentiment)
+    tensor, sentiment = estimate_sentiment(sample_news_text)
+    print(f'cache hits: {cache.hits}; misses: {cache.misses}')
     print(f'cuda available: {torch.cuda.is_available()}')
+    for name, value in quantization_report().items():
+        print(f'{name}: {value:.4f}')
@@ -0,0 +1,127 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from . import rolling
+
+# in-memory budget of the process-wide cache, in megabytes
+DEFAULT_MB = float(os.environ.get('ALGOTRADE_INDICATOR_CACHE_MB', 64))
+
+
+def _nbytes(value):
+    if isinstance(value, tuple):
+        return sum(_nbytes(v) for v in value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=False).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=False))
+    return int(getattr(value, 'nbytes', 0))
+
+
+def _digest(prices):
+    values = np.ascontiguousarray(prices.to_numpy() if hasattr(prices, 'to_numpy') else prices)
+    return hashlib.blake2b(values.tobytes(), digest_size=16).hexdigest()
+
+
+class IndicatorCache:
+    """
+    Indicator values shared by every Calc in the process, keyed by
+    `(symbol, indicator, params, input column, length, last bar timestamp,
+    last bar values)`; the last bar's values keep a live, still-forming bar
+    from being served stale. Without a `symbol` a digest of the input stands
+    in for it, so sweeps over one history share indicators across parameter
+    combinations too.
+
+    Entries are evicted least recently used once they hold more than
+    `max_mb` megabytes (default `$ALGOTRADE_INDICATOR_CACHE_MB` or 64);
+    `max_mb=0` disables caching. Cached values are shared between callers
+    and must be treated as read-only.
+    """
+
+    def __init__(self, max_mb=None):
+        self.max_bytes = int((DEFAULT_MB if max_mb is None else max_mb) * 2 ** 20)
+        self.hits = 0
+        self.misses = 0
+        self._bytes = 0
+        self._memory = OrderedDict()
+        # lumibot runs each strategy in its own thread
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._memory)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._bytes = 0
+
+    def key(self, prices, indicator, params, symbol=None):
+        if symbol is None:
+            symbol = _digest(prices)
+        if len(prices) == 0:
+            return (symbol, indicator, params, getattr(prices, 'name', None), 0, None, None)
+        # raw bytes so a NaN in the last bar still compares equal
+        last = np.ascontiguousarray(prices.iloc[-1:].to_numpy()).tobytes()
+        return (symbol, indicator, params, getattr(prices, 'name', None), len(prices), prices.index[-1], last)
+
+    def get(self, prices, indicator, params, compute, symbol=None):
+        """
+        `compute(prices)`, or the value cached for the same symbol,
+        indicator, `params` tuple and bars.
+        """
+        if self.max_bytes <= 0:
+            return compute(prices)
+        key = self.key(prices, indicator, params, symbol)
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = compute(prices)
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            if key not in self._memory:
+                self._memory[key] = value
+                self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._bytes -= _nbytes(evicted)
+        return value
+
+
+indicators = IndicatorCache()
+
+
+def cached(prices, indicator, params, compute, symbol=None):
+    # the process-wide cache shared by all Calcs
+    return indicators.get(prices, indicator, params, compute, symbol)
+
+
+def rolling_mean(prices, window, symbol=None):
+    return cached(prices, 'rolling_mean', (window,), lambda p: p.rolling(window=window).mean(), symbol)
+
+
+def _moments(prices, window):
+    mean, std = rolling.rolling_moments(prices.to_numpy(dtype=float), window)
+    return (pd.Series(mean, index=prices.index, name=prices.name),
+            pd.Series(std, index=prices.index, name=prices.name))
+
+
+def rolling_moments(prices, window, symbol=None):
+    # (rolling mean, rolling sample std) from one pass of the stable kernel
+    return cached(prices, 'rolling_moments', (window,), lambda p: _moments(p, window), symbol)
+
+
+def rolling_std(prices, window, symbol=None):
+    return rolling_moments(prices, window, symbol)[1]
+
+
+def ewm_mean(prices, span, adjust=True, min_periods=0, symbol=None):
+    return cached(prices, 'ewm_mean', (span, adjust, min_periods),
+                  lambda p: p.ewm(span=span, adjust=adjust, min_periods=min_periods).mean(), symbol)
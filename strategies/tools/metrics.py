@@ -0,0 +1,172 @@
+import atexit
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# upper bounds in seconds, roughly 1-2.5-5 per decade from 1us to 10s
+BUCKETS = tuple(float(f'{m}e{e}') for e in range(-6, 1) for m in (1, 2.5, 5)) + (10.0,)
+
+
+class Histogram:
+    # cumulative-on-export latency histogram in the Prometheus layout
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def to_dict(self):
+        return {'buckets': dict(zip([*map(str, BUCKETS), '+Inf'], self.counts)),
+                'sum': self.sum, 'count': self.count}
+
+
+class Metrics:
+    """
+    Per-phase latency histograms keyed by (strategy, symbol, phase).
+
+    Disabled by default; `timer` then returns a shared no-op context manager
+    so instrumented code pays only a function call. Enable with `enable()`
+    or `$ALGOTRADE_METRICS=1`; `$ALGOTRADE_METRICS_FILE` also writes the
+    histograms as JSON when the process exits.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def enable(self, path=None):
+        self.enabled = True
+        if path:
+            atexit.register(self.write_json, path)
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+
+    def observe(self, strategy, symbol, phase, seconds):
+        key = (strategy, symbol, phase)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def to_dict(self):
+        with self._lock:
+            return [{'strategy': s, 'symbol': y, 'phase': p, **h.to_dict()}
+                    for (s, y, p), h in sorted(self.histograms.items(), key=lambda kv: tuple(map(str, kv[0])))]
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def prometheus_text(self):
+        lines = ['# HELP algotrade_phase_seconds Latency of one strategy phase per trading iteration.',
+                 '# TYPE algotrade_phase_seconds histogram']
+        for entry in self.to_dict():
+            labels = f'strategy="{entry["strategy"]}",symbol="{entry["symbol"]}",phase="{entry["phase"]}"'
+            cumulative = 0
+            for le, count in entry['buckets'].items():
+                cumulative += count
+                lines.append(f'algotrade_phase_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'algotrade_phase_seconds_sum{{{labels}}} {entry["sum"]}')
+            lines.append(f'algotrade_phase_seconds_count{{{labels}}} {entry["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port=9108):
+        # Prometheus text endpoint on /metrics in a background thread
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address[1]
+
+
+class _Timer:
+    __slots__ = ('strategy', 'symbol', 'phase', 'start')
+
+    def __init__(self, strategy, symbol, phase):
+        self.strategy = strategy
+        self.symbol = symbol
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        metrics.observe(self.strategy, self.symbol, self.phase, time.perf_counter() - self.start)
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NOOP = _NoopTimer()
+metrics = Metrics()
+if os.environ.get('ALGOTRADE_METRICS', '0') not in ('', '0') or os.environ.get('ALGOTRADE_METRICS_FILE'):
+    metrics.enable(os.environ.get('ALGOTRADE_METRICS_FILE'))
+
+
+def _labels(strategy):
+    # a lumibot Strategy labels itself by name and its `symbol` parameter
+    if isinstance(strategy, str):
+        return strategy, ''
+    return getattr(strategy, 'name', type(strategy).__name__), getattr(strategy, 'parameters', {}).get('symbol', '')
+
+
+def timer(strategy, phase, symbol=None):
+    """
+    `with timer(self, 'fetch'):` records the block's latency under the
+    strategy's name and symbol (or an explicit `symbol`).
+    """
+    if not metrics.enabled:
+        return _NOOP
+    name, default_symbol = _labels(strategy)
+    return _Timer(name, default_symbol if symbol is None else symbol, phase)
+
+
+def timed(phase):
+    # decorator form of timer for strategy methods, e.g. on_trading_iteration
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            if not metrics.enabled:
+                return fn(self, *args, **kwargs)
+            with timer(self, phase):
+                return fn(self, *args, **kwargs)
+        return wrapper
+    return decorator
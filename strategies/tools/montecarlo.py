@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+from .signals import Signal
+from .sweep import ohlc_columns, pool_map, worker_data
+
+FIELDS = ('open', 'high', 'low', 'close')
+
+
+def bar_shapes(data):
+    """
+    The history as close-to-close log returns plus, per bar, the log ratio
+    of its open, high and low to its own close. Resampled bars keep their
+    shape, so high >= max(open, close) and low <= min(open, close) hold on
+    every generated path.
+    """
+    open_, high, low, close = (np.asarray(c, dtype=float) for c in ohlc_columns(data, FIELDS))
+    returns = np.diff(np.log(close))
+    offsets = np.log(np.stack([open_[1:], high[1:], low[1:]]) / close[1:])
+    return close[0], returns, offsets
+
+
+def _build(start, returns, offsets):
+    # (time x paths) OHLC arrays from (time x paths) returns and bar offsets
+    close = start * np.exp(np.cumsum(returns, axis=0))
+    open_, high, low = close * np.exp(offsets)
+    return {'open': open_, 'high': high, 'low': low, 'close': close}
+
+
+def bootstrap_paths(data, paths, length=None, block=20, rng=None):
+    """
+    `paths` moving-block bootstrap resamples of the OHLC history in `data`,
+    as a dict of (length x paths) open/high/low/close arrays. Blocks of
+    `block` consecutive bars are drawn with replacement, so the volatility
+    clustering and short-range autocorrelation within a block survive.
+    """
+    rng = rng or np.random.default_rng()
+    start, returns, offsets = bar_shapes(data)
+    length = length or len(returns)
+    block = min(block, len(returns))
+    blocks = -(-length // block)
+    starts = rng.integers(0, len(returns) - block + 1, (blocks, paths))
+    idx = (starts[:, None, :] + np.arange(block)[None, :, None]).reshape(blocks * block, paths)[:length]
+    return _build(start, returns[idx], offsets[:, idx])
+
+
+def gbm_paths(data, paths, length=None, rng=None, drift=None, volatility=None):
+    """
+    `paths` geometric Brownian motion closes with the per-bar `drift` and
+    `volatility` of the log returns (estimated from `data` by default),
+    each bar given the open/high/low shape of a randomly drawn historical
+    bar. Same layout as bootstrap_paths.
+    """
+    rng = rng or np.random.default_rng()
+    start, returns, offsets = bar_shapes(data)
+    length = length or len(returns)
+    drift = returns.mean() if drift is None else drift
+    volatility = returns.std(ddof=1) if volatility is None else volatility
+    idx = rng.integers(0, len(returns), (length, paths))
+    return _build(start, rng.normal(drift, volatility, (length, paths)), offsets[:, idx])
+
+
+def bracket_paths(signal, open_, high, low, close, risk, trading_fee=0.0015):
+    """
+    simulate_bracket run on every column of (time x paths) arrays at once:
+    all paths step through the bars in lockstep, each one flat or holding a
+    bracket order, so the cost is a few vectorized operations per bar.
+
+    Returns a dict of per-path arrays: `net_profit` (the same compounded
+    return as simulate_bracket), `max_drawdown` of the equity marked to the
+    close while in a position (a negative fraction), and `trades` closed.
+    """
+    signal = np.asarray(signal)
+    bars, paths = signal.shape
+    equity = np.ones(paths)
+    peak = np.ones(paths)
+    drawdown = np.zeros(paths)
+    trades = np.zeros(paths, dtype=np.int64)
+    holding = np.zeros(paths, dtype=bool)
+    buy = np.full(paths, np.nan)
+    take_profit = np.full(paths, np.nan)
+    stop_loss = np.full(paths, np.nan)
+    for t in range(bars):
+        if t < bars - 1:
+            # enter at the next open; exits are checked from the signal bar on
+            enter = ~holding & (signal[t] == Signal.BUY)
+            if enter.any():
+                price = open_[t + 1, enter]
+                buy[enter] = price
+                take_profit[enter] = price * (1 + risk)
+                stop_loss[enter] = price * (1 - risk)
+                holding |= enter
+        stopped = holding & (low[t] < stop_loss)
+        exited = stopped | (holding & (high[t] > take_profit))
+        if exited.any():
+            sell = np.where(stopped[exited], stop_loss[exited], take_profit[exited])
+            equity[exited] *= (sell - buy[exited]) / buy[exited] - trading_fee + 1
+            trades += exited
+            holding &= ~exited
+        value = np.where(holding, equity * close[t] / buy, equity)
+        np.maximum(peak, value, out=peak)
+        np.minimum(drawdown, value / peak - 1, out=drawdown)
+    return {'net_profit': equity, 'max_drawdown': drawdown, 'trades': trades}
+
+
+def path_signals(calc_cls, params, ohlc, price_col='close'):
+    # one batched get_signal over every path, each path a symbol column;
+    # `price_col=None` passes all fields with (field, path) columns
+    # (VolatilityATRCalc)
+    calc = calc_cls(params=params)
+    if price_col is None:
+        return calc.get_signal(pd.concat({f: pd.DataFrame(ohlc[f]) for f in FIELDS}, axis=1))[0]
+    return calc.get_signal(pd.DataFrame(ohlc[price_col.lower()]))[0]
+
+
+def _evaluate_batch(task):
+    batch, size, calc_cls, params, price_col, risk_range, trading_fee, method, length, block, seed = task
+    data, _ = worker_data()
+    # one generator per batch, so results do not depend on the worker count
+    rng = np.random.default_rng([seed, batch])
+    if method == 'bootstrap':
+        ohlc = bootstrap_paths(data, size, length, block, rng)
+    elif method == 'gbm':
+        ohlc = gbm_paths(data, size, length, rng)
+    else:
+        raise ValueError(f'unknown path method {method!r}')
+    signal = path_signals(calc_cls, params, ohlc, price_col)
+    return [(risk, bracket_paths(signal, ohlc['open'], ohlc['high'], ohlc['low'], ohlc['close'],
+                                 risk, trading_fee))
+            for risk in risk_range]
+
+
+def monte_carlo(calc_cls, params, data, risk_range, paths=10000, length=None, method='bootstrap',
+                block=20, batch=500, seed=0, price_col='Close', trading_fee=0.0015, workers=None):
+    """
+    Robustness check of one parameter set: backtest `calc_cls(params)` with
+    the bracket simulation on `paths` synthetic histories resampled from the
+    OHLC frame `data` (`method='bootstrap'` for bootstrap_paths with blocks of
+    `block` bars, or `'gbm'`) of `length` bars (default the history length).
+    `price_col` is the field passed to the Calc as in run_sweep; None passes
+    every field (VolatilityATRCalc).
+
+    Paths are generated and evaluated `batch` at a time as (time x paths)
+    arrays: the Calc computes every path's signals in one batched call and
+    bracket_paths simulates them in lockstep. Batches run on the process
+    pool like run_sweep; each one has its own seeded generator, so a `seed`
+    and `batch` give the same paths for any worker count.
+
+    Returns a DataFrame with one row per path and risk level: `path`,
+    `risk`, `net_profit`, `max_drawdown` and `trades`; see summarize.
+    """
+    risk_range = list(risk_range)
+    sizes = [min(batch, paths - lo) for lo in range(0, paths, batch)]
+    tasks = [(k, size, calc_cls, params, price_col, risk_range, trading_fee, method, length, block, seed)
+             for k, size in enumerate(sizes)]
+    frames = []
+    first = 0
+    for size, results in zip(sizes, pool_map(_evaluate_batch, tasks, data, None, workers, 1)):
+        for risk, result in results:
+            frames.append(pd.DataFrame({'path': np.arange(first, first + size), 'risk': risk, **result}))
+        first += size
+    if not frames:
+        return pd.DataFrame(columns=['path', 'risk', 'net_profit', 'max_drawdown', 'trades'])
+    return pd.concat(frames, ignore_index=True).sort_values(['risk', 'path'], kind='stable', ignore_index=True)
+
+
+def summarize(results, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+    """
+    Per risk level: quantiles of the net profit and max drawdown over the
+    paths, the mean net profit and the share of paths that lost money.
+    """
+    grouped = results.groupby('risk')
+    summary = {}
+    for q in quantiles:
+        summary[f'net_profit_q{round(q * 100):02d}'] = grouped['net_profit'].quantile(q)
+    for q in quantiles:
+        summary[f'max_drawdown_q{round(q * 100):02d}'] = grouped['max_drawdown'].quantile(q)
+    summary['net_profit_mean'] = grouped['net_profit'].mean()
+    summary['loss_probability'] = grouped['net_profit'].apply(lambda p: (p < 1).mean())
+    return pd.DataFrame(summary)
@@ -0,0 +1,240 @@
+import json
+import os
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from .coverage import add_interval, missing_intervals
+
+DATA_URL = 'https://data.alpaca.markets'
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.algotrade', 'news.sqlite')
+# largest page the v1beta1 news endpoint returns
+PAGE_LIMIT = 50
+
+
+def _utc(ts) -> pd.Timestamp:
+    # naive timestamps are taken as UTC, like the Alpaca API does
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize('UTC') if ts.tz is None else ts.tz_convert('UTC')
+
+
+def _iso(ts) -> str:
+    # fixed-width RFC 3339, so stored timestamps also sort as strings
+    return _utc(ts).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class ArticleCache:
+    """
+    News articles per symbol in a SQLite file at `path` (default
+    `$ALGOTRADE_NEWS` or `~/.algotrade/news.sqlite`), together with the
+    [start, end) ranges already requested for each symbol, the same way
+    OhlcvStore tracks bar coverage.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get('ALGOTRADE_NEWS', DEFAULT_PATH)
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        # lumibot runs each strategy in its own thread
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(
+            'CREATE TABLE IF NOT EXISTS articles '
+            '(symbol TEXT, id INTEGER, created_at TEXT, article TEXT, PRIMARY KEY (symbol, id));'
+            'CREATE INDEX IF NOT EXISTS articles_time ON articles (symbol, created_at);'
+            'CREATE TABLE IF NOT EXISTS covered (symbol TEXT, start TEXT, end TEXT);'
+            'CREATE INDEX IF NOT EXISTS covered_symbol ON covered (symbol);')
+        legacy = self._db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'coverage'").fetchone()
+        if legacy is not None:
+            # caches written before coverage became a list of ranges per symbol
+            self._db.executescript('INSERT INTO covered SELECT symbol, start, end FROM coverage;'
+                                   'DROP TABLE coverage;')
+        self._db.commit()
+
+    def _coverage(self, symbol):
+        rows = self._db.execute('SELECT start, end FROM covered WHERE symbol = ? ORDER BY start', (symbol,))
+        return [(_utc(lo), _utc(hi)) for lo, hi in rows.fetchall()]
+
+    def coverage(self, symbol):
+        # sorted, disjoint [start, end) ranges already requested for `symbol`
+        with self._lock:
+            return self._coverage(symbol)
+
+    def missing_ranges(self, symbol, start, end):
+        return missing_intervals(self.coverage(symbol), _utc(start), _utc(end))
+
+    def write(self, symbol, articles, coverage):
+        rows = [(symbol, a['id'], _iso(a['created_at']), json.dumps(a)) for a in articles]
+        with self._lock:
+            # ids are unique, so articles overlapping an earlier request are kept once
+            self._db.executemany('INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?)', rows)
+            # separate requests stay separate ranges, so the gaps between them are fetched later
+            covered = add_interval(self._coverage(symbol), _utc(coverage[0]), _utc(coverage[1]))
+            self._db.execute('DELETE FROM covered WHERE symbol = ?', (symbol,))
+            self._db.executemany('INSERT INTO covered VALUES (?, ?, ?)',
+                                 [(symbol, _iso(lo), _iso(hi)) for lo, hi in covered])
+            self._db.commit()
+
+    def read(self, symbol, start, end):
+        # articles created in [start, end), oldest first
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT article FROM articles WHERE symbol = ? AND created_at >= ? AND created_at < ? '
+                'ORDER BY created_at, id', (symbol, _iso(start), _iso(end))).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class NewsClient:
+    """
+    Alpaca v1beta1 news client on one pooled `requests.Session`, backed by
+    an ArticleCache. `get_news` only requests the part of [start, end) never
+    requested before for the symbol, so an hourly rolling window costs one
+    small request for the newest articles and is otherwise served locally.
+    The last `overlap` before now is requested again on every call, so
+    articles the provider publishes or backfills late still reach the cache.
+
+    Point `base_url` at a LocalNewsServer (or set `$ALGOTRADE_NEWS_URL`) to
+    run without network access.
+    """
+
+    def __init__(self, key_id=None, secret_key=None, base_url=None, cache=None, session=None, pool_size=4,
+                 overlap=pd.Timedelta(hours=24)):
+        self.base_url = (base_url or os.environ.get('ALGOTRADE_NEWS_URL', DATA_URL)).rstrip('/')
+        self.cache = cache or ArticleCache()
+        self.overlap = pd.Timedelta(overlap)
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if key_id:
+            self.session.headers.update({'APCA-API-KEY-ID': key_id, 'APCA-API-SECRET-KEY': secret_key})
+
+    def fetch(self, symbol, start, end):
+        # every article for `symbol` in [start, end), following page tokens
+        params = {'symbols': symbol, 'start': _iso(start), 'end': _iso(end),
+                  'limit': PAGE_LIMIT, 'sort': 'asc'}
+        articles = []
+        while True:
+            response = self.session.get(f'{self.base_url}/v1beta1/news', params=params, timeout=30)
+            response.raise_for_status()
+            page = response.json()
+            articles.extend(page.get('news') or [])
+            if not page.get('next_page_token'):
+                return articles
+            params['page_token'] = page['next_page_token']
+
+    def now(self):
+        return pd.Timestamp.now(tz='UTC').floor('s')
+
+    def fill(self, symbol, start, end):
+        # never mark the future as covered, articles may still be published
+        now = self.now()
+        start, end = _utc(start), min(_utc(end), now)
+        ranges = self.cache.missing_ranges(symbol, start, end)
+        recent = max(start, now - self.overlap)
+        if recent < end:
+            # late articles land in the recent past, covered or not
+            ranges = add_interval(ranges, recent, end)
+        for lo, hi in ranges:
+            if lo < hi:
+                self.cache.write(symbol, self.fetch(symbol, lo, hi), coverage=(lo, hi))
+        return len(ranges)
+
+    def get_news(self, symbol, start, end):
+        self.fill(symbol, start, end)
+        return self.cache.read(symbol, start, end)
+
+    def get_headlines(self, symbol, start, end):
+        return [article['headline'] for article in self.get_news(symbol, start, end)]
+
+
+class _NewsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip('/') != '/v1beta1/news':
+            self.send_error(404)
+            return
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        symbols = set(query.get('symbols', '').upper().split(',')) - {''}
+        start = _iso(query.get('start', '1970-01-01'))
+        end = _iso(query['end']) if 'end' in query else None
+        matches = [a for a in self.server.articles
+                   if (not symbols or symbols & set(a.get('symbols', [])))
+                   and _iso(a['created_at']) >= start and (end is None or _iso(a['created_at']) < end)]
+        matches.sort(key=lambda a: (_iso(a['created_at']), a['id']), reverse=query.get('sort', 'desc') == 'desc')
+        offset = int(query.get('page_token', 0))
+        limit = min(int(query.get('limit', 10)), PAGE_LIMIT)
+        page = matches[offset:offset + limit]
+        token = str(offset + limit) if offset + limit < len(matches) else None
+        self.server.requests.append(query)
+        body = json.dumps({'news': page, 'next_page_token': token}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalNewsServer:
+    """
+    Stand-in for the Alpaca news endpoint serving `articles` (dicts with at
+    least id, headline, created_at and symbols) on localhost, for offline
+    backtests and tests. Use as a context manager; `url` goes to
+    NewsClient(base_url=...) and `requests` records every query received.
+    """
+
+    def __init__(self, articles=(), port=0):
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), _NewsHandler)
+        self.server.articles = list(articles)
+        self.server.requests = []
+        self._thread = None
+
+    @classmethod
+    def from_json(cls, path, port=0):
+        with open(path) as f:
+            return cls(json.load(f), port)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Serve news articles from a JSON file in the Alpaca v1beta1 format')
+    parser.add_argument('articles', type=str, help='Specify a JSON file with a list of articles')
+    parser.add_argument('--port', type=int, default=8765, help='Specify the port to listen on')
+    args = parser.parse_args()
+    server = LocalNewsServer.from_json(args.articles, args.port)
+    print(f'serving {len(server.server.articles)} articles on {server.url}')
+    server.server.serve_forever()
@@ -0,0 +1,134 @@
+import math
+import os
+import numpy as np
+from .sweep import evaluate_combo, worker_pool
+
+# (length scale, noise) candidates of the surrogate, picked per round by
+# marginal likelihood; inputs are scaled to [0, 1] and profits standardized
+LENGTH_SCALES = (0.1, 0.2, 0.4, 0.8)
+NOISES = (1e-4, 1e-2, 1e-1)
+
+
+def grid_features(combos):
+    """
+    `(combos x params)` matrix of the `(outer_key, params)` grid scaled to
+    [0, 1] per parameter; non-numeric values are ranked by first appearance.
+    """
+    names = list(combos[0][1]) if combos else []
+    columns = []
+    for name in names:
+        values = [params[name] for _, params in combos]
+        if all(isinstance(v, (int, float, np.integer, np.floating)) for v in values):
+            column = np.asarray(values, dtype=float)
+        else:
+            codes = {}
+            column = np.asarray([codes.setdefault(v, len(codes)) for v in values], dtype=float)
+        span = column.max() - column.min()
+        columns.append((column - column.min()) / span if span > 0 else np.zeros_like(column))
+    return np.column_stack(columns) if columns else np.zeros((len(combos), 0))
+
+
+def _kernel(a, b, length_scale):
+    d2 = ((a[:, None, :] - b[None, :, :]) ** 2).sum(-1)
+    return np.exp(-0.5 * d2 / length_scale ** 2)
+
+
+class GaussianProcess:
+    # exact GP regression with an RBF kernel over the scaled grid
+    def fit(self, x, y):
+        self.x = x
+        self.mean, self.std = y.mean(), (y.std() or 1.0)
+        z = (y - self.mean) / self.std
+        best = -np.inf
+        for length_scale in LENGTH_SCALES:
+            k = _kernel(x, x, length_scale)
+            for noise in NOISES:
+                chol = np.linalg.cholesky(k + noise * np.eye(len(x)))
+                alpha = np.linalg.solve(chol.T, np.linalg.solve(chol, z))
+                # log marginal likelihood up to a constant
+                score = -0.5 * z @ alpha - np.log(np.diag(chol)).sum()
+                if score > best:
+                    best = score
+                    self.length_scale, self.chol, self.alpha = length_scale, chol, alpha
+        return self
+
+    def predict(self, x):
+        k = _kernel(x, self.x, self.length_scale)
+        mu = k @ self.alpha
+        v = np.linalg.solve(self.chol, k.T)
+        sigma = np.sqrt(np.clip(1.0 - (v ** 2).sum(0), 1e-12, None))
+        return mu * self.std + self.mean, sigma * self.std
+
+
+def expected_improvement(mu, sigma, best):
+    z = (mu - best) / sigma
+    cdf = 0.5 * (1 + np.vectorize(math.erf)(z / math.sqrt(2)))
+    pdf = np.exp(-0.5 * z ** 2) / math.sqrt(2 * math.pi)
+    return (mu - best) * cdf + sigma * pdf
+
+
+def _propose(features, observed, values, candidates, batch):
+    # `batch` candidates by expected improvement, each one added back with
+    # its predicted profit ("kriging believer") so a batch spreads out
+    observed, values, candidates = list(observed), list(values), list(candidates)
+    chosen = []
+    for _ in range(min(batch, len(candidates))):
+        gp = GaussianProcess().fit(features[observed], np.asarray(values))
+        mu, sigma = gp.predict(features[candidates])
+        j = int(np.argmax(expected_improvement(mu, sigma, max(values))))
+        chosen.append(candidates.pop(j))
+        observed.append(chosen[-1])
+        values.append(mu[j])
+    return chosen
+
+
+def surrogate_search(calc_cls, combos, data, risk_range, budget=0.1, initial=None, batch=4,
+                     seed=0, price_col='Close', trading_fee=0.0015, workers=None, chunksize=None):
+    """
+    Bayesian search over the `(outer_key, params)` combos of run_sweep that
+    evaluates only a `budget` fraction of them.
+
+    Computing a Calc's signal costs about the same whatever the history
+    length, while the bracket simulation of a risk level is cheap, so the
+    search spends its budget on combinations: each evaluated one is
+    backtested on the full history at every risk level, exactly as run_sweep
+    does, and scores its best net profit. After `initial` random combinations
+    (default a third of the budget) a Gaussian process over the scaled
+    parameters (grid_features) proposes `batch` combinations per round by
+    expected improvement until the budget is spent. Every round runs on one
+    process pool started for the whole search, with at most `batch` workers
+    (default the CPU count) since no round after the first has more tasks.
+
+    Returns a dict with the chosen `outer_key`, `risk` and `net_profit`, the
+    `evaluated` `(outer_key, risk, net_profit)` triples in evaluation order,
+    and the `cost` as a fraction of the combinations.
+    """
+    if not combos:
+        return {'outer_key': None, 'risk': None, 'net_profit': 0, 'evaluated': [], 'cost': 0.0}
+    risk_range = list(risk_range)
+    features = grid_features(combos)
+    evaluations = min(len(combos), max(2, math.ceil(budget * len(combos))))
+    initial = min(evaluations, initial or max(2, evaluations // 3))
+
+    order = np.random.default_rng(seed).permutation(len(combos))
+    pending = [int(i) for i in order[:initial]]
+    candidates = sorted(int(i) for i in order[initial:])
+    observed, values, evaluated = [], [], []
+    workers = min(workers or os.cpu_count(), batch)
+    with worker_pool(data, price_col, workers) as map_tasks:
+        while pending:
+            tasks = [(i, calc_cls, combos[i][1], risk_range, trading_fee) for i in pending]
+            for i, results in map_tasks(evaluate_combo, tasks, chunksize):
+                # best risk level of the combination, the first one on ties
+                risk, profit = max(((risk, profit) for risk, profit, _, _ in results), key=lambda rp: rp[1])
+                observed.append(i)
+                values.append(profit)
+                evaluated.append((combos[i][0], risk, profit))
+            left = evaluations - len(observed)
+            pending = _propose(features, observed, values, candidates, min(batch, left)) if left else []
+            candidates = [i for i in candidates if i not in pending]
+
+    best = max(range(len(evaluated)), key=lambda k: evaluated[k][2])
+    outer_key, risk, net_profit = evaluated[best]
+    return {'outer_key': outer_key, 'risk': risk, 'net_profit': net_profit,
+            'evaluated': evaluated, 'cost': len(evaluated) / len(combos)}
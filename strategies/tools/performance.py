@@ -0,0 +1,93 @@
+import numpy as np
+from .signals import Signal, as_signal_codes
+
+TRADING_DAYS = 252
+
+
+def _executed_from(step, fill, cash, shares, start, executed):
+    # sequential one-share trading over the BUY/SELL bars from `start` on,
+    # used once the vectorized path finds a BUY that cash cannot cover
+    executed[start:] = False
+    events = start + np.flatnonzero(step[start:])
+    for i, code, price in zip(events.tolist(), step[events].tolist(), fill[events].tolist()):
+        if code == Signal.BUY and cash >= price:
+            shares += 1
+            cash -= price
+            executed[i] = True
+        elif code == Signal.SELL and shares > 0:
+            shares -= 1
+            cash += price
+            executed[i] = True
+    return executed
+
+
+def performance(signal, open_, initial_capital, periods_per_year=TRADING_DAYS):
+    """
+    One-share-per-signal backtest of `signal` against `open_` prices, the
+    model behind calculate_profit: a BUY buys one share at the next bar's
+    open if cash covers it, a SELL sells one share if any are held.
+
+    Positions come from a reflected cumulative sum of the signals (sells never
+    take the position below zero) and cash from a single accumulate, so the
+    numbers match the sequential loop bit for bit. Only when a BUY would
+    overdraw cash is the rest of the history replayed trade by trade.
+
+    Returns a dict with per-bar `equity`, `position` and `cash` (index t is
+    the state after trading at open t, valued at open t), `trade_returns`
+    (sell / buy - 1 per closed share, FIFO), `profit`, final `capital`,
+    annualized `sharpe` and `sortino` of the bar returns, `max_drawdown`
+    as a fraction of the running peak, and `exposure`, the share of bars
+    with a position.
+    """
+    open_ = np.asarray(open_, dtype=float)
+    n = len(open_)
+    # signal i trades at open i + 1, the last bar has no next open
+    step = as_signal_codes(signal)[:max(n - 1, 0)].astype(np.int64)
+    fill = open_[1:]
+
+    walk = np.cumsum(step)
+    position = walk - np.minimum(np.minimum.accumulate(walk), 0)
+    held = np.concatenate(([0], position))
+    executed = (step == Signal.BUY) | ((step == Signal.SELL) & (held[:-1] > 0))
+    # `cash - p` and `cash + (-p)` round identically, adding 0.0 is exact
+    flows = np.where(executed, -step * fill, 0.0)
+    cash_path = np.add.accumulate(np.concatenate(([float(initial_capital)], flows)))
+
+    buys = step == Signal.BUY
+    # NaN opens never satisfy `cash >= price`, the comparison handles them
+    short = buys & ~(cash_path[:-1] >= fill)
+    if short.any():
+        first = int(short.argmax())
+        executed = _executed_from(step, fill, cash_path[first], int(held[first]), first, executed)
+        held = np.concatenate(([0], np.cumsum(np.where(executed, step, 0))))
+        cash_path = np.add.accumulate(np.concatenate(([float(initial_capital)],
+                                                      np.where(executed, -step * fill, 0.0))))
+
+    equity = cash_path + held * open_
+    buy_prices = fill[executed & buys]
+    sell_prices = fill[executed & (step == Signal.SELL)]
+    # one-share lots, so the k-th sale closes the k-th purchase
+    trade_returns = sell_prices / buy_prices[:len(sell_prices)] - 1
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(equity) / equity[:-1]
+        mean = returns.mean() if len(returns) else np.nan
+        std = returns.std(ddof=1) if len(returns) > 1 else np.nan
+        downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2)) if len(returns) else np.nan
+        sharpe = mean / std * np.sqrt(periods_per_year)
+        sortino = mean / downside * np.sqrt(periods_per_year)
+        peak = np.maximum.accumulate(equity) if n else equity
+        max_drawdown = np.max(1 - equity / peak) if n else 0.0
+
+    return {
+        'equity': equity,
+        'position': held,
+        'cash': cash_path,
+        'trade_returns': trade_returns,
+        'profit': equity[-1] - initial_capital if n else 0.0,
+        'capital': cash_path[-1],
+        'sharpe': sharpe,
+        'sortino': sortino,
+        'max_drawdown': max_drawdown,
+        'exposure': float(np.mean(held > 0)) if n else 0.0,
+    }
@@ -0,0 +1,340 @@
+import math
+import operator
+import numpy as np
+import pandas as pd
+from .rolling import RollingWindow, RollingMoments, Ewm, RollingArgExtreme, rolling_argmax, rolling_argmin
+from .indicator_cache import rolling_mean, rolling_std, ewm_mean
+
+
+class Node:
+    """
+    One indicator in a Pipeline. `inputs` are the nodes it consumes and
+    `params` its settings; together with the node type they form `key`, so
+    two strategies declaring e.g. `SMA(close, 20)` separately share one node.
+
+    Subclasses implement `vector(*inputs, symbol=None)` over whole pd.Series
+    histories (`symbol` keys the indicator cache when the inputs are Source
+    columns) and `stepper()`, which returns a `push(*inputs) -> float`
+    callable holding the incremental state for per-bar updates. Arithmetic
+    and `<`/`>` on nodes build Apply nodes, e.g.
+    `(close - SMA(close, 21)) / Std(close, 20)`.
+    """
+
+    def __init__(self, *inputs, params=()):
+        self.inputs = tuple(as_node(i) for i in inputs)
+        self.params = tuple(params)
+        self.key = (type(self).__name__, self.params, tuple(i.key for i in self.inputs))
+
+    def __repr__(self):
+        args = [repr(i) for i in self.inputs] + [repr(p) for p in self.params]
+        return f"{type(self).__name__}({', '.join(args)})"
+
+    def vector(self, *inputs, symbol=None):
+        raise NotImplementedError
+
+    def stepper(self):
+        raise NotImplementedError
+
+    def __add__(self, other):
+        return Apply(operator.add, self, other)
+
+    def __radd__(self, other):
+        return Apply(operator.add, other, self)
+
+    def __sub__(self, other):
+        return Apply(operator.sub, self, other)
+
+    def __rsub__(self, other):
+        return Apply(operator.sub, other, self)
+
+    def __mul__(self, other):
+        return Apply(operator.mul, self, other)
+
+    def __rmul__(self, other):
+        return Apply(operator.mul, other, self)
+
+    def __truediv__(self, other):
+        return Apply(operator.truediv, self, other)
+
+    def __rtruediv__(self, other):
+        return Apply(operator.truediv, other, self)
+
+    def __neg__(self):
+        return Apply(operator.neg, self)
+
+    def __lt__(self, other):
+        return Apply(_lt, self, other)
+
+    def __gt__(self, other):
+        return Apply(_gt, self, other)
+
+
+def as_node(value):
+    return value if isinstance(value, Node) else Const(value)
+
+
+def _lt(a, b):
+    # 1.0 / 0.0 in both modes, so comparisons can be weighted and summed
+    return (a < b) * 1.0
+
+
+def _gt(a, b):
+    return (a > b) * 1.0
+
+
+def _divide(a, b):
+    # float division by zero gives inf/NaN like pandas instead of raising
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.float64(a) / b)
+
+
+class Source(Node):
+    # a column of the input history, or a field of each bar
+    def __init__(self, field):
+        super().__init__(params=(field,))
+        self.field = field
+
+    def __repr__(self):
+        return f'Source({self.field!r})'
+
+    def read(self, frame):
+        if isinstance(frame, pd.Series):
+            return frame
+        columns = {str(c).lower(): c for c in frame.columns}
+        return frame[columns[self.field]]
+
+    def stepper(self):
+        return lambda bar: bar[self.field] if not np.isscalar(bar) else bar
+
+
+class Const(Node):
+    def __init__(self, value):
+        super().__init__(params=(value,))
+        self.value = value
+
+    def __repr__(self):
+        return repr(self.value)
+
+    def read(self, frame):
+        return self.value
+
+    def stepper(self):
+        return lambda bar: self.value
+
+
+class Apply(Node):
+    """
+    `fn(*inputs)` elementwise; `fn` must accept both pd.Series and floats.
+    Nodes share an Apply only when they use the same function object.
+    """
+
+    def __init__(self, fn, *inputs):
+        super().__init__(*inputs, params=(fn,))
+        self.fn = fn
+
+    def __repr__(self):
+        return f"{getattr(self.fn, '__name__', 'fn')}({', '.join(map(repr, self.inputs))})"
+
+    def vector(self, *inputs, symbol=None):
+        return self.fn(*inputs)
+
+    def stepper(self):
+        fn = _divide if self.fn is operator.truediv else self.fn
+        return lambda *inputs: float(fn(*inputs))
+
+
+class SMA(Node):
+    def __init__(self, source, window):
+        super().__init__(source, params=(window,))
+        self.window = window
+
+    def vector(self, values, symbol=None):
+        return rolling_mean(values, self.window, symbol)
+
+    def stepper(self):
+        roll = RollingWindow(self.window)
+
+        def push(value):
+            roll.push(value)
+            return roll.mean()
+        return push
+
+
+class Std(Node):
+    # sample standard deviation, like pandas rolling().std()
+    def __init__(self, source, window):
+        super().__init__(source, params=(window,))
+        self.window = window
+
+    def vector(self, values, symbol=None):
+        return rolling_std(values, self.window, symbol)
+
+    def stepper(self):
+        roll = RollingMoments(self.window)
+
+        def push(value):
+            roll.push(value)
+            return roll.std()
+        return push
+
+
+class EMA(Node):
+    def __init__(self, source, span, adjust=False):
+        super().__init__(source, params=(span, adjust))
+        self.span = span
+        self.adjust = adjust
+
+    def vector(self, values, symbol=None):
+        return ewm_mean(values, self.span, adjust=self.adjust, symbol=symbol)
+
+    def stepper(self):
+        return Ewm(self.span, adjust=self.adjust).push
+
+
+class RSI(Node):
+    # the RSI of RsiCrossoverCalc
+    def __init__(self, source, period):
+        super().__init__(source, params=(period,))
+        self.period = period
+
+    def vector(self, values, symbol=None):
+        delta = values.diff(1)
+        gain = delta.where(delta > 0, 0).fillna(0)
+        loss = (-delta.where(delta < 0, 0)).fillna(0)
+        ewm_gain = gain.ewm(span=self.period, min_periods=self.period).mean()
+        ewm_loss = loss.ewm(span=self.period, min_periods=self.period).mean()
+        return 100 - (100 / (1 + ewm_gain / ewm_loss))
+
+    def stepper(self):
+        ewm_gain = Ewm(self.period, min_periods=self.period)
+        ewm_loss = Ewm(self.period, min_periods=self.period)
+        prev = [None]
+
+        def push(value):
+            delta = 0.0 if prev[0] is None else value - prev[0]
+            prev[0] = value
+            gain = ewm_gain.push(max(delta, 0.0))
+            loss = ewm_loss.push(max(-delta, 0.0))
+            if loss == 0:
+                return 100.0 if gain > 0 else math.nan
+            return 100 - (100 / (1 + gain / loss))
+        return push
+
+
+class ATR(Node):
+    # rolling mean of the true range, as in VolatilityATRCalc
+    def __init__(self, window, high=None, low=None, close=None):
+        super().__init__(high or Source('high'), low or Source('low'), close or Source('close'),
+                         params=(window,))
+        self.window = window
+
+    def vector(self, high, low, close, symbol=None):
+        prev_close = close.shift(1)
+        # fmax skips the missing previous close on the first bar
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        return true_range.rolling(window=self.window).mean()
+
+    def stepper(self):
+        roll = RollingWindow(self.window)
+        prev = [None]
+
+        def push(high, low, close):
+            prev_close, prev[0] = prev[0], close
+            if prev_close is None:
+                roll.push(high - low)
+            else:
+                roll.push(max(high - low, abs(high - prev_close), abs(low - prev_close)))
+            return roll.mean()
+        return push
+
+
+class Aroon(Node):
+    # Aroon up (`mode='max'`) or down (`mode='min'`) of AroonCrossoverCalc
+    def __init__(self, source, window, mode='max'):
+        super().__init__(source, params=(window, mode))
+        self.window = window
+        self.mode = mode
+
+    def vector(self, values, symbol=None):
+        index = (rolling_argmax if self.mode == 'max' else rolling_argmin)(values, self.window)
+        return pd.Series((self.window - index) * 100 / self.window, index=values.index)
+
+    def stepper(self):
+        extreme = RollingArgExtreme(self.window, self.mode)
+
+        def push(value):
+            extreme.push(value)
+            return (self.window - extreme.index()) * 100 / self.window
+        return push
+
+
+def Sentiment():
+    # signed FinBERT score (probability, negative for 'negative') per bar,
+    # supplied by the strategy as a 'sentiment' column or bar field
+    return Source('sentiment')
+
+
+class Pipeline:
+    """
+    Named output nodes evaluated together. Nodes are deduplicated by `key`
+    across all outputs and evaluated once each in topological order, either
+    vectorized over a whole history (`run`) or incrementally per bar
+    (`update`). Composite strategies merge the nodes of the strategies they
+    combine with `Pipeline({**a.outputs, **b.outputs})`, so shared
+    indicators are still computed once.
+    """
+
+    def __init__(self, outputs):
+        self.outputs = dict(outputs)
+        canonical = {}
+        self.nodes = []
+
+        def visit(node):
+            if node.key in canonical:
+                return
+            for i in node.inputs:
+                visit(i)
+            canonical[node.key] = node
+            self.nodes.append(node)
+        for node in self.outputs.values():
+            visit(node)
+        self.reset()
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def reset(self):
+        # incremental state; run() is stateless
+        self._steppers = [node.stepper() for node in self.nodes]
+
+    def run(self, frame, symbol=None) -> pd.DataFrame:
+        """
+        Every output over the whole history in `frame` (a DataFrame with the
+        Source columns, or a price Series for `Source('close')`). With a
+        `symbol`, indicators of Source columns share the process-wide
+        indicator cache with the Calcs running on that symbol.
+        """
+        values = {}
+        for node in self.nodes:
+            if node.inputs:
+                # derived series have no stable name to key the cache by
+                direct = all(isinstance(i, Source) for i in node.inputs)
+                values[node.key] = node.vector(*[values[i.key] for i in node.inputs],
+                                               symbol=symbol if direct else None)
+            else:
+                values[node.key] = node.read(frame)
+        return pd.DataFrame({name: values[node.key] for name, node in self.outputs.items()},
+                            index=frame.index)
+
+    def update(self, bar) -> dict:
+        """
+        Every output after one more bar: a mapping with the Source fields
+        (e.g. a row of bars.df) or a bare close price.
+        """
+        values = {}
+        for node, push in zip(self.nodes, self._steppers):
+            if node.inputs:
+                values[node.key] = push(*[values[i.key] for i in node.inputs])
+            else:
+                values[node.key] = push(bar)
+        return {name: values[node.key] for name, node in self.outputs.items()}
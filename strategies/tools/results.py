@@ -0,0 +1,123 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# metric columns of every sweep table, after the parameter columns
+METRICS = ['risk', 'net_profit', 'cash_remaining', 'cash_pct']
+# per-row trade prices, kept by run_sweep(..., trades=True)
+TRADES = ['buy_prices', 'sell_prices']
+
+
+def _column(values):
+    # numeric parameters keep their NumPy dtype, anything else is stored as
+    # dictionary-encoded strings
+    array = np.asarray(values)
+    if array.dtype.kind in 'biuf':
+        return pa.array(array)
+    return pa.array([str(v) for v in values]).dictionary_encode()
+
+
+class SweepResults:
+    """
+    Sweep results as a typed columnar table (a pyarrow.Table): one row per
+    parameter combination and risk level, with `combo` (the position of the
+    combination in the sweep's `combos`), a numeric column per parameter,
+    then `risk`, `net_profit`, `cash_remaining` (the running cash after the
+    row) and `cash_pct` (its change in percent), and the row's
+    `buy_prices`/`sell_prices` lists when the sweep kept its trades.
+
+    Millions of rows take a few tens of bytes each instead of a dict per
+    combination. `top`, `groupby` and `filter` run on the columns;
+    `to_parquet`/`read_parquet` persist the table, and `read_parquet` can
+    push `filters` down to the file so only matching row groups are read.
+    """
+
+    def __init__(self, table):
+        self.table = table
+
+    @classmethod
+    def from_columns(cls, columns):
+        return cls(pa.table({name: values if isinstance(values, (pa.Array, pa.ChunkedArray)) else _column(values)
+                             for name, values in columns.items()}))
+
+    @classmethod
+    def read_parquet(cls, path, columns=None, filters=None):
+        return cls(pq.read_table(path, columns=columns, filters=filters, memory_map=True))
+
+    def to_parquet(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        pq.write_table(self.table, tmp_path)
+        os.replace(tmp_path, path)
+
+    def __len__(self):
+        return self.table.num_rows
+
+    @property
+    def params(self):
+        # parameter column names, in combination order
+        return [name for name in self.table.column_names
+                if name != 'combo' and name not in METRICS and name not in TRADES]
+
+    def column(self, name) -> np.ndarray:
+        return self.table.column(name).to_numpy()
+
+    def to_pandas(self) -> pd.DataFrame:
+        return self.table.to_pandas()
+
+    def filter(self, condition=None, **equal) -> 'SweepResults':
+        """
+        Rows matching a pyarrow compute expression, e.g.
+        `(pc.field('window') >= 20) & (pc.field('risk') < 0.03)`, or a
+        boolean mask, and whose columns equal the `equal` values, e.g.
+        `filter(window=20)`.
+        """
+        for name, value in equal.items():
+            term = pc.field(name) == value
+            condition = term if condition is None else condition & term
+        return self if condition is None else SweepResults(self.table.filter(condition))
+
+    def _top_rows(self, k, by):
+        values = self.column(by)
+        k = min(k, len(values))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        # every row at least as good as the k-th best, ties included
+        threshold = np.partition(values, len(values) - k)[len(values) - k]
+        rows = np.flatnonzero(values >= threshold)
+        return rows[np.lexsort((rows, -values[rows]))][:k]
+
+    def top(self, k=10, by='net_profit') -> pd.DataFrame:
+        """
+        The `k` rows with the largest `by`, best first, indexed by row; ties
+        keep row order, so the first combination and risk level win like a
+        serial scan. Candidates are selected with a partition instead of
+        sorting the whole table.
+        """
+        rows = self._top_rows(k, by)
+        return self.table.take(rows).to_pandas().set_index(pd.Index(rows, name='row'))
+
+    def best(self, by='net_profit', baseline=1.0):
+        """
+        The most profitable row as a dict, or None if no row beats
+        `baseline`: by default a net_profit equity multiple of 1.0, what a
+        combination that never trades ends with.
+        """
+        rows = self._top_rows(1, by)
+        if not len(rows):
+            return None
+        row = self.table.take(rows).to_pylist()[0]
+        return row if row[by] > baseline else None
+
+    def groupby(self, keys, metric='net_profit', aggregations=('max', 'mean')) -> pd.DataFrame:
+        """
+        `aggregations` of `metric` per distinct value of the `keys` columns,
+        e.g. the best profit per window over all thresholds and risk levels;
+        columns are named `{metric}_{aggregation}`.
+        """
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        grouped = self.table.group_by(keys).aggregate([(metric, agg) for agg in aggregations])
+        return grouped.to_pandas().sort_values(keys).set_index(keys)
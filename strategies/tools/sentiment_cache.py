@@ -0,0 +1,119 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.algotrade', 'finbert.sqlite')
+NUM_LABELS = 3
+
+
+def normalize_headline(text):
+    # FinBERT is uncased and ignores runs of whitespace
+    return re.sub(r'\s+', ' ', str(text)).strip().lower()
+
+
+def headline_key(text):
+    return hashlib.sha1(normalize_headline(text).encode('utf-8')).hexdigest()
+
+
+class SentimentCache:
+    """
+    Per-headline FinBERT logits, keyed by the SHA-1 of the normalized
+    headline. Lookups go through an in-memory LRU of `capacity` entries
+    backed by a SQLite file at `path` (default `$FINBERT_CACHE` or
+    `~/.algotrade/finbert.sqlite`); `path=':memory:'` keeps nothing on disk.
+
+    `namespace` separates logits produced by different model setups that
+    share one file.
+    """
+
+    def __init__(self, path=None, capacity=4096, namespace='fp32'):
+        self.path = path or os.environ.get('FINBERT_CACHE', DEFAULT_PATH)
+        self.capacity = capacity
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # lumibot runs each strategy in its own thread
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute('CREATE TABLE IF NOT EXISTS logits '
+                         '(namespace TEXT, key TEXT, logits BLOB, PRIMARY KEY (namespace, key))')
+        self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM logits WHERE namespace = ?',
+                                    (self.namespace,)).fetchone()[0]
+
+    def _remember(self, key, logits):
+        self._memory[key] = logits
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys):
+        # {key: logits} for the keys that are cached, memory first then disk
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                else:
+                    missing.append(key)
+            # stay well below SQLite's bound-parameter limit
+            for i in range(0, len(missing), 500):
+                chunk = missing[i:i + 500]
+                rows = self._db.execute(
+                    f'SELECT key, logits FROM logits WHERE namespace = ? AND key IN ({",".join("?" * len(chunk))})',
+                    [self.namespace, *chunk])
+                for key, blob in rows:
+                    logits = np.frombuffer(blob, dtype=np.float32)
+                    self._remember(key, logits)
+                    found[key] = logits
+        return found
+
+    def put_many(self, items):
+        items = [(key, np.asarray(logits, dtype=np.float32).reshape(NUM_LABELS)) for key, logits in items]
+        with self._lock:
+            for key, logits in items:
+                self._remember(key, logits)
+            self._db.executemany('INSERT OR REPLACE INTO logits VALUES (?, ?, ?)',
+                                 [(self.namespace, key, logits.tobytes()) for key, logits in items])
+            self._db.commit()
+
+    def logits(self, headlines, infer):
+        """
+        Logits for every headline as an (n, 3) float32 array. `infer` is
+        called once with the list of distinct headlines not cached yet and
+        must return their logits in the same order.
+        """
+        keys = [headline_key(h) for h in headlines]
+        found = self.get_many(list(dict.fromkeys(keys)))
+        unseen = {}
+        for key, headline in zip(keys, headlines):
+            if key not in found and key not in unseen:
+                unseen[key] = headline
+        # the strategies share one cache across threads
+        with self._lock:
+            self.hits += len(keys) - len(unseen)
+            self.misses += len(unseen)
+        if unseen:
+            computed = np.asarray(infer(list(unseen.values())), dtype=np.float32)
+            new = list(zip(unseen, computed))
+            self.put_many(new)
+            found.update((key, logits) for key, logits in new)
+        if not keys:
+            return np.empty((0, NUM_LABELS), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def close(self):
+        with self._lock:
+            self._db.close()
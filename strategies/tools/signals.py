@@ -0,0 +1,38 @@
+from enum import IntEnum
+import numpy as np
+
+
+class Signal(IntEnum):
+    """
+    Trading signal stored as int8 in every Calc output. Being an IntEnum,
+    members compare equal to the raw codes, so `data['Signal'] == Signal.BUY`
+    works directly on the int8 column.
+    """
+    SELL = -1
+    HOLD = 0
+    BUY = 1
+
+
+SIGNAL_DTYPE = np.int8
+# display strings indexed by code + 1
+LABELS = np.array([s.name for s in sorted(Signal)])
+
+
+def encode_signal(buy, sell) -> np.ndarray:
+    # int8 signal codes from boolean BUY / SELL masks (BUY wins if both are set)
+    return np.where(buy, Signal.BUY, np.where(sell, Signal.SELL, Signal.HOLD)).astype(SIGNAL_DTYPE)
+
+
+def as_signal_codes(signal) -> np.ndarray:
+    # accept legacy 'BUY'/'SELL'/'HOLD' strings as well as int8 codes
+    signal = np.asarray(signal)
+    if signal.dtype.kind in 'UOS':
+        return encode_signal(signal == 'BUY', signal == 'SELL')
+    return signal.astype(SIGNAL_DTYPE, copy=False)
+
+
+def signal_labels(signal):
+    # string view of int8 codes, for printing only
+    codes = np.asarray(signal)
+    labels = LABELS[codes.astype(np.intp) + 1]
+    return labels if codes.ndim else str(labels)
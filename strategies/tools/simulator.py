@@ -0,0 +1,179 @@
+import numpy as np
+from .signals import Signal, as_signal_codes
+
+# bars looked ahead at once for every candidate entry; exits further out are
+# found with an exponential search starting at the end of this horizon
+_LOOKAHEAD = 16
+# candidate entries resolved per vectorized block, bounds the temporaries
+_BLOCK = 1 << 16
+
+
+def _first_exit(high, low, start, take_profit_price, stop_loss_price):
+    # exponential search so a trade costs time proportional to its duration
+    n = len(low)
+    lo = start
+    size = 2 * _LOOKAHEAD
+    while lo < n:
+        hi = min(n, lo + size)
+        hits = (low[lo:hi] < stop_loss_price) | (high[lo:hi] > take_profit_price)
+        if hits.any():
+            return lo + int(hits.argmax())
+        lo = hi
+        size *= 2
+    return -1
+
+
+def _nearby_exits(high, low, entries, take_profit_prices, stop_loss_prices):
+    # exit bar of every candidate entry within _LOOKAHEAD bars, -1 when the
+    # history ends first and -2 when the exit lies further out
+    n = len(low)
+    exits = np.full(len(entries), -2, dtype=np.int64)
+    offsets = np.arange(_LOOKAHEAD)
+    for lo in range(0, len(entries), _BLOCK):
+        block = slice(lo, lo + _BLOCK)
+        idx = entries[block, None] + offsets
+        in_range = idx < n
+        idx = np.minimum(idx, n - 1)
+        hits = ((low[idx] < stop_loss_prices[block, None])
+                | (high[idx] > take_profit_prices[block, None])) & in_range
+        found = hits.any(axis=1)
+        block_exits = np.where(found, entries[block] + hits.argmax(axis=1), -2)
+        block_exits[~found & (entries[block] + _LOOKAHEAD >= n)] = -1
+        exits[block] = block_exits
+    return exits
+
+
+def settle_cash(cash, buy_prices, sell_prices):
+    # interleave cash flows in trade order so the running total matches a
+    # sequential `cash -= buy; cash += sell` loop bit for bit
+    flows = np.empty(len(buy_prices) + len(sell_prices) + 1)
+    flows[0] = cash
+    flows[1::2][:len(buy_prices)] = -np.asarray(buy_prices)
+    flows[2::2][:len(sell_prices)] = sell_prices
+    return np.add.accumulate(flows)[-1]
+
+
+def simulate_bracket(signal, open_, high, low, risk, trading_fee=0.0015, cash=0.0):
+    """
+    Bracket-order backtest over one price history.
+
+    A Signal.BUY enters at the next bar's open when flat; the position is
+    closed at `buy * (1 - risk)` once a low breaches the stop-loss or at
+    `buy * (1 + risk)` once a high breaches the take-profit (stop-loss wins
+    when both happen on the same bar). Exits are checked from the signal bar
+    onward, exactly as the iterrows loops in tests/ did.
+
+    Returns a dict with `net_profit` (compounded return of the closed trades
+    net of `trading_fee`), `cash` (`cash` after paying for every entry and
+    collecting every exit), and the bar indices and prices of buys and sells.
+    """
+    signal = as_signal_codes(signal)
+    open_ = np.asarray(open_, dtype=float)
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    tp = (1 + risk)
+    sl = (1 - risk)
+
+    shifted_open = np.full(len(open_), np.nan)
+    shifted_open[:-1] = open_[1:]
+    entries = np.flatnonzero((signal == Signal.BUY) & ~np.isnan(shifted_open))
+
+    take_profit_prices = shifted_open[entries] * tp
+    stop_loss_prices = shifted_open[entries] * sl
+    exits = _nearby_exits(high, low, entries, take_profit_prices, stop_loss_prices)
+    next_entries = np.searchsorted(entries, exits + 1).tolist()
+    exits = exits.tolist()
+
+    # only the chain of trades actually taken is walked in Python
+    taken, sell_idx = [], []
+    k = 0
+    while k < len(entries):
+        taken.append(k)
+        exit_ = exits[k]
+        if exit_ == -2:
+            exit_ = _first_exit(high, low, entries[k] + _LOOKAHEAD,
+                                take_profit_prices[k], stop_loss_prices[k])
+            next_k = int(np.searchsorted(entries, exit_ + 1))
+        else:
+            next_k = next_entries[k]
+        if exit_ < 0:
+            # position still open at the end of the history
+            break
+        sell_idx.append(exit_)
+        k = next_k
+
+    taken = np.asarray(taken, dtype=np.int64)
+    buy_idx = entries[taken]
+    buy_prices = shifted_open[buy_idx]
+    sell_idx = np.asarray(sell_idx, dtype=np.int64)
+    closed_taken = taken[:len(sell_idx)]
+    stopped = low[sell_idx] < stop_loss_prices[closed_taken]
+    sell_prices = np.where(stopped, stop_loss_prices[closed_taken], take_profit_prices[closed_taken])
+
+    closed = buy_prices[:len(sell_prices)]
+    profits = (sell_prices - closed) / closed - trading_fee
+    net_profit = (profits + 1).prod()
+
+    cash = settle_cash(cash, buy_prices, sell_prices)
+
+    return {
+        'net_profit': net_profit,
+        'cash': cash,
+        'buy_idx': buy_idx,
+        'buy_prices': buy_prices,
+        'sell_idx': sell_idx,
+        'sell_prices': sell_prices,
+    }
+
+
+def bracket_windows(signal, open_, high, low, risk, windows, trading_fee=0.0015):
+    """
+    `simulate_bracket(signal[w], open_[w], high[w], low[w], risk,
+    trading_fee)['net_profit']` for every slice `w` in `windows`, bit for bit,
+    without re-simulating overlapping windows.
+
+    A window run starts flat at its first BUY, and every later trade only
+    depends on where the previous one exited, so exits are found once on the
+    full history and each window just walks its chain of trades until one
+    would exit (or enter) past the window's end.
+    """
+    signal = as_signal_codes(signal)
+    open_ = np.asarray(open_, dtype=float)
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    tp = (1 + risk)
+    sl = (1 - risk)
+
+    shifted_open = np.full(len(open_), np.nan)
+    shifted_open[:-1] = open_[1:]
+    entries = np.flatnonzero((signal == Signal.BUY) & ~np.isnan(shifted_open))
+    take_profit_prices = shifted_open[entries] * tp
+    stop_loss_prices = shifted_open[entries] * sl
+    exits = _nearby_exits(high, low, entries, take_profit_prices, stop_loss_prices).tolist()
+    next_entries = np.searchsorted(entries, np.asarray(exits) + 1).tolist()
+    entry_list = entries.tolist()
+
+    profits = np.empty(len(windows))
+    for w, window in enumerate(windows):
+        start, stop = window.indices(len(open_))[:2]
+        taken, sell_idx = [], []
+        k = int(np.searchsorted(entries, start))
+        # the window's last bar has no next open to enter at
+        while k < len(entry_list) and entry_list[k] < stop - 1:
+            exit_ = exits[k]
+            if exit_ == -2:
+                exit_ = exits[k] = _first_exit(high, low, entry_list[k] + _LOOKAHEAD,
+                                               take_profit_prices[k], stop_loss_prices[k])
+                next_entries[k] = int(np.searchsorted(entries, exit_ + 1))
+            if exit_ < 0 or exit_ >= stop:
+                break
+            taken.append(k)
+            sell_idx.append(exit_)
+            k = next_entries[k]
+        taken = np.asarray(taken, dtype=np.int64)
+        sell_idx = np.asarray(sell_idx, dtype=np.int64)
+        stopped = low[sell_idx] < stop_loss_prices[taken]
+        sell_prices = np.where(stopped, stop_loss_prices[taken], take_profit_prices[taken])
+        closed = shifted_open[entries[taken]]
+        profits[w] = ((sell_prices - closed) / closed - trading_fee + 1).prod()
+    return profits
@@ -0,0 +1,231 @@
+import json
+import os
+from datetime import timedelta
+from functools import partial
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from lumibot.entities import Asset
+from .bars import TIMESTEPS
+from .common import YahooDataBacktesting, datetime
+from .coverage import add_interval, missing_intervals
+
+COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+DEFAULT_ROOT = os.path.join(os.path.expanduser('~'), '.algotrade', 'ohlcv')
+# parquet schema metadata key holding the date ranges already requested
+_COVERAGE_KEY = b'algotrade.coverage'
+
+
+def yahoo_fetch(symbol, start, end, timestep='day'):
+    import yfinance as yf
+    interval = {'day': '1d', 'minute': '1m'}.get(timestep, timestep)
+    df = yf.download(symbol, start=start, end=end, interval=interval,
+                     auto_adjust=False, progress=False)
+    if isinstance(df.columns, pd.MultiIndex):
+        # newer yfinance versions add a ticker level even for one symbol
+        df.columns = df.columns.get_level_values(0)
+    return df
+
+
+def _bar_step(timestep):
+    # one bar interval; daily bars only exist on business days
+    if timestep == 'day':
+        return pd.offsets.BDay()
+    return TIMESTEPS[timestep][1] if timestep in TIMESTEPS else pd.Timedelta(days=1)
+
+
+def _with_bars(ranges, index, step):
+    # each [start, end) range up to its last bar in `index` plus one bar
+    # interval; ranges without bars are dropped so they are fetched again
+    covered = []
+    for lo, hi in ranges:
+        last = index.searchsorted(hi, side='left') - 1
+        if last >= 0 and index[last] >= lo:
+            covered.append((lo, min(hi, index[last] + step)))
+    return covered
+
+
+def _normalize(df):
+    df = df.rename(columns=lambda c: str(c).lower())
+    df = df[[c for c in COLUMNS if c in df.columns]].astype('float64')
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        # keep exchange wall-clock time, the data source localizes on read
+        index = index.tz_localize(None)
+    df.index = index.rename('datetime')
+    return df[~df.index.duplicated(keep='last')].sort_index()
+
+
+class OhlcvStore:
+    """
+    On-disk OHLCV bars, one Parquet file per symbol and timestep under `root`
+    (default `$ALGOTRADE_STORE` or `~/.algotrade/ohlcv`). While
+    `$ALGOTRADE_SYNTHETIC` is set, a store created without `fetch` serves
+    generated bars instead (see strategies/tools/synthetic.py).
+
+    `fill` downloads only the dates outside the ranges already requested for a
+    symbol, so repeated runs over the same period never touch the network.
+    `read` memory-maps the file and returns a DataFrame with lowercase
+    open/high/low/close/volume columns; `arrays` returns the same data as
+    NumPy views.
+    """
+
+    def __init__(self, root=None, fetch=None):
+        self.root = root or os.environ.get('ALGOTRADE_STORE', DEFAULT_ROOT)
+        self.fetch = fetch or yahoo_fetch
+        if fetch is None:
+            from .synthetic import env_settings, synthetic_root, synthetic_fetch
+            settings = env_settings()
+            if settings is not None:
+                self.root = synthetic_root(self.root, **settings)
+                self.fetch = partial(synthetic_fetch, **settings)
+
+    def path(self, symbol, timestep='day'):
+        return os.path.join(self.root, timestep, f'{symbol.upper()}.parquet')
+
+    def symbols(self, timestep='day'):
+        folder = os.path.join(self.root, timestep)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(f[:-len('.parquet')] for f in os.listdir(folder) if f.endswith('.parquet'))
+
+    def _load(self, symbol, timestep):
+        path = self.path(symbol, timestep)
+        if not os.path.exists(path):
+            return None, []
+        table = pq.read_table(path, memory_map=True)
+        coverage = (table.schema.metadata or {}).get(_COVERAGE_KEY)
+        if coverage is None:
+            return table, []
+        coverage = json.loads(coverage)
+        if coverage and isinstance(coverage[0], str):
+            # files written before coverage became a list of ranges
+            coverage = [coverage]
+        coverage = [(pd.Timestamp(lo), pd.Timestamp(hi)) for lo, hi in coverage]
+        # files written before coverage stopped at the last bar may claim
+        # ranges whose fetch failed or that were still in the future
+        index = pd.DatetimeIndex(table.column('datetime').to_numpy())
+        return table, _with_bars(coverage, index, _bar_step(timestep))
+
+    def coverage(self, symbol, timestep='day'):
+        # sorted, disjoint [start, end) ranges of dates already requested for `symbol`
+        return self._load(symbol, timestep)[1]
+
+    def read(self, symbol, start=None, end=None, timestep='day', columns=None) -> pd.DataFrame:
+        table, _ = self._load(symbol, timestep)
+        if table is None:
+            return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name='datetime'))
+        df = table.to_pandas()
+        if columns is not None:
+            df = df[columns]
+        if start is not None or end is not None:
+            start = None if start is None else pd.Timestamp(start)
+            end = None if end is None else pd.Timestamp(end)
+            index = df.index
+            lo = 0 if start is None else index.searchsorted(start, side='left')
+            hi = len(index) if end is None else index.searchsorted(end, side='left')
+            df = df.iloc[lo:hi]
+        return df
+
+    def arrays(self, symbol, start=None, end=None, timestep='day'):
+        # zero-copy NumPy views straight into the memory-mapped file
+        table, _ = self._load(symbol, timestep)
+        if table is None:
+            return {}
+        table = table.combine_chunks()
+        index = table.column('datetime').to_numpy()
+        lo = 0 if start is None else index.searchsorted(pd.Timestamp(start).to_datetime64())
+        hi = len(index) if end is None else index.searchsorted(pd.Timestamp(end).to_datetime64())
+        table = table.slice(lo, hi - lo)
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+
+    def write(self, symbol, df, timestep='day', coverage=None):
+        # merge `df` into the stored bars, newer rows win on duplicate dates
+        table, stored_coverage = self._load(symbol, timestep)
+        df = _normalize(df)
+        if table is not None:
+            df = _normalize(pd.concat([table.to_pandas(), df]))
+        if coverage is None and not stored_coverage and len(df):
+            coverage = (df.index[0], df.index[-1] + timedelta(days=1))
+        if coverage is not None:
+            # separate requests stay separate ranges, so the gaps between them
+            # are fetched later; dates past the last bar returned stay missing
+            for lo, hi in _with_bars([(pd.Timestamp(coverage[0]), pd.Timestamp(coverage[1]))],
+                                     df.index, _bar_step(timestep)):
+                stored_coverage = add_interval(stored_coverage, lo, hi)
+        new_table = pa.Table.from_pandas(df)
+        if stored_coverage:
+            metadata = dict(new_table.schema.metadata or {})
+            metadata[_COVERAGE_KEY] = json.dumps([[str(lo), str(hi)] for lo, hi in stored_coverage]).encode()
+            new_table = new_table.replace_schema_metadata(metadata)
+        path = self.path(symbol, timestep)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        pq.write_table(new_table, tmp_path)
+        os.replace(tmp_path, path)
+
+    def missing_ranges(self, symbol, start, end, timestep='day'):
+        return missing_intervals(self.coverage(symbol, timestep), pd.Timestamp(start), pd.Timestamp(end))
+
+    def fill(self, symbol, start, end, timestep='day'):
+        # append only the dates in [start, end) that were never requested;
+        # the future and failed or empty fetches are not marked as covered
+        end = min(pd.Timestamp(end), pd.Timestamp.now().floor('s'))
+        ranges = self.missing_ranges(symbol, start, end, timestep)
+        for lo, hi in ranges:
+            df = self.fetch(symbol, lo, hi, timestep=timestep)
+            if df is None or not len(df):
+                continue
+            self.write(symbol, df, timestep, coverage=(lo, hi))
+        return len(ranges)
+
+    def download(self, symbol, start, end, timestep='day') -> pd.DataFrame:
+        # drop-in for yf.download in the strategy tests, served from the store
+        self.fill(symbol, start, end, timestep)
+        df = self.read(symbol, start, end, timestep)
+        return df.rename(columns=str.capitalize)
+
+
+class LocalDataBacktesting(YahooDataBacktesting):
+    """
+    Backtesting data source that serves `get_historical_prices` from an
+    OhlcvStore. Missing dates are filled once on first use (unless
+    `fill=False`, which runs fully offline); `history_days` of bars before
+    `datetime_start` are kept for the strategies' lookback windows.
+    """
+
+    def __init__(self, datetime_start, datetime_end, store=None, fill=True, history_days=365, **kwargs):
+        super().__init__(datetime_start=datetime_start, datetime_end=datetime_end, **kwargs)
+        self.name = 'local'
+        self.store = store or OhlcvStore()
+        self.fill_missing = fill
+        self.history_days = history_days
+
+    def _get_source_symbol_data(self, asset, timestep):
+        if isinstance(asset, str):
+            asset = Asset(symbol=asset)
+        interval = self._parse_source_timestep(timestep, reverse=True)
+        store_key = self._store_key(asset, interval)
+        if store_key in self._data_store:
+            return self._data_store[store_key]
+
+        store_timestep = 'day' if interval == '1d' else timestep
+        start = datetime.combine(self.datetime_start.date(), datetime.min.time()) - timedelta(days=self.history_days)
+        end = datetime.combine(self.datetime_end.date(), datetime.min.time()) + timedelta(days=1)
+        if self.fill_missing:
+            self.store.fill(asset.symbol, start, end, store_timestep)
+        df = self.store.read(asset.symbol, timestep=store_timestep)
+        if df.empty:
+            return None
+        df = df.copy()
+        df.index = df.index.tz_localize(self.DEFAULT_TIMEZONE)
+        df['dividend'] = 0.0
+        return self._append_data(asset, df, interval)
+
+    def _pull_source_bars(self, assets, length, timestep=YahooDataBacktesting.MIN_TIMESTEP,
+                          timeshift=None, quote=None, include_after_hours=False):
+        # one store read per asset instead of a batched Yahoo download
+        return {
+            asset: self._pull_source_symbol_bars(asset, length, timestep=timestep, timeshift=timeshift)
+            for asset in assets
+        }
@@ -0,0 +1,149 @@
+import os
+from contextlib import contextmanager
+import numpy as np
+import pyarrow as pa
+from concurrent.futures import ProcessPoolExecutor
+from .simulator import simulate_bracket, settle_cash
+from .results import SweepResults
+
+# price history shared by every task of a worker process, set once by
+# _init_worker instead of being pickled with each task
+_DATA = None
+_PRICE_COL = None
+
+
+def _init_worker(data, price_col):
+    global _DATA, _PRICE_COL
+    _DATA = data
+    _PRICE_COL = price_col
+
+
+def ohlc_columns(data, names=('open', 'high', 'low')):
+    # the strategy tests use both yfinance ('Open') and lumibot ('open') casing
+    columns = {str(c).lower(): c for c in data.columns}
+    return [data[columns[name]] for name in names]
+
+
+def worker_data():
+    # (full frame, get_data input) of the running sweep, in any worker
+    return _DATA, (_DATA if _PRICE_COL is None else _DATA[_PRICE_COL])
+
+
+def evaluate_combo(task):
+    """
+    Backtest one `(outer_key, calc_cls, params, risk_range, trading_fee)`
+    task on the worker's data (worker_data): the Calc's signals once, then
+    the bracket simulation per risk level. Returns `(outer_key, [(risk,
+    net_profit, buy_prices, sell_prices), ...])`.
+    """
+    outer_key, calc_cls, params, risk_range, trading_fee = task
+    calc = calc_cls(params=params)
+    data, prices = worker_data()
+    signal, _ = calc.get_signal(prices)
+    open_, high, low = ohlc_columns(data)
+    results = []
+    for risk in risk_range:
+        result = simulate_bracket(signal, open_, high, low, risk, trading_fee)
+        results.append((risk, result['net_profit'], result['buy_prices'], result['sell_prices']))
+    return outer_key, results
+
+
+@contextmanager
+def worker_pool(data, price_col='Close', workers=None):
+    """
+    A lazy `map(fn, tasks, chunksize=None)` function over one process pool
+    whose workers load `data` once; `fn` reads it back with worker_data().
+    Results come back in task order as they finish, so a caller that
+    reduces them as it goes never holds all of them at once. The
+    pool stays up for the whole `with` block, so repeated small maps (the
+    rounds of surrogate_search) neither start workers nor ship `data`
+    again. `workers` defaults to the CPU count and `workers=1` runs
+    in-process; `chunksize` defaults to about four chunks per worker.
+    """
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        _init_worker(data, price_col)
+        yield lambda fn, tasks, chunksize=None: map(fn, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_worker,
+                             initargs=(data, price_col)) as executor:
+        def map_tasks(fn, tasks, chunksize=None):
+            # a few chunks per worker keeps the pool busy without per-task overhead
+            chunksize = chunksize or max(1, len(tasks) // (workers * 4))
+            return executor.map(fn, tasks, chunksize=chunksize)
+        yield map_tasks
+
+
+def pool_map(fn, tasks, data, price_col='Close', workers=None, chunksize=None):
+    # `[fn(task) for task in tasks]` on a worker_pool of its own
+    with worker_pool(data, price_col, workers) as map_tasks:
+        return list(map_tasks(fn, tasks, chunksize))
+
+
+def run_sweep(calc_cls, combos, data, risk_range, price_col='Close',
+              trading_fee=0.0015, cash=1000000, workers=None, chunksize=None, trades=False):
+    """
+    Evaluate `calc_cls` for every `(outer_key, params)` in `combos` and every
+    risk level with the bracket simulation, fanned out over a process pool.
+
+    `price_col` selects the column passed to `get_data`; None passes the whole
+    frame (VolatilityATRCalc). `workers` defaults to the CPU count and
+    `workers=1` runs in-process; `chunksize` tasks are sent to a worker at a
+    time (default: about four chunks per worker).
+
+    Returns a SweepResults table with one row per combination and risk
+    level, the running cash carried across rows in `combos` order just like
+    a serial loop. Parameter columns are named after the `params` keys;
+    `combo` indexes into `combos`.
+
+    Each combination's trades are settled into the running cash as soon as
+    its result arrives and then dropped, so memory stays at the scalar
+    columns however large the grid. `trades=True` keeps them as
+    `buy_prices`/`sell_prices` list columns.
+    """
+    risk_range = list(risk_range)
+    tasks = [(outer_key, calc_cls, params, risk_range, trading_fee)
+             for outer_key, params in combos]
+    rows = len(combos) * len(risk_range)
+    net_profit = np.empty(rows)
+    cash_remaining = np.empty(rows)
+    buys, sells = [], []
+    initial_cash = cash
+    row = 0
+    with worker_pool(data, price_col, workers) as map_tasks:
+        for _, risk_results in map_tasks(evaluate_combo, tasks, chunksize):
+            for _, profit, buy_prices, sell_prices in risk_results:
+                cash = settle_cash(cash, buy_prices, sell_prices)
+                net_profit[row] = profit
+                cash_remaining[row] = cash
+                row += 1
+                if trades:
+                    buys.append(buy_prices)
+                    sells.append(sell_prices)
+
+    names = list(combos[0][1]) if combos else []
+    columns = {'combo': np.repeat(np.arange(len(combos), dtype=np.int32), len(risk_range))}
+    for name in names:
+        columns[name] = np.repeat(np.asarray([params[name] for _, params in combos]), len(risk_range))
+    columns['risk'] = np.tile(np.asarray(risk_range, dtype=float), len(combos))
+    columns['net_profit'] = net_profit
+    columns['cash_remaining'] = cash_remaining
+    columns['cash_pct'] = (cash_remaining - initial_cash) / initial_cash * 100
+    if trades:
+        columns['buy_prices'] = pa.array([np.asarray(p, dtype=float) for p in buys], pa.list_(pa.float64()))
+        columns['sell_prices'] = pa.array([np.asarray(p, dtype=float) for p in sells], pa.list_(pa.float64()))
+    return SweepResults.from_columns(columns)
+
+
+def sweep_workers(default=None):
+    # worker count for the test sweeps, overridable like SYMBOL
+    workers = os.environ.get('WORKERS')
+    return int(workers) if workers else default
+
+
+def sweep_path(name):
+    # where the test sweeps keep their result tables, or None to not keep
+    # them unless $ALGOTRADE_SWEEPS names a folder
+    root = os.environ.get('ALGOTRADE_SWEEPS')
+    return os.path.join(root, f'{name}.parquet') if root else None
@@ -0,0 +1,231 @@
+import math
+import os
+import zlib
+from functools import partial
+import numpy as np
+import pandas as pd
+from .bars import TIMESTEPS
+from .store import DEFAULT_ROOT, OhlcvStore, LocalDataBacktesting
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+# first bar of every generated history; later bars never change the earlier ones
+ORIGIN = pd.Timestamp('2000-01-03')
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=30)
+SESSION = pd.Timedelta(hours=6, minutes=30)
+
+# per-bar (daily) parameters of each model
+MODELS = {
+    'gbm': {'drift': 0.0002, 'volatility': 0.015},
+    'jump': {'drift': 0.0003, 'volatility': 0.012, 'jump_rate': 0.01, 'jump_mean': -0.01, 'jump_std': 0.05},
+    'regime': {'regimes': ((0.0004, 0.01), (-0.001, 0.03)), 'switch': (0.01, 0.05)},
+}
+# shared by every model: correlation of the symbols' returns with a common
+# market factor, share of the variance falling in the overnight gap, the
+# first close (drawn per symbol if None) and the mean volume
+COMMON = {'correlation': 0.3, 'gap': 0.2, 'price': None, 'volume': 1e6}
+
+
+def _key(symbol):
+    return zlib.crc32(str(symbol).upper().encode())
+
+
+def _regimes(rng, bars, regimes, switch):
+    # (drift, volatility) per bar of a two-state Markov chain starting calm;
+    # state k lasts a geometric number of bars with mean 1 / switch[k]
+    lengths = []
+    total = 0
+    while total < bars:
+        # chunks of 64 runs, so run k is always in state k % 2
+        u = rng.random(64)
+        p = np.resize(np.asarray(switch, dtype=float), 64)
+        chunk = np.ceil(np.log1p(-u) / np.log1p(-p)).astype(np.int64).clip(1)
+        lengths.extend(chunk.tolist())
+        total += chunk.sum()
+    state = np.repeat(np.arange(len(lengths)) % 2, lengths)[:bars]
+    table = np.asarray(regimes, dtype=float)
+    return table[state, 0], table[state, 1]
+
+
+def _drift_volatility(model, p, bars, seed):
+    if model == 'regime':
+        return _regimes(np.random.default_rng([seed, 1]), bars, p['regimes'], p['switch'])
+    return np.full(bars, p['drift']), np.full(bars, p['volatility'])
+
+
+def _model(model, params):
+    if model not in MODELS:
+        raise ValueError(f'unknown model {model!r}, expected one of {", ".join(MODELS)}')
+    unknown = set(params) - set(MODELS[model]) - set(COMMON)
+    if unknown:
+        raise TypeError(f'unexpected parameters for {model!r}: {", ".join(sorted(unknown))}')
+    return {**COMMON, **MODELS[model], **params}
+
+
+def simulate(bars, symbols=1, model='gbm', seed=0, **params):
+    """
+    Deterministic OHLCV bars for `symbols` (a count or a list of tickers):
+    a dict of (bars x symbols) float64 arrays keyed open/high/low/close/
+    volume. `model` is 'gbm', 'jump' (Merton jump-diffusion) or 'regime'
+    (calm/turbulent Markov switching); `params` override its MODELS and
+    COMMON defaults.
+
+    Each symbol's returns mix a common market factor with its own noise,
+    split between an overnight gap (open vs previous close) and the move
+    within the bar. Highs and lows are drawn from the exact distribution
+    of a Brownian bridge's extremes from the open to the close, so
+    low <= open, close <= high always holds. Every random stream is drawn
+    in one call per bar-major array, so the first k bars are the same for
+    any `bars` >= k, and a ticker gets the same bars whichever other
+    symbols are generated with it.
+    """
+    p = _model(model, params)
+    names = [str(k) for k in range(symbols)] if isinstance(symbols, int) else list(symbols)
+    market = np.random.default_rng([seed, 0])
+    drift, volatility = _drift_volatility(model, p, bars, seed)
+    common = market.standard_normal((bars, 2))
+    rho, gap_share = p['correlation'], p['gap']
+    gap_vol = volatility * math.sqrt(gap_share)
+    bar_vol = volatility * math.sqrt(1 - gap_share)
+
+    data = {f: np.empty((bars, len(names))) for f in FIELDS}
+    for j, name in enumerate(names):
+        key = _key(name)
+        noise = np.random.default_rng([seed, key, 0]).standard_normal((bars, 4))
+        uniform = np.random.default_rng([seed, key, 1]).random((bars, 3))
+        price = p['price'] or float(np.random.default_rng([seed, key, 2]).lognormal(math.log(100), 0.5))
+        shock = math.sqrt(rho) * common + math.sqrt(1 - rho) * noise[:, :2]
+        gap = gap_vol * shock[:, 0]
+        if model == 'jump':
+            jumps = uniform[:, 2] < p['jump_rate']
+            gap = gap + jumps * (p['jump_mean'] + p['jump_std'] * noise[:, 2])
+        move = drift + bar_vol * shock[:, 1]
+        close = price * np.exp(np.cumsum(gap + move))
+        open_ = close * np.exp(-move)
+        # extremes of a bridge from 0 to `move` with variance bar_vol**2
+        spread = -2 * bar_vol ** 2
+        high = (move + np.sqrt(move ** 2 + spread * np.log(uniform[:, 0]))) / 2
+        low = (move - np.sqrt(move ** 2 + spread * np.log(uniform[:, 1]))) / 2
+        data['open'][:, j] = open_
+        data['high'][:, j] = open_ * np.exp(high)
+        data['low'][:, j] = open_ * np.exp(low)
+        data['close'][:, j] = close
+        # busier on large moves, lognormal noise around the mean volume
+        activity = 0.5 + 0.5 * np.abs(gap + move) / volatility
+        data['volume'][:, j] = np.round(p['volume'] * activity * np.exp(0.25 * noise[:, 3] - 0.03125))
+    return data
+
+
+def _intraday(daily, days, first, timestep, seed, key, gap_share, volatility):
+    # split each day into session bars: a Brownian bridge from the day's
+    # open to its close, seeded per day so any range of days is reproducible
+    step = TIMESTEPS[timestep][1]
+    count = -(-SESSION // step)
+    steps = np.arange(1, count + 1)
+    shape = 1 + 1.5 * np.linspace(-1, 1, count) ** 2
+    rows, stamps = [], []
+    for d, day in enumerate(days):
+        rng = np.random.default_rng([seed, key, 3, first + d])
+        open_, close, volume = daily['open'][d], daily['close'][d], daily['volume'][d]
+        move = math.log(close / open_)
+        bar_vol = volatility[d] * math.sqrt(1 - gap_share) / math.sqrt(count)
+        path = np.cumsum(bar_vol * rng.standard_normal(count))
+        path -= steps / count * (path[-1] - move)
+        begin = np.concatenate([[0.0], path[:-1]])
+        delta = path - begin
+        u = rng.random((2, count))
+        high = begin + (delta + np.sqrt(delta ** 2 - 2 * bar_vol ** 2 * np.log(u[0]))) / 2
+        low = begin + (delta - np.sqrt(delta ** 2 - 2 * bar_vol ** 2 * np.log(u[1]))) / 2
+        weights = shape * np.exp(0.25 * rng.standard_normal(count))
+        rows.append(np.column_stack([open_ * np.exp(begin), open_ * np.exp(high), open_ * np.exp(low),
+                                     open_ * np.exp(path), np.round(volume * weights / weights.sum())]))
+        stamps.append(day + SESSION_OPEN + step * np.arange(count))
+    if not rows:
+        return np.empty((0, len(FIELDS))), pd.DatetimeIndex([])
+    return np.concatenate(rows), pd.DatetimeIndex(np.concatenate(stamps))
+
+
+def synthetic_ohlcv(symbols, start, end, timestep='day', model='gbm', seed=0, **params) -> pd.DataFrame:
+    """
+    simulate() as timestamped bars in [start, end): business days from
+    ORIGIN at midnight for `timestep='day'`, or bars of any bars.TIMESTEPS
+    size through the 09:30-16:00 session, bridging each day's open to its
+    close. Returns lowercase open/high/low/close/volume columns for one
+    symbol, or `(field, symbol)` columns for a list of symbols, the layout
+    of a multi-ticker download.
+
+    The bars at a timestamp depend only on the symbol, model, seed and
+    params, never on the requested range.
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if start < ORIGIN:
+        raise ValueError(f'synthetic bars start at {ORIGIN.date()}')
+    if timestep not in TIMESTEPS:
+        raise ValueError(f'unknown timestep {timestep!r}')
+    names = [symbols] if isinstance(symbols, str) else list(symbols)
+    p = _model(model, params)
+    days = pd.bdate_range(ORIGIN, end.normalize())
+    data = simulate(len(days), names, model, seed, **params)
+    first = days.searchsorted(start.normalize())
+    volatility = _drift_volatility(model, p, len(days), seed)[1][first:]
+    frames = {}
+    for j, name in enumerate(names):
+        daily = {f: data[f][first:, j] for f in FIELDS}
+        if timestep == 'day':
+            values, index = np.column_stack([daily[f] for f in FIELDS]), days[first:]
+        else:
+            values, index = _intraday(daily, days[first:], first, timestep, seed, _key(name), p['gap'], volatility)
+        frame = pd.DataFrame(values, index=index.rename('datetime'), columns=list(FIELDS))
+        frames[name] = frame[(frame.index >= start) & (frame.index < end)]
+    if isinstance(symbols, str):
+        return frames[symbols]
+    return pd.concat(frames, axis=1).swaplevel(axis=1)[list(FIELDS)]
+
+
+def synthetic_fetch(symbol, start, end, timestep='day', model='gbm', seed=0, **params):
+    # drop-in for yahoo_fetch (yfinance column names) serving generated bars
+    return synthetic_ohlcv(symbol, start, end, timestep, model, seed, **params).rename(columns=str.capitalize)
+
+
+def env_settings():
+    """
+    The generator settings from `$ALGOTRADE_SYNTHETIC` (a model name, or
+    1 for gbm) and `$ALGOTRADE_SYNTHETIC_SEED`, or None when it is unset or
+    0. OhlcvStore serves generated bars instead of Yahoo downloads while it
+    is set, so the strategy tests and backtests run without network.
+    """
+    model = os.environ.get('ALGOTRADE_SYNTHETIC', '').strip().lower()
+    if model in ('', '0'):
+        return None
+    model = 'gbm' if model == '1' else model
+    if model not in MODELS:
+        raise ValueError(f'ALGOTRADE_SYNTHETIC={model!r}, expected 1 or one of {", ".join(MODELS)}')
+    return {'model': model, 'seed': int(os.environ.get('ALGOTRADE_SYNTHETIC_SEED', 0))}
+
+
+def synthetic_root(root, model='gbm', seed=0):
+    # generated bars live apart from downloaded ones, one folder per model and seed
+    return os.path.join(root, 'synthetic', f'{model}-{seed}')
+
+
+def synthetic_store(root=None, model='gbm', seed=0, **params):
+    """
+    An OhlcvStore filled from the generator, under `synthetic/<model>-<seed>`
+    of `root` (default `$ALGOTRADE_STORE` or `~/.algotrade/ohlcv`). Custom
+    `params` should get a `root` of their own.
+    """
+    root = root or os.environ.get('ALGOTRADE_STORE', DEFAULT_ROOT)
+    return OhlcvStore(synthetic_root(root, model, seed),
+                      fetch=partial(synthetic_fetch, model=model, seed=seed, **params))
+
+
+class SyntheticDataBacktesting(LocalDataBacktesting):
+    """
+    Backtesting data source serving generated bars: LocalDataBacktesting
+    over a synthetic_store for `model` and `seed`, for backtests on any
+    symbols and period without market data.
+    """
+
+    def __init__(self, datetime_start, datetime_end, model='gbm', seed=0, store=None, **kwargs):
+        super().__init__(datetime_start=datetime_start, datetime_end=datetime_end,
+                         store=store or synthetic_store(model=model, seed=seed), **kwargs)
+        self.name = 'synthetic'
@@ -1,4 +1,10 @@
+import argparse
+import os
 import re
+import numpy as np
+import pandas as pd
+from .signals import Signal
+from .performance import performance
 # import matplotlib.pyplot as plt
 
 def position_sizing(cash, last_price, cash_at_risk):
@@ -22,37 +28,54 @@ def symbol_type(symbol:str):
     return symbol.upper()
 
 
+def read_symbols(values):
+    # --symbols takes tickers and/or files listing them (comma, space or newline separated)
+    symbols = []
+    for value in values:
+        if os.path.isfile(value):
+            with open(value) as f:
+                value = f.read()
+        symbols.extend(symbol_type(s) for s in re.split(r'[\s,]+', value) if s)
+    return list(dict.fromkeys(symbols))
+
+
 def set_vars(data, signal):
-    signal = data[signal].iloc[-1]
+    signal = Signal(int(data[signal].iloc[-1]))
     last_price = data['Price'].iloc[-1]
     return signal, last_price
 
+def last_vars(signal, price):
+    # set_vars for the (signal, price) arrays of a Calc's lean get_signal
+    return Signal(int(signal[-1])), float(price[-1])
+
+def as_price_array(prices, dtype=np.float64) -> np.ndarray:
+    # the prices as a contiguous ndarray, a view when already in `dtype`
+    return np.ascontiguousarray(prices, dtype=dtype)
+
+def is_batch(prices):
+    # a wide (time x symbols) DataFrame or 2-D array rather than one price series
+    return isinstance(prices, pd.DataFrame) or np.ndim(prices) == 2
+
+
+def as_price_frame(prices) -> pd.DataFrame:
+    return prices if isinstance(prices, pd.DataFrame) else pd.DataFrame(np.asarray(prices, dtype=float))
+
+
+def signal_matrix(signal, prices):
+    # shape the batched signals like the input: a DataFrame for frames, else ndarray
+    if isinstance(prices, pd.DataFrame):
+        return pd.DataFrame(signal, index=prices.index, columns=prices.columns)
+    return np.asarray(signal)
+
 def prnt_params(params):
     for k,v in params.items():
         print(f'{k}:{v}')
 
 def calculate_profit(data, initial_capital):
-    capital = initial_capital
-    position = 0  # Represents the number of shares held
-    next_day_open = data['Open'].shift(-1)
-
-    # exclude the last day as there's no next day to trade
-    for i in range(len(data)-1):
-        if data['Signal'].iloc[i] == 'BUY' and capital >= next_day_open.iloc[i]:
-            # Buy one share
-            position += 1
-            capital -= next_day_open.iloc[i]
-        elif data['Signal'].iloc[i] == 'SELL' and position > 0:
-            # Sell one share
-            position -= 1
-            capital += next_day_open.iloc[i]
-
-    # print(f'position: {position}')
-    # print(f'last day price {next_day_open.iloc[-2]}')
-    # Calculate the value of the remaining shares at the last price
-    final_value = capital + position * next_day_open.iloc[-2] # use the second last 'Open' price
-    profit = final_value - initial_capital
-    return profit, capital
+    # one share per BUY/SELL at the next day's open, see performance() for the
+    # equity curve and risk metrics of the same run
+    result = performance(data['Signal'], data['Open'], initial_capital)
+    return result['profit'], result['capital']
 
 # def moving_avg_plots(data, short_window, long_window, nbr):
 #     prices = data[0]
@@ -0,0 +1,94 @@
+import numpy as np
+from .simulator import bracket_windows, simulate_bracket
+from .sweep import ohlc_columns, pool_map, worker_data
+
+
+def folds(n, train_size, test_size, step=None, anchored=False):
+    """
+    `(train, test)` slices over `n` bars: a train window of `train_size`
+    bars followed by `test_size` test bars, moved forward by `step`
+    (default `test_size`) until the test window would pass the end.
+    `anchored=True` keeps every train window starting at bar 0.
+    """
+    step = step or test_size
+    result = []
+    start = 0
+    while start + train_size + test_size <= n:
+        train_end = start + train_size
+        result.append((slice(0 if anchored else start, train_end), slice(train_end, train_end + test_size)))
+        start += step
+    return result
+
+
+def _fold_profits(task):
+    # net profit of one parameter combination for every fold and risk level,
+    # as two (folds x risks) arrays for the train and the test windows
+    outer_key, calc_cls, params, windows, risk_range, trading_fee = task
+    data, prices = worker_data()
+    open_, high, low = (np.asarray(c, dtype=float) for c in ohlc_columns(data))
+    profits = np.empty((2, len(windows), len(risk_range)))
+    if getattr(calc_cls, 'causal', True):
+        # signals computed once on the full history (each fold also gets the
+        # warm-up bars before it), and trades shared by overlapping windows
+        # simulated once per risk level
+        signal, _ = calc_cls(params=params).get_signal(prices)
+        flat = [window for fold in windows for window in fold]
+        for r, risk in enumerate(risk_range):
+            profits[:, :, r] = bracket_windows(signal, open_, high, low, risk, flat,
+                                               trading_fee).reshape(len(windows), 2).T
+        return outer_key, profits
+    for k, fold in enumerate(windows):
+        for j, window in enumerate(fold):
+            signal, _ = calc_cls(params=params).get_signal(prices.iloc[window])
+            for r, risk in enumerate(risk_range):
+                profits[j, k, r] = simulate_bracket(signal, open_[window], high[window], low[window],
+                                                    risk, trading_fee)['net_profit']
+    return outer_key, profits
+
+
+def walk_forward(calc_cls, combos, data, risk_range, train_size, test_size, step=None,
+                 anchored=False, price_col='Close', trading_fee=0.0015, workers=None, chunksize=None):
+    """
+    Walk-forward optimization of `calc_cls` over `data`: for every fold from
+    `folds(len(data), train_size, test_size, step, anchored)` pick the
+    `(outer_key, risk)` of `combos` x `risk_range` with the best train net
+    profit and score it on the following test window.
+
+    Signals of causal Calcs are computed once per combination on the whole
+    history and sliced per fold, and bracket_windows simulates trades shared
+    by overlapping windows once, so adding folds costs little beyond walking
+    each window's trades. Calcs with `causal = False` (BollingerBandsCalc,
+    VolatilityATRCalc) are recomputed and simulated on each window instead.
+    Combinations are fanned out over a process pool like run_sweep.
+
+    Returns one dict per fold with the train/test index labels, the chosen
+    `outer_key` and `risk`, and `train_profit` / `test_profit`.
+    """
+    windows = folds(len(data), train_size, test_size, step, anchored)
+    risk_range = list(risk_range)
+    tasks = [(outer_key, calc_cls, params, windows, risk_range, trading_fee)
+             for outer_key, params in combos]
+    results = pool_map(_fold_profits, tasks, data, price_col, workers, chunksize)
+    if not results:
+        return []
+    keys = [outer_key for outer_key, _ in results]
+    # (combos, train/test, folds, risks)
+    profits = np.stack([p for _, p in results])
+
+    report = []
+    for k, (train, test) in enumerate(windows):
+        train_profits = profits[:, 0, k, :]
+        # first combination and risk win ties, as in SweepResults.top
+        c, r = np.unravel_index(np.argmax(train_profits), train_profits.shape)
+        report.append({
+            'fold': k,
+            'train_start': data.index[train.start],
+            'train_end': data.index[train.stop - 1],
+            'test_start': data.index[test.start],
+            'test_end': data.index[test.stop - 1],
+            'outer_key': keys[c],
+            'risk': risk_range[r],
+            'train_profit': train_profits[c, r],
+            'test_profit': profits[c, 1, k, r],
+        })
+    return report
@@ -0,0 +1,177 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import types
+import unittest
+import numpy as np
+import pandas as pd
+from strategies.tools.bars import BarBuffer, BarFeed, BarStream, sleeptime
+from strategies.EmaCrossover import EmaCrossoverCalc
+from strategies.MeanReversion import MeanReversionCalc
+from strategies.RsiCrossover import RsiCrossoverCalc
+from strategies.VolatilityATR import VolatilityATRCalc
+
+
+def minute_bars(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    index = pd.date_range('2024-01-02 09:30', periods=n, freq='min', tz='America/New_York')
+    return pd.DataFrame({'open': close, 'high': close * 1.001, 'low': close * 0.999,
+                         'close': close, 'volume': rng.integers(100, 1000, n)}, index=index)
+
+
+class FakeStrategy:
+    # serves the bars up to `now`, like get_historical_prices in a backtest
+    def __init__(self, df):
+        self.df = df
+        self.now = None
+        self.requests = []
+
+    def get_datetime(self):
+        return self.now
+
+    def get_historical_prices(self, symbol, length, timestep):
+        self.requests.append(length)
+        return types.SimpleNamespace(df=self.df[self.df.index <= self.now].iloc[-length:])
+
+
+class TestBarBuffer(unittest.TestCase):
+    def test_wraps_without_copies(self):
+        df = minute_bars(1000)
+        buffer = BarBuffer(50)
+        rng = np.random.default_rng(1)
+        start = 0
+        while start < len(df):
+            stop = min(len(df), start + int(rng.integers(1, 80)))
+            # overlapping chunks, as an incremental fetch returns them
+            buffer.extend(df.iloc[max(0, start - 3):stop])
+            expected = df.iloc[max(0, stop - 50):stop]
+            np.testing.assert_array_equal(buffer.view('close'), expected['close'])
+            self.assertTrue(np.shares_memory(buffer.view('close'), buffer._data))
+            start = stop
+        series = buffer.series('close')
+        pd.testing.assert_index_equal(series.index, df.index[-50:])
+        self.assertTrue(np.shares_memory(series.to_numpy(), buffer._data))
+        frame = buffer.frame(['high', 'low', 'close'])
+        np.testing.assert_array_equal(frame.to_numpy(), df[['high', 'low', 'close']].iloc[-50:].to_numpy())
+        self.assertEqual(buffer.last_timestamp, df.index[-1])
+
+    def test_forming_bar(self):
+        df = minute_bars(10)
+        buffer = BarBuffer(5)
+        self.assertEqual(buffer.extend(df), 5)
+        live = df.iloc[-1:].copy()
+        live['close'] += 1
+        self.assertEqual(buffer.extend(live), 0)
+        self.assertEqual(buffer.view('close')[-1], df['close'].iloc[-1] + 1)
+        self.assertEqual(buffer.extend(df.iloc[:3]), 0)
+        self.assertEqual(len(buffer), 5)
+
+    def test_index_outlives_wrap(self):
+        # indicators cached from a series keep its index across later extends
+        df = minute_bars(20)
+        buffer = BarBuffer(10)
+        buffer.extend(df.iloc[:10])
+        index = buffer.series('close').index
+        buffer.extend(df.iloc[10:15])
+        pd.testing.assert_index_equal(index, df.index[:10], check_names=False)
+
+
+class TestBarFeed(unittest.TestCase):
+    def test_fetches_only_new_bars(self):
+        df = minute_bars(400)
+        strategy = FakeStrategy(df)
+        feed = BarFeed(strategy, 'AAPL', 60, 'minute')
+        calc = MeanReversionCalc(params={'window': 20, 'z_threshold': 1.5})
+        for k in range(100, 400, 7):
+            strategy.now = df.index[k]
+            buffer = feed.update()
+            full = df.iloc[k - 59:k + 1]
+            np.testing.assert_array_equal(buffer.view('close'), full['close'])
+            pd.testing.assert_frame_equal(calc.get_data(buffer.series('close')), calc.get_data(full['close']),
+                                          check_freq=False, check_names=False)
+        self.assertEqual(strategy.requests[0], 60)
+        # every later iteration asks for the 7 new bars plus the last one again
+        self.assertEqual(set(strategy.requests[1:]), {8})
+        self.assertEqual(sleeptime('minute'), '1M')
+        self.assertEqual(sleeptime('day'), '1D')
+
+
+class CountingCalc:
+    # counts the bars pushed into a streaming Calc
+    def __init__(self, calc):
+        self.calc = calc
+        self.pushed = 0
+        self.resets = 0
+
+    def update(self, value):
+        self.pushed += 1
+        return self.calc.update(value)
+
+    def reset(self):
+        self.resets += 1
+        self.calc.reset()
+
+    def __getattr__(self, name):
+        return getattr(self.calc, name)
+
+
+class TestBarStream(unittest.TestCase):
+    def test_pushes_only_new_bars(self):
+        df = minute_bars(400)
+        strategy = FakeStrategy(df)
+        feed = BarFeed(strategy, 'AAPL', 60, 'minute')
+        params = {'window': 20, 'z_threshold': 1.0}
+        stream = BarStream(CountingCalc(MeanReversionCalc(params=params)))
+        atr_params = {'window': 14, 'atr_multiplier': 0.5}
+        atr_stream = BarStream(VolatilityATRCalc(params=atr_params), fields=('high', 'low', 'close'))
+        for k in range(100, 400, 7):
+            strategy.now = df.index[k]
+            buffer = feed.update()
+            signal = stream.update(buffer)
+            full = df.iloc[k - 59:k + 1]
+            self.assertEqual(signal, MeanReversionCalc(params=params).get_data(full['close'])['Signal'].iloc[-1])
+            self.assertEqual(atr_stream.update(buffer),
+                             VolatilityATRCalc(params=atr_params).get_data(full)['Signal'].iloc[-1])
+        # the first window once, then only the 7 new bars per iteration
+        self.assertEqual(stream.calc.pushed, 60 + 7 * (len(range(100, 400, 7)) - 1))
+        self.assertEqual(stream.calc.resets, 0)
+
+    def test_recursive_calcs_match_the_window(self):
+        # EMA and Wilder state must start at the window, as in get_data
+        df = minute_bars(400)
+        strategy = FakeStrategy(df)
+        feed = BarFeed(strategy, 'AAPL', 30, 'minute')
+        calcs = [(EmaCrossoverCalc, {'short_window': 9, 'long_window': 21}),
+                 (RsiCrossoverCalc, {'rsi_period': 14, 'upper_threshold': 60, 'lower_threshold': 40})]
+        streams = [BarStream(CountingCalc(calc_cls(params=params))) for calc_cls, params in calcs]
+        steps = range(100, 400, 3)
+        for k in steps:
+            strategy.now = df.index[k]
+            buffer = feed.update()
+            window = df['close'].iloc[k - 29:k + 1]
+            for stream, (calc_cls, params) in zip(streams, calcs):
+                with self.subTest(calc=calc_cls.__name__, bar=k):
+                    self.assertEqual(stream.update(buffer),
+                                     calc_cls(params=params).get_data(window)['Signal'].iloc[-1])
+        for stream in streams:
+            self.assertEqual(stream.calc.resets, len(steps) - 1)
+
+    def test_rewritten_bar_replays(self):
+        df = minute_bars(40)
+        buffer = BarBuffer(30)
+        buffer.extend(df.iloc[:35])
+        stream = BarStream(CountingCalc(MeanReversionCalc(params={'window': 10, 'z_threshold': 0.5})))
+        stream.update(buffer)
+        live = df.iloc[34:35].copy()
+        live['close'] *= 1.05
+        buffer.extend(live)
+        signal = stream.update(buffer)
+        self.assertEqual(stream.calc.resets, 1)
+        self.assertEqual(stream.calc.pushed, 60)
+        expected = MeanReversionCalc(params={'window': 10, 'z_threshold': 0.5}).get_data(buffer.series('close'))
+        self.assertEqual(signal, expected['Signal'].iloc[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import numpy as np
+import pandas as pd
+from strategies.SimpleMACrossover import SimpleMACrossoverCalc
+from strategies.MeanReversion import MeanReversionCalc
+from strategies.BollingerBands import BollingerBandsCalc
+from strategies.RsiCrossover import RsiCrossoverCalc
+from strategies.EmaCrossover import EmaCrossoverCalc
+from strategies.AroonCrossover import AroonCrossoverCalc
+from strategies.VolatilityATR import VolatilityATRCalc
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        n, m = 300, 6
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n, m)), axis=0))
+        spread = np.abs(rng.normal(0, 0.01, (n, m))) * close
+        index = pd.date_range('2022-01-03', periods=n, freq='B')
+        symbols = [f'SYM{chr(65 + i)}' for i in range(m)]
+        self.prices = pd.DataFrame(np.round(close, 1), index=index, columns=symbols)
+        self.ohlc = pd.concat({
+            'high': self.prices + spread,
+            'low': self.prices - spread,
+            'close': self.prices,
+        }, axis=1)
+
+    def assert_batch_matches(self, calc):
+        signals = calc.get_data(self.prices)
+        self.assertEqual(signals.shape, self.prices.shape)
+        for symbol in self.prices.columns:
+            expected = calc.get_data(self.prices[symbol])['Signal']
+            np.testing.assert_array_equal(signals[symbol].to_numpy(), expected.to_numpy())
+        # plain 2-D arrays come back as a plain signal array
+        array_signals = calc.get_data(self.prices.to_numpy())
+        self.assertIsInstance(array_signals, np.ndarray)
+        np.testing.assert_array_equal(array_signals, signals.to_numpy())
+
+    def test_simple_ma_crossover(self):
+        self.assert_batch_matches(SimpleMACrossoverCalc(params={'short_window': 9, 'long_window': 21}))
+
+    def test_mean_reversion(self):
+        self.assert_batch_matches(MeanReversionCalc(params={'window': 20, 'z_threshold': 1.0}))
+
+    def test_bollinger_bands(self):
+        self.assert_batch_matches(BollingerBandsCalc(params={'window': 20, 'num_std_dev': 1.0}))
+
+    def test_rsi_crossover(self):
+        self.assert_batch_matches(RsiCrossoverCalc(params={'rsi_period': 7, 'upper_threshold': 70, 'lower_threshold': 30}))
+
+    def test_ema_crossover(self):
+        self.assert_batch_matches(EmaCrossoverCalc(params={'short_window': 10, 'long_window': 50}))
+
+    def test_aroon_crossover(self):
+        self.assert_batch_matches(AroonCrossoverCalc(params={'window': 25}))
+
+    def test_volatility_atr(self):
+        calc = VolatilityATRCalc(params={'window': 5, 'atr_multiplier': 1.0})
+        signals = calc.get_data(self.ohlc)
+        for symbol in self.prices.columns:
+            expected = calc.get_data(self.ohlc.xs(symbol, axis=1, level=1))['Signal']
+            np.testing.assert_array_equal(signals[symbol].to_numpy(), expected.to_numpy())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+from strategies.tools.coverage import add_interval, missing_intervals
+
+
+class TestCoverage(unittest.TestCase):
+    def test_add_interval(self):
+        intervals = add_interval([], 10, 20)
+        intervals = add_interval(intervals, 30, 40)
+        self.assertEqual(intervals, [(10, 20), (30, 40)])
+        self.assertEqual(add_interval(intervals, 20, 25), [(10, 25), (30, 40)])
+        self.assertEqual(add_interval(intervals, 15, 35), [(10, 40)])
+        self.assertEqual(add_interval(intervals, 0, 5), [(0, 5), (10, 20), (30, 40)])
+
+    def test_missing_intervals(self):
+        intervals = [(10, 20), (30, 40)]
+        self.assertEqual(missing_intervals([], 0, 5), [(0, 5)])
+        self.assertEqual(missing_intervals(intervals, 0, 50), [(0, 10), (20, 30), (40, 50)])
+        self.assertEqual(missing_intervals(intervals, 22, 28), [(22, 28)])
+        self.assertEqual(missing_intervals(intervals, 12, 35), [(20, 30)])
+        self.assertEqual(missing_intervals(intervals, 12, 18), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import importlib
+import types
+import unittest
+from unittest import mock
+import numpy as np
+
+
+class Tensor(np.ndarray):
+    # the few torch.Tensor methods quantization_report uses, over numpy
+    def float(self):
+        return self.astype(np.float64)
+
+    def abs(self):
+        return np.abs(self)
+
+    def softmax(self, dim):
+        e = np.exp(self - self.max(dim, keepdims=True))
+        return e / e.sum(dim, keepdims=True)
+
+
+def fake_torch(cuda=True):
+    # stand-ins for the parts of torch and transformers finbert_utils touches
+    torch = types.ModuleType('torch')
+    torch.cuda = types.SimpleNamespace(is_available=lambda: cuda)
+    torch.nn = types.SimpleNamespace(Linear=type('Linear', (), {}))
+    torch.qint8 = 'qint8'
+    torch.quantization = types.SimpleNamespace(quantize_dynamic=mock.Mock(return_value='int8 model'))
+    torch.set_num_threads = mock.Mock()
+    torch.from_numpy = lambda a: np.asarray(a).view(Tensor)
+    transformers = types.ModuleType('transformers')
+    transformers.AutoTokenizer = mock.Mock()
+    transformers.AutoModelForSequenceClassification = mock.Mock()
+    return torch, transformers
+
+
+class TestFinbertUtils(unittest.TestCase):
+    def load(self, env, cuda=True):
+        # a fresh import of finbert_utils over the stubs, since it reads
+        # the environment and picks its device at import time
+        self.torch, self.transformers = fake_torch(cuda)
+        modules = mock.patch.dict(sys.modules, {'torch': self.torch, 'transformers': self.transformers})
+        environ = mock.patch.dict(os.environ, {'FINBERT_CACHE': ':memory:', **env})
+        for patch in (modules, environ):
+            patch.start()
+            self.addCleanup(patch.stop)
+        for name in ('FINBERT_QUANTIZE', 'FINBERT_THREADS'):
+            if name not in env:
+                os.environ.pop(name, None)
+        sys.modules.pop('strategies.tools.finbert_utils', None)
+        return importlib.import_module('strategies.tools.finbert_utils')
+
+    def test_quantized_model(self):
+        finbert = self.load({'FINBERT_QUANTIZE': '1', 'FINBERT_THREADS': '2'})
+        self.assertEqual(finbert.cache.namespace, 'int8')
+        tokenizer, model, device = finbert.load_model()
+        base = self.transformers.AutoModelForSequenceClassification.from_pretrained.return_value.eval.return_value
+        quantize = self.torch.quantization.quantize_dynamic
+        quantize.assert_called_once_with(base, {self.torch.nn.Linear}, dtype=self.torch.qint8)
+        # the int8 kernels only run on CPU, even with a GPU available
+        self.assertEqual((model, device), ('int8 model', 'cpu'))
+        base.to.assert_not_called()
+        self.torch.set_num_threads.assert_called_once_with(2)
+        self.assertIs(finbert.load_model()[1], model)
+        self.assertEqual(quantize.call_count, 1)
+
+    def test_fp32_model(self):
+        finbert = self.load({})
+        self.assertEqual(finbert.cache.namespace, 'fp32')
+        _, model, device = finbert.load_model()
+        base = self.transformers.AutoModelForSequenceClassification.from_pretrained.return_value.eval.return_value
+        self.assertEqual((model, device), (base.to.return_value, 'cuda:0'))
+        base.to.assert_called_once_with('cuda:0')
+        self.torch.quantization.quantize_dynamic.assert_not_called()
+        self.torch.set_num_threads.assert_not_called()
+        # the quantized model loads next to it, still on CPU
+        self.assertEqual(finbert.load_model(quantize=True)[2], 'cpu')
+        self.assertEqual(len(finbert._models), 2)
+
+    def test_quantization_report(self):
+        finbert = self.load({})
+        fp32 = np.array([[2.0, 0.0, 0.0], [0.0, 1.0, 0.9], [0.0, 0.0, 1.0], [1.0, 0.0, 0.0]])
+        # int8 logits a little off, enough to flip the second headline
+        int8 = fp32 + np.array([[0.1, 0, 0], [0, -0.2, 0], [0, 0, 0], [0, 0, -0.05]])
+        calls = []
+
+        def infer(headlines, quantize):
+            calls.append(quantize)
+            return int8 if quantize else fp32
+
+        with mock.patch.object(finbert, 'infer_logits', infer):
+            report = finbert.quantization_report(['a', 'b', 'c', 'd'], repeat=2)
+        self.assertEqual(calls, [False] * 3 + [True] * 3)
+        self.assertAlmostEqual(report['label_agreement'], 0.75)
+        self.assertAlmostEqual(report['max_logit_delta'], 0.2)
+        expected = np.abs(fp32.view(Tensor).softmax(1) - int8.view(Tensor).softmax(1)).max()
+        self.assertAlmostEqual(report['max_probability_delta'], expected)
+        self.assertGreater(report['fp32_per_sec'], 0)
+        self.assertAlmostEqual(report['speedup'], report['int8_per_sec'] / report['fp32_per_sec'])
+
+
+if __name__ == '__main__':
+    unittest.main()
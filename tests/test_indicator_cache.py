@@ -0,0 +1,98 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import numpy as np
+import pandas as pd
+from strategies.tools import indicator_cache
+from strategies.tools.indicator_cache import IndicatorCache, rolling_mean
+from strategies.AroonCrossover import AroonCrossoverCalc
+from strategies.BollingerBands import BollingerBandsCalc
+from strategies.EmaCrossover import EmaCrossoverCalc
+from strategies.MeanReversion import MeanReversionCalc
+from strategies.RsiCrossover import RsiCrossoverCalc
+from strategies.SimpleMACrossover import SimpleMACrossoverCalc
+from strategies.VolatilityATR import VolatilityATRCalc
+
+CALCS = [
+    (AroonCrossoverCalc, {'window': 14}),
+    (BollingerBandsCalc, {'window': 20, 'num_std_dev': 2}),
+    (EmaCrossoverCalc, {'short_window': 12, 'long_window': 26}),
+    (MeanReversionCalc, {'window': 20, 'z_threshold': 1.5}),
+    (RsiCrossoverCalc, {'rsi_period': 14, 'upper_threshold': 70, 'lower_threshold': 30}),
+    (SimpleMACrossoverCalc, {'short_window': 10, 'long_window': 30}),
+    (VolatilityATRCalc, {'window': 14, 'atr_multiplier': 1.0}),
+]
+
+
+class TestIndicatorCache(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        n = 300
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+        self.df = pd.DataFrame({
+            'high': close * 1.01,
+            'low': close * 0.99,
+            'close': close,
+        }, index=pd.date_range('2023-01-02', periods=n, freq='B'))
+        self.cache = indicator_cache.indicators = IndicatorCache()
+
+    def tearDown(self):
+        indicator_cache.indicators = IndicatorCache()
+
+    def get_data(self, calc_cls, params, symbol='AAPL'):
+        prices = self.df if calc_cls is VolatilityATRCalc else self.df['close']
+        return calc_cls(params={**params, 'symbol': symbol}).get_data(prices)
+
+    def test_results_unchanged(self):
+        for calc_cls, params in CALCS:
+            with self.subTest(calc=calc_cls.__name__):
+                indicator_cache.indicators = IndicatorCache(max_mb=0)
+                expected = self.get_data(calc_cls, params)
+                indicator_cache.indicators = IndicatorCache()
+                self.get_data(calc_cls, params)
+                # the second call is served from the cache
+                pd.testing.assert_frame_equal(self.get_data(calc_cls, params), expected)
+                self.assertGreater(indicator_cache.indicators.hits, 0)
+
+    def test_shared_between_calcs(self):
+        self.get_data(BollingerBandsCalc, {'window': 20, 'num_std_dev': 2})
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 1))
+        # same symbol, window and bars: mean and std are computed once
+        self.get_data(MeanReversionCalc, {'window': 20, 'z_threshold': 1.5})
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        # another symbol or window is a different entry
+        self.get_data(MeanReversionCalc, {'window': 20, 'z_threshold': 1.5}, symbol='MSFT')
+        self.get_data(MeanReversionCalc, {'window': 10, 'z_threshold': 1.5})
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 3))
+
+    def test_new_and_updated_bars(self):
+        close = self.df['close']
+        rolling_mean(close, 5, 'AAPL')
+        rolling_mean(close.iloc[1:], 5, 'AAPL')
+        # a still-forming last bar keeps its timestamp but changes its price
+        live = close.copy()
+        live.iloc[-1] += 1
+        value = rolling_mean(live, 5, 'AAPL')
+        self.assertEqual(self.cache.misses, 3)
+        self.assertAlmostEqual(value.iloc[-1], live.iloc[-5:].mean())
+
+    def test_without_symbol(self):
+        close = self.df['close']
+        rolling_mean(close, 5)
+        rolling_mean(close.copy(), 5)
+        rolling_mean(close * 2, 5)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_memory_budget(self):
+        cache = IndicatorCache(max_mb=3 * len(self.df) * 8 / 2 ** 20)
+        close = self.df['close']
+        for window in (2, 3, 4, 5):
+            cache.get(close, 'rolling_mean', (window,), lambda p: p.rolling(window).mean(), 'AAPL')
+        self.assertEqual(len(cache), 3)
+        cache.get(close, 'rolling_mean', (2,), lambda p: p.rolling(2).mean(), 'AAPL')
+        self.assertEqual(cache.misses, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
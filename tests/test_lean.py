@@ -0,0 +1,98 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import tracemalloc
+import unittest
+import numpy as np
+import pandas as pd
+from strategies.tools import indicator_cache
+from strategies.tools.indicator_cache import IndicatorCache
+from strategies.SimpleMACrossover import SimpleMACrossoverCalc
+from strategies.MeanReversion import MeanReversionCalc
+from strategies.BollingerBands import BollingerBandsCalc
+from strategies.RsiCrossover import RsiCrossoverCalc
+from strategies.EmaCrossover import EmaCrossoverCalc
+from strategies.AroonCrossover import AroonCrossoverCalc
+from strategies.VolatilityATR import VolatilityATRCalc
+
+CALCS = [
+    (SimpleMACrossoverCalc, {'short_window': 9, 'long_window': 21}),
+    (MeanReversionCalc, {'window': 20, 'z_threshold': 1.0}),
+    (BollingerBandsCalc, {'window': 20, 'num_std_dev': 1.0}),
+    (RsiCrossoverCalc, {'rsi_period': 7, 'upper_threshold': 70, 'lower_threshold': 30}),
+    (EmaCrossoverCalc, {'short_window': 5, 'long_window': 20}),
+    (AroonCrossoverCalc, {'window': 25}),
+    (VolatilityATRCalc, {'window': 14, 'atr_multiplier': 0.5}),
+]
+
+
+class TestLean(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        n = 2000
+        # rounded so that ties (equal highs/lows) are exercised as well
+        close = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.02, n))), 1)
+        spread = np.abs(rng.normal(0, 0.01, n)) * close
+        index = pd.date_range('2015-01-01', periods=n, freq='B')
+        self.ohlc = pd.DataFrame({'open': close, 'high': close + spread, 'low': close - spread,
+                                  'close': close}, index=index)
+        indicator_cache.indicators = IndicatorCache(max_mb=0)
+
+    def tearDown(self):
+        indicator_cache.indicators = IndicatorCache()
+
+    def prices(self, calc_cls):
+        return self.ohlc if calc_cls is VolatilityATRCalc else self.ohlc['close']
+
+    def test_matches_get_data(self):
+        for calc_cls, params in CALCS:
+            with self.subTest(calc=calc_cls.__name__):
+                prices = self.prices(calc_cls)
+                signal, price = calc_cls(params=params).get_signal(prices)
+                data = calc_cls(params=params).get_data(prices)
+                self.assertEqual(signal.dtype, np.int8)
+                self.assertEqual(price.dtype, np.float64)
+                np.testing.assert_array_equal(signal, data['Signal'])
+                np.testing.assert_array_equal(price, self.ohlc['close'])
+
+    def test_float32(self):
+        for calc_cls, params in CALCS:
+            with self.subTest(calc=calc_cls.__name__):
+                prices = self.prices(calc_cls)
+                signal, price = calc_cls(params={**params, 'dtype': 'float32'}).get_signal(prices)
+                expected = calc_cls(params=params).get_data(prices)['Signal'].to_numpy()
+                self.assertEqual(price.dtype, np.float32)
+                # rounding to float32 may only flip bars sitting on a threshold
+                self.assertGreater((signal == expected).mean(), 0.99)
+
+    def test_fewer_allocations(self):
+        # with the indicators cached, as for strategies sharing a symbol
+        indicator_cache.indicators = IndicatorCache()
+        totals = np.zeros(2)
+        for calc_cls, params in CALCS:
+            with self.subTest(calc=calc_cls.__name__):
+                prices = self.prices(calc_cls)
+                calc = calc_cls(params=params)
+                peaks = []
+                for fn in (calc.get_data, calc.get_signal):
+                    fn(prices)
+                    tracemalloc.start()
+                    fn(prices)
+                    peaks.append(tracemalloc.get_traced_memory()[1])
+                    tracemalloc.stop()
+                # VolatilityATR's peak in both paths is the cache key digest of
+                # its input, so the two only differ by allocator noise
+                margin = 1.01 if calc_cls is VolatilityATRCalc else 1.0
+                self.assertLessEqual(peaks[1], peaks[0] * margin)
+                totals += peaks
+        self.assertLess(totals[1], totals[0] / 2)
+
+    def test_batch(self):
+        matrix = pd.concat([self.ohlc['close'], self.ohlc['close'] * 2], axis=1, keys=['A', 'B'])
+        signal, price = MeanReversionCalc(params={'window': 20, 'z_threshold': 1.0}).get_signal(matrix)
+        self.assertEqual(signal.shape, (len(matrix), 2))
+        np.testing.assert_array_equal(price, matrix.to_numpy())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+import tempfile
+import time
+import unittest
+import urllib.request
+from strategies.tools.metrics import BUCKETS, Histogram, metrics, timed, timer
+
+
+class FakeStrategy:
+    name = 'AAPL_ema-crossover'
+    parameters = {'symbol': 'AAPL'}
+
+    @timed('iteration')
+    def on_trading_iteration(self):
+        with timer(self, 'fetch'):
+            time.sleep(0.002)
+        with timer(self, 'compute'):
+            pass
+        return 'done'
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+
+    def test_disabled_records_nothing(self):
+        self.assertEqual(FakeStrategy().on_trading_iteration(), 'done')
+        self.assertEqual(metrics.histograms, {})
+        # the disabled path is a flag check and a shared no-op
+        self.assertIs(timer('x', 'fetch'), timer('y', 'compute'))
+
+    def test_histograms_and_exports(self):
+        metrics.enable()
+        strategy = FakeStrategy()
+        for _ in range(3):
+            strategy.on_trading_iteration()
+        with timer('portfolio', 'fetch', symbol='MSFT'):
+            pass
+        fetch = metrics.histograms[('AAPL_ema-crossover', 'AAPL', 'fetch')]
+        self.assertEqual(fetch.count, 3)
+        self.assertGreaterEqual(fetch.sum, 0.006)
+        self.assertEqual(metrics.histograms[('AAPL_ema-crossover', 'AAPL', 'iteration')].count, 3)
+        self.assertIn(('portfolio', 'MSFT', 'fetch'), metrics.histograms)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'metrics.json')
+            metrics.write_json(path)
+            with open(path) as f:
+                entries = json.load(f)
+        self.assertEqual({e['phase'] for e in entries}, {'fetch', 'compute', 'iteration'})
+
+        text = metrics.prometheus_text()
+        self.assertIn('algotrade_phase_seconds_count{strategy="AAPL_ema-crossover",symbol="AAPL",phase="fetch"} 3',
+                      text)
+        self.assertIn('phase="fetch",le="+Inf"} 3', text)
+
+        port = metrics.serve(0)
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics') as response:
+            self.assertEqual(response.read().decode(), metrics.prometheus_text())
+
+    def test_histogram_buckets(self):
+        histogram = Histogram()
+        for seconds in [BUCKETS[0], BUCKETS[0] * 1.01, 100.0]:
+            histogram.observe(seconds)
+        self.assertEqual(histogram.counts[0], 1)
+        self.assertEqual(histogram.counts[1], 1)
+        self.assertEqual(histogram.counts[-1], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
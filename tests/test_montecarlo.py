@@ -0,0 +1,74 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import numpy as np
+import pandas as pd
+from strategies.tools.simulator import simulate_bracket
+from strategies.tools.montecarlo import (bootstrap_paths, gbm_paths, bracket_paths, path_signals,
+                                         monte_carlo, summarize)
+from strategies.MeanReversion import MeanReversionCalc
+from strategies.VolatilityATR import VolatilityATRCalc
+
+
+class TestMonteCarlo(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        n = 500
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n)))
+        open_ = close * np.exp(rng.normal(0, 0.004, n))
+        self.dff = pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close) * 1.01,
+            'Low': np.minimum(open_, close) * 0.99,
+            'Close': close,
+        }, index=pd.date_range('2020-01-01', periods=n, freq='B'))
+
+    def test_paths(self):
+        for make in (lambda rng: bootstrap_paths(self.dff, 40, 300, 10, rng),
+                     lambda rng: gbm_paths(self.dff, 40, 300, rng)):
+            ohlc = make(np.random.default_rng(1))
+            self.assertEqual(ohlc['close'].shape, (300, 40))
+            self.assertTrue((ohlc['high'] >= np.maximum(ohlc['open'], ohlc['close']) * (1 - 1e-12)).all())
+            self.assertTrue((ohlc['low'] <= np.minimum(ohlc['open'], ohlc['close']) * (1 + 1e-12)).all())
+            np.testing.assert_array_equal(make(np.random.default_rng(1))['close'], ohlc['close'])
+        # a bootstrap path is made of blocks of the historical returns
+        returns = np.diff(np.log(self.dff['Close'].to_numpy()))
+        path = np.diff(np.log(bootstrap_paths(self.dff, 1, 100, 10, np.random.default_rng(2))['close'][:, 0]))
+        start = int(np.argmin(np.abs(returns - path[10])))
+        np.testing.assert_allclose(path[10:19], returns[start:start + 9])
+
+    def test_lockstep_matches_simulate_bracket(self):
+        ohlc = bootstrap_paths(self.dff, 30, rng=np.random.default_rng(4))
+        signal = path_signals(MeanReversionCalc, {'window': 20, 'z_threshold': 1.5}, ohlc)
+        for risk in (0.01, 0.03):
+            result = bracket_paths(signal, ohlc['open'], ohlc['high'], ohlc['low'], ohlc['close'], risk)
+            for j in range(signal.shape[1]):
+                expected = simulate_bracket(signal[:, j], ohlc['open'][:, j], ohlc['high'][:, j],
+                                            ohlc['low'][:, j], risk)
+                self.assertAlmostEqual(result['net_profit'][j], expected['net_profit'], places=12)
+                self.assertEqual(result['trades'][j], len(expected['sell_idx']))
+            self.assertTrue((result['max_drawdown'] <= 0).all())
+
+    def test_monte_carlo(self):
+        results = monte_carlo(MeanReversionCalc, {'window': 20, 'z_threshold': 1.5}, self.dff,
+                              [0.01, 0.02], paths=50, batch=20, workers=1)
+        self.assertEqual(len(results), 100)
+        self.assertEqual(results['path'].tolist(), list(range(50)) * 2)
+        parallel = monte_carlo(MeanReversionCalc, {'window': 20, 'z_threshold': 1.5}, self.dff,
+                               [0.01, 0.02], paths=50, batch=20, workers=2)
+        pd.testing.assert_frame_equal(results, parallel)
+        summary = summarize(results)
+        self.assertEqual(summary.index.tolist(), [0.01, 0.02])
+        self.assertTrue((summary['net_profit_q05'] <= summary['net_profit_q95']).all())
+        self.assertTrue(summary['loss_probability'].between(0, 1).all())
+
+    def test_ohlc_calc(self):
+        results = monte_carlo(VolatilityATRCalc, {'window': 14, 'atr_multiplier': 1.0}, self.dff,
+                              [0.02], paths=10, method='gbm', price_col=None, workers=1)
+        self.assertEqual(len(results), 10)
+        self.assertTrue((results['trades'] >= 0).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import pandas as pd
+from strategies.tools.news import ArticleCache, LocalNewsServer, NewsClient
+
+
+def make_articles(n, start='2023-03-01 09:00', symbols=('AAPL',)):
+    times = pd.date_range(start, periods=n, freq='90min', tz='UTC')
+    return [{'id': 1000 + i, 'headline': f'headline {i}', 'created_at': t.strftime('%Y-%m-%dT%H:%M:%SZ'),
+             'symbols': list(symbols)} for i, t in enumerate(times)]
+
+
+class TestNews(unittest.TestCase):
+    def setUp(self):
+        self.articles = make_articles(120) + make_articles(5, symbols=('MSFT',))
+        for i, article in enumerate(self.articles[120:]):
+            article['id'] = 5000 + i
+        self.server = LocalNewsServer(self.articles).start()
+        self.client = NewsClient(base_url=self.server.url, cache=ArticleCache(':memory:'))
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_pagination_and_symbol_filter(self):
+        start, end = pd.Timestamp('2023-03-01', tz='UTC'), pd.Timestamp('2023-03-10', tz='UTC')
+        news = self.client.get_news('AAPL', start, end)
+        self.assertEqual([a['id'] for a in news], list(range(1000, 1120)))
+        # 120 articles at 50 per page
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.client.get_headlines('MSFT', start, end), [f'headline {i}' for i in range(5)])
+
+    def test_rolling_window_is_incremental(self):
+        now = pd.Timestamp('2023-03-05 12:00', tz='UTC')
+        first = self.client.get_headlines('AAPL', now - pd.Timedelta(days=3), now)
+        self.assertEqual(len(self.server.requests), 1)
+
+        # an hour later only the newest hour is requested
+        later = now + pd.Timedelta(hours=1)
+        second = self.client.get_news('AAPL', later - pd.Timedelta(days=3), later)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.server.requests[-1]['start'], '2023-03-05T12:00:00Z')
+        expected = [a for a in self.articles[:120]
+                    if later - pd.Timedelta(days=3) <= pd.Timestamp(a['created_at']) < later]
+        self.assertEqual(second, expected)
+        self.assertEqual(len(first), len(expected))
+
+        # a window inside the covered range is served from the cache
+        self.client.get_news('AAPL', now - pd.Timedelta(days=1), now)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_gap_between_windows_is_fetched(self):
+        # a window between two separately cached ones is not served as empty
+        self.client.get_news('AAPL', '2023-03-01', '2023-03-02')
+        self.client.get_news('AAPL', '2023-03-07', '2023-03-08')
+        count = len(self.server.requests)
+        news = self.client.get_news('AAPL', '2023-03-04', '2023-03-05')
+        self.assertEqual(len(self.server.requests), count + 1)
+        self.assertEqual(self.server.requests[-1]['start'], '2023-03-04T00:00:00Z')
+        self.assertEqual(len(news), 16)
+        self.assertEqual(self.client.cache.missing_ranges('AAPL', '2023-03-01', '2023-03-08'), [
+            (pd.Timestamp('2023-03-02', tz='UTC'), pd.Timestamp('2023-03-04', tz='UTC')),
+            (pd.Timestamp('2023-03-05', tz='UTC'), pd.Timestamp('2023-03-07', tz='UTC')),
+        ])
+
+    def test_late_article_is_fetched(self):
+        now = pd.Timestamp('2023-03-05 12:00', tz='UTC')
+        self.client.now = lambda: now
+        self.client.get_news('AAPL', now - pd.Timedelta(days=3), now)
+        # published an hour later, dated inside the range already covered
+        late = {'id': 9000, 'headline': 'late', 'created_at': '2023-03-05T10:00:00Z', 'symbols': ['AAPL']}
+        self.server.server.articles.append(late)
+        now += pd.Timedelta(hours=1)
+        news = self.client.get_news('AAPL', now - pd.Timedelta(days=3), now)
+        # the newest hour and the overlap before it in one request
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.server.requests[-1]['start'], '2023-03-04T13:00:00Z')
+        self.assertIn(late, news)
+        self.assertEqual(self.client.cache.coverage('AAPL'), [(pd.Timestamp('2023-03-02 12:00', tz='UTC'), now)])
+
+    def test_cache_survives_client(self):
+        cache = ArticleCache(':memory:')
+        start, end = '2023-03-01', '2023-03-03'
+        NewsClient(base_url=self.server.url, cache=cache).get_news('AAPL', start, end)
+        count = len(self.server.requests)
+        offline = NewsClient(base_url='http://127.0.0.1:9', cache=cache)
+        self.assertEqual(len(offline.get_news('AAPL', start, end)), 26)
+        self.assertEqual(len(self.server.requests), count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from strategies.tools.sweep import run_sweep
+from strategies.tools import sweep
+from strategies.tools.optimize import grid_features, surrogate_search
+from strategies.SimpleMACrossover import SimpleMACrossoverCalc
+
+
+class TestSurrogateSearch(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 1500
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n) + 0.01 * np.sin(np.arange(n) / 30)))
+        open_ = close * np.exp(rng.normal(0, 0.004, n))
+        self.dff = pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close) * 1.01,
+            'Low': np.minimum(open_, close) * 0.99,
+            'Close': close,
+        }, index=pd.date_range('2015-01-01', periods=n, freq='B'))
+        self.risk_range = np.arange(0.01, 0.06, 0.01)
+        self.combos = [(f'{s}_{l}', {'short_window': s, 'long_window': l})
+                       for s in range(3, 40, 3) for l in range(20, 200, 15)]
+        self.results = run_sweep(SimpleMACrossoverCalc, self.combos, self.dff, self.risk_range, workers=1)
+        self.best = sorted(self.results.groupby('combo', aggregations=('max',))['net_profit_max'], reverse=True)
+
+    def test_grid_features(self):
+        combos = [('a', {'n': 5, 'kind': 'x'}), ('b', {'n': 15, 'kind': 'y'}), ('c', {'n': 10, 'kind': 'x'})]
+        np.testing.assert_array_equal(grid_features(combos), [[0, 0], [1, 1], [0.5, 0]])
+
+    def test_tenth_of_the_grid(self):
+        result = surrogate_search(SimpleMACrossoverCalc, self.combos, self.dff, self.risk_range, workers=1)
+        self.assertLessEqual(result['cost'], 0.11)
+        self.assertEqual(len(result['evaluated']), 16)
+        # profits are the ones the exhaustive sweep reports
+        keys = [k for k, _ in self.combos]
+        for outer_key, risk, profit in result['evaluated']:
+            row = self.results.filter(combo=keys.index(outer_key), risk=risk)
+            self.assertEqual(row.column('net_profit').tolist(), [profit])
+        self.assertIn(result['net_profit'], self.best[:3])
+
+    def test_full_budget_is_exhaustive(self):
+        result = surrogate_search(SimpleMACrossoverCalc, self.combos[:20], self.dff, self.risk_range,
+                                  budget=1.0, workers=1)
+        self.assertEqual(sorted(k for k, _, _ in result['evaluated']), sorted(k for k, _ in self.combos[:20]))
+        self.assertEqual(result['net_profit'], max(p for _, _, p in result['evaluated']))
+
+    def test_parallel_matches_serial(self):
+        serial = surrogate_search(SimpleMACrossoverCalc, self.combos, self.dff, self.risk_range, workers=1, batch=2)
+        pools = []
+        executor = sweep.ProcessPoolExecutor
+        def counting_executor(*args, **kwargs):
+            pools.append(kwargs['max_workers'])
+            return executor(*args, **kwargs)
+        with mock.patch.object(sweep, 'ProcessPoolExecutor', counting_executor):
+            parallel = surrogate_search(SimpleMACrossoverCalc, self.combos, self.dff, self.risk_range,
+                                        workers=8, batch=2)
+        self.assertEqual(serial['evaluated'], parallel['evaluated'])
+        # one pool for every round, no more workers than a round has tasks
+        self.assertEqual(pools, [2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import subprocess
+import unittest
+from param_helper import STRATEGIES, STRATEGY_REGISTRY, build_params, load_strategy
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestParamHelper(unittest.TestCase):
+    def test_build_params(self):
+        args = argparse.Namespace(strategy='rsi-crossover', symbol='AAPL', window=22, cash_at_risk=0.1,
+                                  risk_tolerance=0.02, rsi_period=3, upper_threshold=70, lower_threshold=32,
+                                  short_window=9, long_window=21, num_std_dev=2.0, timestep='day')
+        self.assertEqual(build_params(args), {'symbol': 'AAPL', 'window': 22, 'cash_at_risk': 0.1,
+                                              'risk_tolerance': 0.02, 'timestep': 'day', 'rsi_period': 3,
+                                              'upper_threshold': 70, 'lower_threshold': 32})
+        args.strategy = 'ema-crossover'
+        self.assertEqual(build_params(args)['short_window'], 9)
+        self.assertNotIn('rsi_period', build_params(args))
+
+    def test_load_strategy(self):
+        for name in STRATEGIES:
+            if name == 'sentiment':
+                continue
+            self.assertEqual(load_strategy(name).__name__, STRATEGY_REGISTRY[name][1])
+
+    def test_technical_strategy_skips_torch(self):
+        code = ('import sys; from param_helper import load_strategy; load_strategy("ema-crossover"); '
+                'print(any(m in sys.modules for m in ("torch", "transformers")))')
+        out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+        # lumibot logs a banner on import, the answer is the last line
+        self.assertEqual(out.stdout.strip().splitlines()[-1], 'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import numpy as np
+import pandas as pd
+from strategies.tools.performance import performance
+from strategies.tools.signals import Signal
+from strategies.tools.tools import calculate_profit
+
+
+def reference_profit(data, initial_capital):
+    # the row-by-row calculate_profit loop performance() replaces
+    capital = initial_capital
+    position = 0
+    next_day_open = data['Open'].shift(-1)
+    positions = []
+    for i in range(len(data)-1):
+        if data['Signal'].iloc[i] == Signal.BUY and capital >= next_day_open.iloc[i]:
+            position += 1
+            capital -= next_day_open.iloc[i]
+        elif data['Signal'].iloc[i] == Signal.SELL and position > 0:
+            position -= 1
+            capital += next_day_open.iloc[i]
+        positions.append(position)
+    final_value = capital + position * next_day_open.iloc[-2]
+    return final_value - initial_capital, capital, positions
+
+
+class TestPerformance(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        n = 800
+        self.data = pd.DataFrame({
+            'Open': 50 * np.exp(np.cumsum(rng.normal(0, 0.02, n))),
+            'Signal': rng.choice(np.array([Signal.BUY, Signal.SELL, Signal.HOLD], dtype=np.int8),
+                                 size=n, p=[0.3, 0.2, 0.5]),
+        })
+
+    def test_matches_reference_loop(self):
+        # plenty of cash, then so little that buys get skipped
+        for capital in [1e6, 400.0, 0.0]:
+            profit, cash, positions = reference_profit(self.data, capital)
+            self.assertEqual(calculate_profit(self.data, capital), (profit, cash))
+            result = performance(self.data.Signal, self.data.Open, capital)
+            np.testing.assert_array_equal(result['position'][1:], positions)
+            self.assertEqual(result['equity'][-1] - capital, profit)
+
+    def test_metrics(self):
+        result = performance(self.data.Signal, self.data.Open, 400.0)
+        equity = pd.Series(result['equity'])
+        returns = equity.pct_change().dropna()
+        self.assertAlmostEqual(result['sharpe'], returns.mean() / returns.std() * np.sqrt(252))
+        self.assertAlmostEqual(result['max_drawdown'], (1 - equity / equity.cummax()).max())
+        self.assertAlmostEqual(result['exposure'], (result['position'] > 0).mean())
+        downside = np.sqrt((returns.clip(upper=0) ** 2).mean())
+        self.assertAlmostEqual(result['sortino'], returns.mean() / downside * np.sqrt(252))
+
+    def test_fifo_trade_returns(self):
+        data = pd.DataFrame({
+            'Open': [10.0, 10.0, 20.0, 30.0, 40.0, 50.0],
+            'Signal': np.array([Signal.BUY, Signal.BUY, Signal.SELL, Signal.SELL, Signal.SELL, Signal.HOLD],
+                               dtype=np.int8),
+        })
+        result = performance(data.Signal, data.Open, 100.0)
+        # buys at 10 and 20, sells at 30 and 40 close them oldest first
+        np.testing.assert_allclose(result['trade_returns'], [30 / 10 - 1, 40 / 20 - 1])
+        np.testing.assert_array_equal(result['position'], [0, 1, 2, 1, 0, 0])
+        np.testing.assert_array_equal(result['equity'], [100, 100, 110, 130, 140, 140])
+        self.assertEqual(result['max_drawdown'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
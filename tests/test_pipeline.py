@@ -0,0 +1,83 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import numpy as np
+import pandas as pd
+from strategies.tools import indicator_cache
+from strategies.tools.indicator_cache import IndicatorCache
+from strategies.tools.pipeline import Pipeline, Source, SMA, Std, EMA, RSI, ATR, Aroon, Sentiment
+from strategies.AroonCrossover import AroonCrossoverCalc
+from strategies.MeanReversion import MeanReversionCalc
+from strategies.RsiCrossover import RsiCrossoverCalc
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        n = 300
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+        self.df = pd.DataFrame({
+            'high': close * 1.01,
+            'low': close * 0.99,
+            'close': close,
+            'sentiment': rng.uniform(-1, 1, n),
+        }, index=pd.date_range('2023-01-02', periods=n, freq='B'))
+        close = Source('close')
+        z_score = (close - SMA(close, 21)) / Std(close, 20)
+        self.outputs = {
+            'z_score': z_score,
+            'score': 0.4 * Sentiment() + 0.6 * (z_score < -2),
+            'rsi': RSI(close, 14),
+            'atr': ATR(14),
+            'aroon': Aroon(close, 25) - Aroon(close, 25, 'min'),
+            'ema': EMA(close, 12),
+        }
+
+    def test_shared_nodes(self):
+        # two strategies declaring the same indicators separately
+        close = Source('close')
+        bollinger = {'mean': SMA(close, 20), 'upper': SMA(close, 20) + 2 * Std(close, 20)}
+        reversion = {'z': (Source('close') - SMA(Source('close'), 20)) / Std(Source('close'), 20)}
+        merged = Pipeline({**bollinger, **reversion})
+        self.assertEqual(len(merged), len(Pipeline(bollinger)) + 2)
+        self.assertEqual(sum(isinstance(node, SMA) for node in merged.nodes), 1)
+        # inputs come before the nodes that consume them
+        position = {node.key: k for k, node in enumerate(merged.nodes)}
+        for node in merged.nodes:
+            for i in node.inputs:
+                self.assertLess(position[i.key], position[node.key])
+
+    def test_incremental_matches_vectorized(self):
+        pipeline = Pipeline(self.outputs)
+        vectorized = pipeline.run(self.df)
+        incremental = pd.DataFrame([pipeline.update(row) for _, row in self.df.iterrows()],
+                                   index=self.df.index)
+        pd.testing.assert_frame_equal(incremental, vectorized, rtol=1e-9)
+        # reset() starts the incremental state over
+        pipeline.reset()
+        self.assertEqual(pipeline.update(self.df.iloc[0])['ema'], vectorized['ema'].iloc[0])
+
+    def test_matches_calcs(self):
+        close = self.df['close']
+        result = Pipeline(self.outputs).run(self.df)
+        np.testing.assert_allclose(result['rsi'], RsiCrossoverCalc(params={
+            'rsi_period': 14, 'upper_threshold': 70, 'lower_threshold': 30}).get_data(close)['RSI'])
+        aroon = (result['aroon'] > 0) * 1 - (result['aroon'] < 0) * 1
+        np.testing.assert_array_equal(aroon, AroonCrossoverCalc(params={'window': 25}).get_data(close)['Signal'])
+        np.testing.assert_allclose(result['z_score'], (close - close.rolling(21).mean()) / close.rolling(20).std())
+
+    def test_shares_indicator_cache_with_calcs(self):
+        cache = indicator_cache.indicators = IndicatorCache()
+        try:
+            MeanReversionCalc(params={'window': 20, 'z_threshold': 2, 'symbol': 'AAPL'}).get_data(self.df['close'])
+            close = Source('close')
+            Pipeline({'z': (close - SMA(close, 20)) / Std(close, 20)}).run(self.df, symbol='AAPL')
+            # the std comes from the Calc's rolling moments; the SMA is new
+            self.assertEqual((cache.hits, cache.misses), (1, 2))
+        finally:
+            indicator_cache.indicators = IndicatorCache()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import tempfile
+import types
+import unittest
+import numpy as np
+import pandas as pd
+from lumibot.entities import Asset
+from strategies.Portfolio import Portfolio
+from strategies.EmaCrossover import EmaCrossoverCalc
+from strategies.VolatilityATR import VolatilityATRCalc
+from strategies.tools.tools import read_symbols
+from strategies.tools.bars import BarBuffer
+from param_helper import build_portfolio_params
+
+
+class TestPortfolio(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        index = pd.date_range('2022-01-03', periods=60, freq='B')
+        self.bars = {}
+        for symbol in ['AAPL', 'MSFT', 'TSLA']:
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(index))))
+            df = pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close}, index=index)
+            self.bars[Asset(symbol)] = types.SimpleNamespace(df=df)
+        self.buffers = {}
+        for asset, bars in self.bars.items():
+            self.buffers[asset.symbol] = BarBuffer(80)
+            self.buffers[asset.symbol].extend(bars.df)
+
+    def test_read_symbols(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'symbols.txt')
+            with open(path, 'w') as f:
+                f.write('msft\nTSLA, nvda\n\n')
+            self.assertEqual(read_symbols(['aapl', path, 'MSFT']), ['AAPL', 'MSFT', 'TSLA', 'NVDA'])
+        with self.assertRaises(argparse.ArgumentTypeError):
+            read_symbols(['BRK1'])
+
+    def test_build_portfolio_params(self):
+        args = argparse.Namespace(strategy='ema-crossover', symbol='AAPL', window=22, cash_at_risk=0.1,
+                                  risk_tolerance=0.02, short_window=9, long_window=21, timestep='day')
+        params = build_portfolio_params(args, ['AAPL', 'MSFT'])
+        self.assertNotIn('symbol', params)
+        self.assertEqual(params['symbols'], ['AAPL', 'MSFT'])
+        self.assertIs(params['calc'], EmaCrossoverCalc)
+        self.assertEqual(params['calc_params'], {'short_window': 9, 'long_window': 21})
+
+    def test_batched_signals_match_per_symbol(self):
+        portfolio = types.SimpleNamespace(strategy=EmaCrossoverCalc(params={'short_window': 3, 'long_window': 8}))
+        prices = Portfolio.get_price_frame(portfolio, self.buffers)
+        self.assertEqual(list(prices.columns), ['AAPL', 'MSFT', 'TSLA'])
+        signals = portfolio.strategy.get_data(prices)
+        for asset, bars in self.bars.items():
+            expected = portfolio.strategy.get_data(bars.df['close'])['Signal']
+            np.testing.assert_array_equal(signals[asset.symbol].to_numpy(), expected.to_numpy())
+
+        portfolio.strategy = VolatilityATRCalc(params={'window': 5, 'atr_multiplier': 1.0})
+        prices = Portfolio.get_price_frame(portfolio, self.buffers)
+        signals = portfolio.strategy.get_data(prices)
+        for asset, bars in self.bars.items():
+            expected = portfolio.strategy.get_data(bars.df)['Signal']
+            np.testing.assert_array_equal(signals[asset.symbol].to_numpy(), expected.to_numpy())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+from strategies.tools.results import SweepResults
+
+
+class TestSweepResults(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        windows, thresholds, risks = [5, 10, 20, 50], [0.5, 1.0, 1.5], [0.01, 0.02, 0.03]
+        grid = [(w, z, r) for w in windows for z in thresholds for r in risks]
+        self.frame = pd.DataFrame(grid, columns=['window', 'z_threshold', 'risk'])
+        # rounded so that ties occur
+        self.frame['net_profit'] = np.round(rng.normal(1.0, 0.05, len(grid)), 2)
+        self.frame.insert(0, 'combo', np.repeat(np.arange(len(grid) // 3, dtype=np.int32), 3))
+        self.frame['cash_remaining'] = 1e6
+        self.frame['cash_pct'] = 0.0
+        self.results = SweepResults.from_columns({c: self.frame[c].to_numpy() for c in self.frame})
+
+    def test_top_keeps_row_order_on_ties(self):
+        expected = self.frame.sort_values('net_profit', ascending=False, kind='stable').head(7)
+        top = self.results.top(7)
+        np.testing.assert_array_equal(top.index, expected.index)
+        np.testing.assert_array_equal(top['net_profit'], expected['net_profit'])
+        self.assertEqual(len(self.results.top(1000)), len(self.frame))
+
+    def test_best(self):
+        best = self.results.best()
+        row = self.frame.loc[self.frame['net_profit'].idxmax()]
+        self.assertEqual((best['window'], best['risk']), (row['window'], row['risk']))
+        self.assertIsInstance(best['window'], int)
+        # below the 1.0 multiple of never trading, even though above zero
+        losing = self.results.filter(pc.field('net_profit') < 1)
+        self.assertGreater(len(losing), 0)
+        self.assertIsNone(losing.best())
+        self.assertEqual(losing.best(baseline=0)['net_profit'], max(losing.to_pandas()['net_profit']))
+
+    def test_filter_and_groupby(self):
+        subset = self.results.filter((pc.field('window') >= 20) & (pc.field('risk') < 0.025))
+        self.assertEqual(len(subset), 2 * 3 * 2)
+        self.assertEqual(len(self.results.filter(window=10, z_threshold=1.0)), 3)
+        grouped = self.results.groupby('window')
+        expected = self.frame.groupby('window')['net_profit'].agg(['max', 'mean'])
+        np.testing.assert_allclose(grouped['net_profit_max'], expected['max'])
+        np.testing.assert_allclose(grouped['net_profit_mean'], expected['mean'])
+        self.assertEqual(self.results.params, ['window', 'z_threshold'])
+
+    def test_parquet_round_trip(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'sweeps', 'mr.parquet')
+            self.results.to_parquet(path)
+            loaded = SweepResults.read_parquet(path)
+            self.assertTrue(loaded.table.equals(self.results.table))
+            only = SweepResults.read_parquet(path, columns=['window', 'net_profit'], filters=[('window', '==', 5)])
+            self.assertEqual(only.table.column_names, ['window', 'net_profit'])
+            self.assertEqual(len(only), 9)
+
+    def test_string_parameters(self):
+        results = SweepResults.from_columns({'mode': ['max', 'min', 'max'], 'net_profit': [1.0, 2.0, 3.0]})
+        self.assertEqual(str(results.table.schema.field('mode').type), 'dictionary<values=string, indices=int32, ordered=0>')
+        self.assertEqual(results.filter(mode='max').column('net_profit').tolist(), [1.0, 3.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from strategies.tools import rolling as rolling_tools
+from strategies.tools.rolling import rolling_argmax, rolling_argmin, rolling_moments, RollingMoments
+
+
+def exact_moments(values, window):
+    # two-pass mean and sample std of every full window
+    mean = np.full(len(values), np.nan)
+    std = np.full(len(values), np.nan)
+    if len(values) >= window:
+        windows = sliding_window_view(values, window)
+        mean[window - 1:] = windows.mean(axis=1)
+        if window > 1:
+            std[window - 1:] = windows.std(axis=1, ddof=1)
+    return mean, std
+
+
+class TestRolling(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(2)
+
+    def test_rolling_argmax_argmin(self):
+        for n, window in [(1, 1), (5, 5), (10, 3), (100, 7), (257, 50), (1000, 1), (300, 299), (20, 30)]:
+            # rounded values force ties, which must resolve to the oldest bar
+            values = np.round(self.rng.normal(size=n), 1)
+            if n > 20:
+                values[17] = np.nan
+            rolling = pd.Series(values).rolling(window)
+            np.testing.assert_array_equal(rolling_argmax(values, window),
+                                          rolling.apply(lambda x: x.argmax(), raw=True).to_numpy())
+            np.testing.assert_array_equal(rolling_argmin(values, window),
+                                          rolling.apply(lambda x: x.argmin(), raw=True).to_numpy())
+
+    def test_rolling_argmax_matrix(self):
+        values = np.round(self.rng.normal(size=(400, 5)), 1)
+        values[100, 2] = np.nan
+        expected = pd.DataFrame(values).rolling(30).apply(lambda x: x.argmax(), raw=True)
+        np.testing.assert_array_equal(rolling_argmax(values, 30), expected.to_numpy())
+
+
+    def test_rolling_moments(self):
+        for n, window in [(1, 1), (5, 5), (10, 3), (100, 7), (257, 50), (1000, 2), (300, 299), (20, 30)]:
+            # large prices with a small spread, where sums of squares cancel
+            values = 1e4 + self.rng.normal(size=n)
+            mean, std = rolling_moments(values, window)
+            expected_mean, expected_std = exact_moments(values, window)
+            np.testing.assert_allclose(mean, expected_mean, rtol=1e-13)
+            np.testing.assert_allclose(std, expected_std, rtol=1e-9)
+            rolling = pd.Series(values).rolling(window)
+            np.testing.assert_allclose(mean, rolling.mean(), rtol=1e-12)
+            np.testing.assert_allclose(std, rolling.std(), rtol=1e-4)
+
+    def test_rolling_moments_nan_and_matrix(self):
+        values = 100 + self.rng.normal(size=(400, 3))
+        values[50, 1] = np.nan
+        mean, std = rolling_moments(values, 20)
+        expected = pd.DataFrame(values).rolling(20)
+        np.testing.assert_allclose(mean, expected.mean(), rtol=1e-12)
+        np.testing.assert_allclose(std, expected.std(), rtol=1e-6)
+        self.assertTrue(np.isnan(mean[50:70, 1]).all())
+        self.assertFalse(np.isnan(mean[70:, 1]).any())
+
+    def test_rolling_moments_chunks(self):
+        values = 100 + self.rng.normal(size=(1000, 2))
+        chunk, rolling_tools.CHUNK = rolling_tools.CHUNK, 64
+        try:
+            for window in (7, 32, 33, 100):
+                mean, std = rolling_moments(values, window)
+                expected = pd.DataFrame(values).rolling(window)
+                np.testing.assert_allclose(mean, expected.mean(), rtol=1e-12)
+                np.testing.assert_allclose(std, expected.std(), rtol=1e-6)
+        finally:
+            rolling_tools.CHUNK = chunk
+
+    def test_streaming_moments_stay_accurate(self):
+        window = 50
+        # |mean| / std is about 3e4, where running sums of x**2 lose most
+        # digits; resync * eps * 3e4 is about 2e-8
+        values = 1e4 + np.cumsum(np.random.default_rng(7).normal(scale=0.1, size=200_000))
+        roll = RollingMoments(window)
+        _, expected = exact_moments(values, window)
+        for k, value in enumerate(values):
+            roll.push(value)
+            if k >= window - 1 and k % 997 == 0:
+                self.assertAlmostEqual(roll.std() / expected[k], 1.0, delta=2e-7)
+                self.assertAlmostEqual(roll.zscore(value), (value - values[k - window + 1:k + 1].mean()) / expected[k], delta=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
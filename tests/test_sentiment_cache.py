@@ -0,0 +1,88 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import tempfile
+import threading
+import unittest
+import numpy as np
+from strategies.tools.sentiment_cache import SentimentCache, headline_key
+
+
+class FakeModel:
+    # deterministic stand-in for FinBERT that records every batch it sees
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, headlines):
+        self.batches.append(list(headlines))
+        return np.array([[len(h), -len(h) / 2, 0.5] for h in headlines], dtype=np.float32)
+
+
+class TestSentimentCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'finbert.sqlite')
+        self.headlines = ['Apple beats estimates', 'Stocks slide on rate fears', 'Apple  beats ESTIMATES ']
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_normalized_key(self):
+        self.assertEqual(headline_key(self.headlines[0]), headline_key(self.headlines[2]))
+        self.assertNotEqual(headline_key(self.headlines[0]), headline_key(self.headlines[1]))
+
+    def test_only_unseen_headlines_are_inferred(self):
+        cache = SentimentCache(self.path)
+        model = FakeModel()
+        first = cache.logits(self.headlines, model)
+        # the duplicate headline reuses the logits of its first occurrence
+        self.assertEqual(model.batches, [self.headlines[:2]])
+        np.testing.assert_array_equal(first[2], first[0])
+        np.testing.assert_array_equal(first, model(self.headlines[:2] + self.headlines[:1]))
+
+        model.batches = []
+        second = cache.logits(self.headlines + ['Oil rallies'], model)
+        self.assertEqual(model.batches, [['Oil rallies']])
+        np.testing.assert_array_equal(second[:3], first)
+        self.assertEqual((cache.hits, cache.misses), (4, 3))
+        self.assertEqual(cache.logits([], model).shape, (0, 3))
+
+    def test_persistent_and_lru(self):
+        cache = SentimentCache(self.path, capacity=1)
+        expected = cache.logits(self.headlines, FakeModel())
+        self.assertEqual(len(cache._memory), 1)
+        cache.close()
+
+        model = FakeModel()
+        reopened = SentimentCache(self.path)
+        np.testing.assert_array_equal(reopened.logits(self.headlines, model), expected)
+        self.assertEqual(model.batches, [])
+        self.assertEqual(len(reopened), 2)
+
+        # another namespace does not see these logits
+        other = SentimentCache(self.path, namespace='int8')
+        other.logits(self.headlines, model)
+        self.assertEqual(len(model.batches), 1)
+
+
+    def test_counters_across_threads(self):
+        # lumibot strategies share the cache from their own threads
+        cache = SentimentCache(':memory:')
+        cache.logits(self.headlines, FakeModel())
+        calls = 200
+
+        def work():
+            for _ in range(calls):
+                cache.logits(self.headlines, FakeModel())
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(cache.hits, 1 + 8 * calls * len(self.headlines))
+
+
+if __name__ == '__main__':
+    unittest.main()
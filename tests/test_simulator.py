@@ -0,0 +1,117 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import numpy as np
+import pandas as pd
+from strategies.tools.simulator import simulate_bracket, bracket_windows
+from strategies.tools.signals import Signal, signal_labels
+
+
+def reference_bracket(data, risk, trading_fee, cash):
+    # the row-by-row loop the strategy tests used before simulate_bracket
+    in_position = False
+    buy_price = None
+    buy_prices = []
+    sell_prices = []
+    tp = (1 + risk)
+    sl = (1 - risk)
+    for index, row in data.iterrows():
+        if not in_position and row.Signal == Signal.BUY:
+            if not pd.isnull(row.shifted_open):
+                buy_price = row.shifted_open
+                cash -= buy_price
+                buy_prices.append(buy_price)
+                in_position = True
+
+        if in_position:
+            take_profit_price = buy_price * tp
+            stop_loss_price = buy_price * sl
+
+            if row.Low < stop_loss_price:
+                sell_price = buy_price * sl
+                sell_prices.append(sell_price)
+                cash += sell_price
+                in_position = False
+            elif row.High > take_profit_price:
+                sell_price = buy_price * tp
+                sell_prices.append(sell_price)
+                cash += sell_price
+                in_position = False
+
+    profits = pd.Series([(sell - buy) / buy - trading_fee for sell, buy in zip(sell_prices, buy_prices)])
+    net_profit = (profits + 1).prod()
+    return net_profit, cash, buy_prices, sell_prices
+
+
+class TestSimulator(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        n = 1500
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+        open_ = close * np.exp(rng.normal(0, 0.005, n))
+        high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.01, n)))
+        low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.01, n)))
+        signal = rng.choice(np.array([Signal.BUY, Signal.SELL, Signal.HOLD], dtype=np.int8),
+                            size=n, p=[0.1, 0.1, 0.8])
+        self.data = pd.DataFrame({
+            'Open': open_,
+            'High': high,
+            'Low': low,
+            'Close': close,
+            'Signal': signal,
+        }, index=pd.date_range('2020-01-01', periods=n, freq='B'))
+        self.data['shifted_open'] = self.data.Open.shift(-1)
+        self.trading_fee = 0.0015
+
+    def test_matches_reference_loop(self):
+        cash = 1000000
+        for risk in np.arange(0.01, 0.06, 0.01):
+            expected = reference_bracket(self.data, risk, self.trading_fee, cash)
+            result = simulate_bracket(self.data.Signal, self.data.Open,
+                                      self.data.High, self.data.Low,
+                                      risk, self.trading_fee, cash)
+            self.assertEqual(result['net_profit'], expected[0])
+            self.assertEqual(result['cash'], expected[1])
+            np.testing.assert_array_equal(result['buy_prices'], expected[2])
+            np.testing.assert_array_equal(result['sell_prices'], expected[3])
+            cash = result['cash']
+
+    def test_string_signals(self):
+        # legacy 'BUY'/'SELL'/'HOLD' labels give the same trades as int8 codes
+        labels = signal_labels(self.data.Signal)
+        self.assertEqual(labels.dtype.kind, 'U')
+        expected = simulate_bracket(self.data.Signal, self.data.Open, self.data.High, self.data.Low, 0.02)
+        result = simulate_bracket(labels, self.data.Open, self.data.High, self.data.Low, 0.02)
+        self.assertEqual(result['net_profit'], expected['net_profit'])
+        np.testing.assert_array_equal(result['buy_idx'], expected['buy_idx'])
+
+    def test_bracket_windows(self):
+        # overlapping windows give exactly what simulating each slice does
+        windows = [slice(a, a + size) for a in range(0, 1400, 53) for size in (1, 2, 40, 300)]
+        args = [np.asarray(self.data[c]) for c in ('Signal', 'Open', 'High', 'Low')]
+        for risk in (0.005, 0.02, 0.08):
+            expected = [simulate_bracket(*(a[w] for a in args), risk)['net_profit'] for w in windows]
+            np.testing.assert_array_equal(bracket_windows(*args, risk, windows), expected)
+
+    def test_open_position_and_last_bar(self):
+        data = self.data.iloc[:50].copy()
+        data['Signal'] = Signal.HOLD
+        # a BUY on the final bar has no next open and is ignored
+        data.iloc[-1, data.columns.get_loc('Signal')] = Signal.BUY
+        result = simulate_bracket(data.Signal, data.Open, data.High, data.Low, 0.5)
+        self.assertEqual(len(result['buy_idx']), 0)
+        self.assertEqual(result['net_profit'], 1.0)
+        self.assertEqual(result['cash'], 0.0)
+
+        # an entry that never reaches either bracket stays open
+        data.iloc[-1, data.columns.get_loc('Signal')] = Signal.HOLD
+        data.iloc[10, data.columns.get_loc('Signal')] = Signal.BUY
+        result = simulate_bracket(data.Signal, data.Open, data.High, data.Low, 0.99)
+        self.assertEqual(list(result['buy_idx']), [10])
+        self.assertEqual(len(result['sell_idx']), 0)
+        self.assertEqual(result['cash'], -data.Open.iloc[11])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from datetime import datetime
+from strategies.tools.store import OhlcvStore, LocalDataBacktesting
+
+
+class TestStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.calls = []
+        self.store = OhlcvStore(self.tmp.name, fetch=self.fetch)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def fetch(self, symbol, start, end, timestep='day'):
+        # yfinance-shaped frame with a deterministic price per business day
+        self.calls.append((symbol, start, end))
+        index = pd.bdate_range(start, end, inclusive='left')
+        close = 100 + (index - pd.Timestamp('2020-01-01')).days.to_numpy(dtype=float)
+        return pd.DataFrame({
+            'Open': close - 0.5,
+            'High': close + 1,
+            'Low': close - 1,
+            'Close': close,
+            'Adj Close': close,
+            'Volume': 1e6,
+        }, index=index)
+
+    def test_fill_only_missing_dates(self):
+        self.assertEqual(self.store.fill('aapl', '2022-01-01', '2022-03-01'), 1)
+        self.assertEqual(self.store.fill('AAPL', '2022-01-15', '2022-02-01'), 0)
+        self.assertEqual(self.store.fill('AAPL', '2021-12-01', '2022-04-01'), 2)
+        self.assertEqual([c[1:] for c in self.calls[1:]], [
+            (pd.Timestamp('2021-12-01'), pd.Timestamp('2022-01-01')),
+            (pd.Timestamp('2022-03-01'), pd.Timestamp('2022-04-01')),
+        ])
+        df = self.store.read('AAPL')
+        self.assertEqual(list(df.columns), ['open', 'high', 'low', 'close', 'volume'])
+        self.assertTrue(df.index.is_monotonic_increasing)
+        self.assertEqual(len(df), len(pd.bdate_range('2021-12-01', '2022-03-31')))
+        self.assertEqual(self.store.symbols(), ['AAPL'])
+
+    def test_disjoint_fills(self):
+        # the gap between two separate requests is still fetched
+        self.store.fill('AAPL', '2022-01-01', '2022-07-01')
+        self.store.fill('AAPL', '2023-01-01', '2023-07-01')
+        self.assertEqual(self.store.fill('AAPL', '2022-07-01', '2023-01-01'), 1)
+        self.assertEqual(self.calls[-1][1:], (pd.Timestamp('2022-07-01'), pd.Timestamp('2023-01-01')))
+        self.assertEqual(len(self.store.read('AAPL', '2022-07-01', '2023-01-01')),
+                         len(pd.bdate_range('2022-07-01', '2022-12-31')))
+        self.assertEqual(self.store.coverage('AAPL'), [(pd.Timestamp('2022-01-01'), pd.Timestamp('2023-07-01'))])
+
+        self.store.fill('MSFT', '2022-01-01', '2022-02-01')
+        self.store.fill('MSFT', '2022-03-01', '2022-04-01')
+        self.assertEqual(self.store.missing_ranges('MSFT', '2021-12-01', '2022-05-01'), [
+            (pd.Timestamp('2021-12-01'), pd.Timestamp('2022-01-01')),
+            (pd.Timestamp('2022-02-01'), pd.Timestamp('2022-03-01')),
+            (pd.Timestamp('2022-04-01'), pd.Timestamp('2022-05-01')),
+        ])
+
+    def test_empty_fetch_is_fetched_again(self):
+        # an offline yfinance download returns an empty frame
+        store = OhlcvStore(self.tmp.name, fetch=lambda *args, **kwargs: pd.DataFrame())
+        self.assertEqual(store.fill('AAPL', '2022-01-01', '2023-01-01'), 1)
+        self.assertEqual(store.coverage('AAPL'), [])
+        self.assertEqual(self.store.fill('AAPL', '2022-01-01', '2023-01-01'), 1)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(len(self.store.read('AAPL')), len(pd.bdate_range('2022-01-01', '2022-12-31')))
+
+    def test_coverage_stops_at_last_bar(self):
+        # the bars end on a Wednesday: the rest of the request and the future stay missing
+        fetch = lambda symbol, start, end, timestep='day': self.fetch(symbol, start, min(end, pd.Timestamp('2022-01-06')))
+        store = OhlcvStore(self.tmp.name, fetch=fetch)
+        store.fill('AAPL', '2022-01-01', pd.Timestamp.now() + pd.Timedelta(days=30))
+        self.assertEqual(store.coverage('AAPL'), [(pd.Timestamp('2022-01-01'), pd.Timestamp('2022-01-06'))])
+        self.assertLessEqual(self.calls[0][2], pd.Timestamp.now())
+        # a Friday close covers the weekend
+        self.store.fill('MSFT', '2022-01-03', '2022-01-10')
+        self.assertEqual(self.store.missing_ranges('MSFT', '2022-01-03', '2022-01-11'),
+                         [(pd.Timestamp('2022-01-10'), pd.Timestamp('2022-01-11'))])
+
+    def test_stale_coverage_is_dropped(self):
+        # files written before coverage stopped at the last bar
+        self.store.fill('AAPL', '2022-01-01', '2022-02-01')
+        path = self.store.path('AAPL')
+        table = pq.read_table(path)
+        metadata = {**table.schema.metadata,
+                    b'algotrade.coverage': b'[["2021-01-01", "2021-06-01"], ["2022-01-01", "2022-03-01"]]'}
+        pq.write_table(table.replace_schema_metadata(metadata), path)
+        self.assertEqual(self.store.coverage('AAPL'), [(pd.Timestamp('2022-01-01'), pd.Timestamp('2022-02-01'))])
+
+    def test_read_slices(self):
+        self.store.fill('MSFT', '2022-01-01', '2022-02-01')
+        df = self.store.read('MSFT', '2022-01-10', '2022-01-15')
+        self.assertEqual(list(df.index.day), [10, 11, 12, 13, 14])
+
+        arrays = self.store.arrays('MSFT', '2022-01-10', '2022-01-15')
+        np.testing.assert_array_equal(arrays['close'], df['close'].to_numpy())
+        self.assertFalse(arrays['close'].flags.owndata)
+
+        dff = self.store.download('MSFT', datetime(2022, 1, 1), datetime(2022, 2, 1))
+        self.assertEqual(list(dff.columns), ['Open', 'High', 'Low', 'Close', 'Volume'])
+        self.assertEqual(len(self.calls), 1)
+
+    def test_data_source(self):
+        self.store.fill('AAPL', '2021-01-01', '2022-03-02')
+        data_source = LocalDataBacktesting(datetime(2022, 2, 1), datetime(2022, 3, 1),
+                                           store=self.store, fill=False)
+        data_source._datetime = data_source.to_default_timezone(datetime(2022, 2, 15, 9, 30))
+        bars = data_source.get_historical_prices('AAPL', 5, 'day')
+        expected = self.store.read('AAPL', '2022-02-08', '2022-02-15')
+        np.testing.assert_array_equal(bars.df['close'].to_numpy(), expected['close'].to_numpy())
+        self.assertEqual(len(self.calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
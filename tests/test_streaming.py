@@ -0,0 +1,81 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import numpy as np
+import pandas as pd
+from strategies.tools.signals import Signal
+from strategies.SimpleMACrossover import SimpleMACrossoverCalc
+from strategies.MeanReversion import MeanReversionCalc
+from strategies.BollingerBands import BollingerBandsCalc
+from strategies.RsiCrossover import RsiCrossoverCalc
+from strategies.EmaCrossover import EmaCrossoverCalc
+from strategies.AroonCrossover import AroonCrossoverCalc
+from strategies.VolatilityATR import VolatilityATRCalc
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        n = 260
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        # round so that ties (equal highs/lows) are exercised as well
+        close = np.round(close, 1)
+        spread = np.abs(rng.normal(0, 0.01, n)) * close
+        index = pd.date_range('2022-01-03', periods=n, freq='B')
+        self.prices = pd.Series(close, index=index)
+        self.ohlc = pd.DataFrame({
+            'open': close,
+            'high': close + spread,
+            'low': close - spread,
+            'close': close,
+        }, index=index)
+
+    def assert_streaming_matches(self, calc, data):
+        # every update must agree with the last row of a full recompute
+        for i in range(len(data)):
+            bar = data.iloc[i]
+            signal = calc.update(bar)
+            expected = calc.get_data(data.iloc[:i + 1])['Signal']
+            self.assertEqual(expected.dtype, np.int8)
+            self.assertIsInstance(signal, Signal)
+            self.assertEqual(signal, expected.iloc[-1], f'bar {i}')
+
+    def test_simple_ma_crossover(self):
+        calc = SimpleMACrossoverCalc(params={'short_window': 9, 'long_window': 21})
+        self.assert_streaming_matches(calc, self.prices)
+
+    def test_mean_reversion(self):
+        calc = MeanReversionCalc(params={'window': 20, 'z_threshold': 1.0})
+        self.assert_streaming_matches(calc, self.prices)
+
+    def test_bollinger_bands(self):
+        calc = BollingerBandsCalc(params={'window': 20, 'num_std_dev': 1.0})
+        self.assert_streaming_matches(calc, self.prices)
+
+    def test_rsi_crossover(self):
+        calc = RsiCrossoverCalc(params={'rsi_period': 7, 'upper_threshold': 70, 'lower_threshold': 30})
+        self.assert_streaming_matches(calc, self.prices)
+
+    def test_ema_crossover(self):
+        calc = EmaCrossoverCalc(params={'short_window': 10, 'long_window': 50})
+        self.assert_streaming_matches(calc, self.prices)
+
+    def test_aroon_crossover(self):
+        calc = AroonCrossoverCalc(params={'window': 25})
+        self.assert_streaming_matches(calc, self.prices)
+
+    def test_volatility_atr(self):
+        calc = VolatilityATRCalc(params={'window': 5, 'atr_multiplier': 1.0})
+        self.assert_streaming_matches(calc, self.ohlc)
+
+    def test_reset(self):
+        calc = EmaCrossoverCalc(params={'short_window': 3, 'long_window': 8})
+        first = [calc.update(p) for p in self.prices]
+        calc.reset()
+        second = [calc.update(p) for p in self.prices]
+        self.assertEqual(first, second)
+
+
+if __name__ == '__main__':
+    unittest.main()
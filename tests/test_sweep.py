@@ -0,0 +1,79 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from strategies.tools.simulator import simulate_bracket
+from strategies.tools.sweep import run_sweep, sweep_path
+from strategies.MeanReversion import MeanReversionCalc
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        n = 400
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        open_ = close * np.exp(rng.normal(0, 0.005, n))
+        self.dff = pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close) * 1.01,
+            'Low': np.minimum(open_, close) * 0.99,
+            'Close': close,
+        }, index=pd.date_range('2022-01-03', periods=n, freq='B'))
+        self.risk_range = np.arange(0.01, 0.06, 0.01)
+        self.combos = [(f'{win}_{z}', {'window': win, 'z_threshold': z})
+                       for win in [5, 14, 50]
+                       for z in np.arange(0.5, 2.5, 0.5)]
+
+    def serial_sweep(self, cash):
+        rows = []
+        for combo, (_, params) in enumerate(self.combos):
+            data = MeanReversionCalc(params=params).get_data(self.dff['Close'])
+            for risk in self.risk_range:
+                result = simulate_bracket(data.Signal, self.dff.Open, self.dff.High,
+                                          self.dff.Low, risk, 0.0015, cash)
+                cash = result['cash']
+                rows.append({'combo': combo, **params, 'risk': risk, 'net_profit': result['net_profit'],
+                             'cash_remaining': cash, 'cash_pct': ((cash-1e6)/1e6)*100})
+        return pd.DataFrame(rows)
+
+    def test_parallel_matches_serial(self):
+        expected = self.serial_sweep(1000000)
+        for workers in (1, 2):
+            results = run_sweep(MeanReversionCalc, self.combos, self.dff,
+                                self.risk_range, workers=workers, chunksize=2)
+            self.assertEqual(results.params, ['window', 'z_threshold'])
+            pd.testing.assert_frame_equal(results.to_pandas(), expected, check_dtype=False, check_exact=True)
+
+    def test_column_types(self):
+        results = run_sweep(MeanReversionCalc, self.combos[:2], self.dff, self.risk_range, workers=1)
+        schema = results.table.schema
+        self.assertEqual(str(schema.field('combo').type), 'int32')
+        self.assertEqual(str(schema.field('window').type), 'int64')
+        self.assertEqual(str(schema.field('z_threshold').type), 'double')
+        self.assertEqual(len(results), 2 * len(self.risk_range))
+
+    def test_trades(self):
+        # only the scalar columns by default, the trade prices on request
+        self.assertNotIn('buy_prices', run_sweep(MeanReversionCalc, self.combos[:2], self.dff,
+                                                 self.risk_range, workers=1).table.column_names)
+        results = run_sweep(MeanReversionCalc, self.combos[:2], self.dff, self.risk_range, workers=1, trades=True)
+        self.assertEqual(results.params, ['window', 'z_threshold'])
+        signal = MeanReversionCalc(params=self.combos[1][1]).get_data(self.dff['Close'])['Signal']
+        row = len(self.risk_range) + 2
+        expected = simulate_bracket(signal, self.dff.Open, self.dff.High, self.dff.Low, self.risk_range[2])
+        np.testing.assert_array_equal(results.column('buy_prices')[row], expected['buy_prices'])
+        np.testing.assert_array_equal(results.column('sell_prices')[row], expected['sell_prices'])
+
+    def test_sweep_path(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop('ALGOTRADE_SWEEPS', None)
+            self.assertIsNone(sweep_path('AAPL_mean_reversion'))
+            os.environ['ALGOTRADE_SWEEPS'] = 'sweeps'
+            self.assertEqual(sweep_path('AAPL_mean_reversion'), os.path.join('sweeps', 'AAPL_mean_reversion.parquet'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+import numpy as np
+import pandas as pd
+from strategies.tools.store import OhlcvStore
+from strategies.tools.synthetic import (MODELS, simulate, synthetic_ohlcv, synthetic_store,
+                                        SyntheticDataBacktesting)
+
+
+def kurtosis(r):
+    return ((r - r.mean()) ** 4).mean() / r.var() ** 2
+
+
+class TestSynthetic(unittest.TestCase):
+    def test_ohlc_relations(self):
+        for model in MODELS:
+            with self.subTest(model=model):
+                data = simulate(5000, 3, model)
+                self.assertEqual(data['close'].shape, (5000, 3))
+                self.assertTrue((data['high'] >= np.maximum(data['open'], data['close'])).all())
+                self.assertTrue((data['low'] <= np.minimum(data['open'], data['close'])).all())
+                self.assertTrue((data['low'] > 0).all() and (data['volume'] > 0).all())
+
+    def test_deterministic(self):
+        long = simulate(3000, ['AAPL', 'MSFT'], 'regime', seed=3)
+        short = simulate(1000, ['MSFT'], 'regime', seed=3)
+        np.testing.assert_array_equal(short['close'][:, 0], long['close'][:1000, 1])
+        self.assertFalse(np.array_equal(simulate(1000, ['MSFT'], 'regime', seed=4)['close'], short['close']))
+
+        frame = synthetic_ohlcv('AAPL', '2022-01-01', '2023-01-01')
+        wider = synthetic_ohlcv('AAPL', '2021-06-01', '2023-06-01')
+        pd.testing.assert_frame_equal(frame, wider.loc[frame.index])
+        self.assertEqual(len(frame), len(pd.bdate_range('2022-01-01', '2022-12-31')))
+
+    def test_models(self):
+        returns = {m: np.diff(np.log(simulate(20000, 1, m)['close'][:, 0])) for m in MODELS}
+        self.assertAlmostEqual(returns['gbm'].std(), MODELS['gbm']['volatility'], delta=0.001)
+        self.assertLess(abs(kurtosis(returns['gbm']) - 3), 0.3)
+        self.assertGreater(kurtosis(returns['jump']), 5)
+        # regime switching clusters volatility
+        size = np.abs(returns['regime'])
+        self.assertGreater(np.corrcoef(size[1:], size[:-1])[0, 1], 0.1)
+        data = simulate(20000, 4, 'gbm', correlation=0.5)
+        correlation = np.corrcoef(np.diff(np.log(data['close']), axis=0).T)
+        self.assertAlmostEqual(correlation[0, 1], 0.5, delta=0.05)
+        with self.assertRaises(TypeError):
+            simulate(10, 1, 'gbm', jump_rate=0.1)
+
+    def test_multiple_symbols_and_intraday(self):
+        frame = synthetic_ohlcv(['AAPL', 'MSFT'], '2022-01-03', '2022-01-08', model='jump')
+        self.assertEqual(frame.columns.get_level_values(1).unique().tolist(), ['AAPL', 'MSFT'])
+        pd.testing.assert_frame_equal(frame.xs('MSFT', axis=1, level=1),
+                                      synthetic_ohlcv('MSFT', '2022-01-03', '2022-01-08', model='jump'),
+                                      check_names=False)
+
+        daily = synthetic_ohlcv('AAPL', '2022-01-03', '2022-01-05')
+        minutes = synthetic_ohlcv('AAPL', '2022-01-03', '2022-01-05', 'minute')
+        self.assertEqual(len(minutes), 2 * 390)
+        first = minutes.loc['2022-01-03']
+        self.assertEqual(first.index[0], pd.Timestamp('2022-01-03 09:30'))
+        self.assertAlmostEqual(first['open'].iloc[0], daily['open'].iloc[0])
+        self.assertAlmostEqual(first['close'].iloc[-1], daily['close'].iloc[0])
+        np.testing.assert_array_equal(first['open'].to_numpy()[1:], first['close'].to_numpy()[:-1])
+        self.assertTrue((minutes['high'] >= minutes[['open', 'close']].max(axis=1)).all())
+        pd.testing.assert_frame_equal(synthetic_ohlcv('AAPL', '2022-01-04', '2022-01-05', 'minute'),
+                                      minutes.loc['2022-01-04'])
+
+    def test_store_and_data_source(self):
+        with tempfile.TemporaryDirectory() as root:
+            with mock.patch.dict(os.environ, {'ALGOTRADE_SYNTHETIC': 'jump', 'ALGOTRADE_SYNTHETIC_SEED': '2'}):
+                store = OhlcvStore(root)
+            self.assertEqual(store.root, os.path.join(root, 'synthetic', 'jump-2'))
+            dff = store.download('AAPL', datetime(2022, 1, 1), datetime(2023, 1, 1))
+            self.assertEqual(list(dff.columns), ['Open', 'High', 'Low', 'Close', 'Volume'])
+            expected = synthetic_ohlcv('AAPL', '2022-01-01', '2023-01-01', model='jump', seed=2)
+            np.testing.assert_allclose(dff['Close'], expected['close'])
+
+            data_source = SyntheticDataBacktesting(datetime(2022, 2, 1), datetime(2022, 3, 1),
+                                                   store=synthetic_store(root))
+            data_source._datetime = data_source.to_default_timezone(datetime(2022, 2, 15, 9, 30))
+            bars = data_source.get_historical_prices('MSFT', 5, 'day')
+            expected = synthetic_ohlcv('MSFT', '2022-02-08', '2022-02-15')
+            np.testing.assert_allclose(bars.df['close'].to_numpy(), expected['close'].to_numpy())
+
+
+if __name__ == '__main__':
+    unittest.main()
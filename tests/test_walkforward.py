@@ -0,0 +1,66 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+import numpy as np
+import pandas as pd
+from strategies.tools.sweep import run_sweep
+from strategies.tools.walkforward import folds, walk_forward
+from strategies.MeanReversion import MeanReversionCalc
+from strategies.BollingerBands import BollingerBandsCalc
+
+
+class TestWalkForward(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(8)
+        n = 500
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        open_ = close * np.exp(rng.normal(0, 0.005, n))
+        self.dff = pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close) * 1.01,
+            'Low': np.minimum(open_, close) * 0.99,
+            'Close': close,
+        }, index=pd.date_range('2021-01-04', periods=n, freq='B'))
+        self.risk_range = np.arange(0.01, 0.04, 0.01)
+
+    def test_folds(self):
+        self.assertEqual(folds(10, 4, 2), [(slice(0, 4), slice(4, 6)), (slice(2, 6), slice(6, 8)),
+                                           (slice(4, 8), slice(8, 10))])
+        self.assertEqual(folds(10, 4, 3, step=3, anchored=True), [(slice(0, 4), slice(4, 7)),
+                                                                   (slice(0, 7), slice(7, 10))])
+        self.assertEqual(folds(5, 4, 2), [])
+
+    def best_sweep(self, calc_cls, combos, window):
+        # an independent full sweep over one window, as the test grids run it
+        results = run_sweep(calc_cls, combos, self.dff.iloc[window], self.risk_range, workers=1)
+        return results.column('net_profit').max()
+
+    def test_matches_independent_sweeps(self):
+        combos = [(f'{win}_{z}', {'window': win, 'z_threshold': z}) for win in [5, 20] for z in [1.0, 2.0]]
+        report = walk_forward(MeanReversionCalc, combos, self.dff, self.risk_range,
+                              train_size=200, test_size=50, workers=1)
+        self.assertEqual(len(report), 6)
+        self.assertEqual(report[1]['test_start'], self.dff.index[250])
+        # causal signals sliced from the full history equal a recompute up to
+        # the end of the window
+        full = MeanReversionCalc(params=combos[0][1]).get_data(self.dff['Close'])['Signal']
+        head = MeanReversionCalc(params=combos[0][1]).get_data(self.dff['Close'].iloc[:250])['Signal']
+        np.testing.assert_array_equal(full.iloc[:250], head)
+
+        combos = [(f'{win}_{std}', {'window': win, 'num_std_dev': std}) for win in [10, 30] for std in [1.0, 2.0]]
+        report = walk_forward(BollingerBandsCalc, combos, self.dff, self.risk_range,
+                              train_size=150, test_size=100, workers=1)
+        for fold, (train, _) in zip(report, folds(len(self.dff), 150, 100)):
+            self.assertEqual(fold['train_profit'], self.best_sweep(BollingerBandsCalc, combos, train))
+
+    def test_parallel_matches_serial(self):
+        combos = [(win, {'window': win, 'z_threshold': 1.5}) for win in [5, 10, 20, 40]]
+        serial = walk_forward(MeanReversionCalc, combos, self.dff, self.risk_range, 120, 60, workers=1)
+        parallel = walk_forward(MeanReversionCalc, combos, self.dff, self.risk_range, 120, 60,
+                                workers=2, chunksize=1)
+        self.assertEqual(serial, parallel)
+
+
+if __name__ == '__main__':
+    unittest.main()